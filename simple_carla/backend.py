@@ -0,0 +1,56 @@
+#  simple_carla/backend.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Locates Carla, and makes its Python binding ("carla_backend", "carla_shared"
+and "carla_utils") importable. Nothing is imported from the binding here.
+
+	from simple_carla.backend import carla_binaries_path
+	from carla_backend import BINARY_NATIVE
+
+If the environment variable SIMPLE_CARLA_BACKEND is set to "simulated", the
+binding modules are provided by simple_carla.simulated. Otherwise, importing
+this module raises FileNotFoundError if Carla is not installed.
+"""
+import os, sys
+
+def _first_existing(*paths):
+	for path in paths:
+		if os.path.exists(path):
+			return path
+	return None
+
+carla_binaries_path = _first_existing('/usr/local/lib/carla', '/usr/lib/carla')
+carla_resources_path = _first_existing('/usr/local/share/carla', '/usr/share/carla')
+SIMULATED_BACKEND = os.environ.get('SIMPLE_CARLA_BACKEND') == 'simulated'
+if SIMULATED_BACKEND:
+	# The simulated backend provides everything imported from these modules:
+	import simple_carla.simulated as simulated
+	for _module_name in ('carla_backend', 'carla_shared', 'carla_utils'):
+		sys.modules[_module_name] = simulated
+	carla_binaries_path = carla_resources_path = ''
+elif carla_binaries_path is None:
+	raise FileNotFoundError("Carla binaries not found")
+elif carla_resources_path is None:
+	raise FileNotFoundError("Carla resources not found")
+elif carla_resources_path not in sys.path:
+	sys.path.append(carla_resources_path)			# Ugh. I know.
+
+
+#  end simple_carla/backend.py
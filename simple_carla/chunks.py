@@ -0,0 +1,126 @@
+#  simple_carla/chunks.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Content-addressed storage of plugin chunk data.
+
+Plugins which use chunks (PLUGIN_OPTION_USE_CHUNKS) save their whole state as a
+single, often large, blob. Many instances of the same plugin loaded with the
+same preset have identical chunks. A ChunkStore keeps each distinct chunk once,
+keyed on a hash of its content:
+
+	store = ChunkStore('~/.local/share/myhost/chunks')
+	digest = plugin.save_chunk(store)
+	...
+	plugin.load_chunk(store, digest)
+
+Session files (see simple_carla.session) use the same scheme, writing each
+distinct chunk once.
+
+Every "put" counts as a reference to the chunk. Call "release" when a digest is
+no longer needed; when a chunk has no references left, its in-memory copy is
+dropped. (A copy written to "directory" is kept, as other sessions may use it.)
+"""
+import os
+from hashlib import blake2b
+
+
+def chunk_digest(chunk):
+	"""
+	Returns (str) the hex digest identifying the (str) chunk data.
+	"""
+	return blake2b(chunk.encode('utf-8'), digest_size = 16).hexdigest()
+
+
+class ChunkStore:
+	"""
+	Keeps distinct chunks, keyed on their digest. Chunks are kept in memory, and
+	also written to "directory" if one is given, so that they may be shared
+	between sessions.
+	"""
+
+	def __init__(self, directory = None):
+		self.directory = None if directory is None else os.path.expanduser(directory)
+		self._chunks = {}	# (str) chunk data, indexed on digest
+		self._refs = {}		# Reference count, indexed on digest
+		if self.directory is not None:
+			os.makedirs(self.directory, exist_ok = True)
+
+	def _path(self, digest):
+		return os.path.join(self.directory, digest + '.chunk')
+
+	def put(self, chunk):
+		"""
+		Store the (str) chunk data, if not already stored, and add a reference to it.
+		Returns its digest.
+		"""
+		digest = chunk_digest(chunk)
+		self._refs[digest] = self._refs.get(digest, 0) + 1
+		if digest not in self._chunks:
+			self._chunks[digest] = chunk
+			if self.directory is not None and not os.path.exists(self._path(digest)):
+				temp = self._path(digest) + '.tmp'
+				with open(temp, 'w', encoding = 'utf-8') as fob:
+					fob.write(chunk)
+				os.replace(temp, self._path(digest))
+		return digest
+
+	def get(self, digest):
+		"""
+		Returns the (str) chunk data with the given digest.
+		Raises KeyError if not stored.
+		"""
+		chunk = self._chunks.get(digest)
+		if chunk is None:
+			if self.directory is None or not os.path.exists(self._path(digest)):
+				raise KeyError(digest)
+			with open(self._path(digest), encoding = 'utf-8') as fob:
+				chunk = self._chunks[digest] = fob.read()
+		return chunk
+
+	def __contains__(self, digest):
+		return digest in self._chunks \
+			or (self.directory is not None and os.path.exists(self._path(digest)))
+
+	def __len__(self):
+		return len(self._chunks)
+
+	def release(self, digest):
+		"""
+		Remove a reference added by "put". When there are none left, the chunk is
+		dropped from memory.
+		"""
+		count = self._refs.get(digest, 0) - 1
+		if count > 0:
+			self._refs[digest] = count
+		else:
+			self._refs.pop(digest, None)
+			self._chunks.pop(digest, None)
+
+	def discard(self, digest):
+		"""
+		Remove a chunk from memory and from the directory. Does nothing if not stored.
+		"""
+		self._refs.pop(digest, None)
+		self._chunks.pop(digest, None)
+		if self.directory is not None and os.path.exists(self._path(digest)):
+			os.unlink(self._path(digest))
+
+
+#  end simple_carla/chunks.py
@@ -0,0 +1,285 @@
+#  simple_carla/delivery.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Delivery modes for user-facing notifications.
+
+Carla calls the engine callback from the engine idle thread, while the engine
+lock is held. By default, user callbacks (Carla.on_*, Plugin.on_ready,
+Plugin.on_removed, and EventBus subscribers) are called right there, so a slow
+handler stalls every other engine interaction.
+
+Use Carla.set_delivery_mode() to have those callbacks queued to a thread pool
+or an asyncio event loop instead. Internal bookkeeping (the plugin / client /
+connection registries) is always updated synchronously, before the
+notification is queued.
+
+Every notification is submitted with a "key" (usually the Plugin or client it
+concerns). Notifications sharing a key are delivered in the order in which they
+were submitted.
+"""
+import asyncio, logging, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+DELIVERY_SYNC		= 'sync'
+DELIVERY_THREAD		= 'thread'
+DELIVERY_ASYNCIO	= 'asyncio'
+
+# Seconds the host waits for queued notifications when closing the engine or
+# changing the delivery mode:
+FLUSH_TIMEOUT		= 5.0
+
+
+class _Delivery:
+	"""
+	Abstract class which keeps the statistics common to all delivery modes.
+	Inherited by: SyncDelivery, ThreadPoolDelivery, AsyncioDelivery
+	"""
+
+	mode = None
+
+	def __init__(self):
+		self._stats_lock = threading.RLock()	# Re-entered by AsyncioDelivery.submit
+		self._queue_depth = 0
+		self.max_queue_depth = 0
+		self.delivered = 0
+		self.total_latency = 0.0
+		self.max_latency = 0.0
+		self.total_handler_time = 0.0
+		self.max_handler_time = 0.0
+
+	def submit(self, key, func, *args):
+		"""
+		Queue "func(*args)" for delivery.
+		key:	Notifications with the same key are delivered in order.
+		"""
+		raise NotImplementedError()
+
+	def flush(self, timeout = None):
+		"""
+		Wait until all queued notifications have been delivered.
+		Returns boolean True if the queue emptied before the timeout.
+		"""
+		return True
+
+	def shutdown(self):
+		"""
+		Release any resources held by this delivery mode.
+		"""
+
+	@property
+	def queue_depth(self):
+		"""
+		Returns (int) the number of notifications waiting to be delivered.
+		"""
+		return self._queue_depth
+
+	def _queued(self):
+		with self._stats_lock:
+			self._queue_depth += 1
+			if self._queue_depth > self.max_queue_depth:
+				self.max_queue_depth = self._queue_depth
+		return perf_counter()
+
+	def _run(self, queued_at, func, args):
+		start = perf_counter()
+		try:
+			func(*args)
+		except Exception as e:
+			logging.exception(e)
+		finally:
+			finish = perf_counter()
+			with self._stats_lock:
+				self._queue_depth -= 1
+				self.delivered += 1
+				latency = start - queued_at
+				handler_time = finish - start
+				self.total_latency += latency
+				self.total_handler_time += handler_time
+				if latency > self.max_latency:
+					self.max_latency = latency
+				if handler_time > self.max_handler_time:
+					self.max_handler_time = handler_time
+
+	def stats(self):
+		"""
+		Returns a dict containing queue depth and handler latency statistics.
+		"latency" is the time between submission and the start of the handler.
+		"handler_time" is the time spent in the handler itself.
+		All times are in seconds.
+		"""
+		with self._stats_lock:
+			return {
+				'mode'					: self.mode,
+				'queue_depth'			: self._queue_depth,
+				'max_queue_depth'		: self.max_queue_depth,
+				'delivered'				: self.delivered,
+				'mean_latency'			: self.total_latency / self.delivered if self.delivered else 0.0,
+				'max_latency'			: self.max_latency,
+				'mean_handler_time'		: self.total_handler_time / self.delivered if self.delivered else 0.0,
+				'max_handler_time'		: self.max_handler_time
+			}
+
+
+class SyncDelivery(_Delivery):
+	"""
+	Calls the handler immediately, in the thread which submitted it.
+	This is the default.
+	"""
+
+	mode = DELIVERY_SYNC
+
+	def submit(self, key, func, *args):
+		self._run(self._queued(), func, args)
+
+
+class ThreadPoolDelivery(_Delivery):
+	"""
+	Delivers notifications from a pool of worker threads.
+	Notifications with the same key are never run concurrently, and are delivered
+	in the order in which they were submitted.
+	"""
+
+	mode = DELIVERY_THREAD
+
+	def __init__(self, executor = None, max_workers = 4):
+		"""
+		executor:		An existing concurrent.futures.Executor to use. If None, a
+						ThreadPoolExecutor is created and owned by this object.
+		max_workers:	Number of worker threads when creating a ThreadPoolExecutor.
+		"""
+		super().__init__()
+		self._owns_executor = executor is None
+		self._executor = ThreadPoolExecutor(max_workers = max_workers,
+			thread_name_prefix = 'simple_carla_delivery') if executor is None else executor
+		self._lock = threading.Lock()
+		self._idle = threading.Condition(self._lock)
+		self._queues = {}
+
+	def submit(self, key, func, *args):
+		item = (self._queued(), func, args)
+		with self._lock:
+			queue = self._queues.get(key)
+			if queue is None:
+				self._queues[key] = deque((item,))
+				schedule = True
+			else:
+				queue.append(item)
+				schedule = False
+		if schedule:
+			self._executor.submit(self._drain, key)
+
+	def _drain(self, key):
+		"""
+		Runs every queued notification for the given key, one after the other.
+		"""
+		while True:
+			with self._lock:
+				queue = self._queues[key]
+				if not queue:
+					del self._queues[key]
+					if not self._queues:
+						self._idle.notify_all()
+					return
+				queued_at, func, args = queue.popleft()
+			self._run(queued_at, func, args)
+
+	def flush(self, timeout = None):
+		with self._lock:
+			return self._idle.wait_for(lambda: not self._queues, timeout)
+
+	def shutdown(self):
+		if self._owns_executor:
+			self._executor.shutdown(wait = True)
+
+
+class AsyncioDelivery(_Delivery):
+	"""
+	Delivers notifications on an asyncio event loop, using
+	loop.call_soon_threadsafe(). Notifications are kept in a single FIFO queue, so
+	ordering is preserved for every key.
+
+	flush() called from the loop's own thread delivers the queued notifications
+	there and then, as the loop cannot run them while flush() waits.
+	"""
+
+	mode = DELIVERY_ASYNCIO
+
+	def __init__(self, loop):
+		"""
+		loop:	A running (or soon to be running) asyncio event loop.
+		"""
+		super().__init__()
+		self._loop = loop
+		self._pending = deque()
+		self._idle = threading.Event()
+		self._idle.set()
+
+	def submit(self, key, func, *args):
+		# Count the item and clear "idle" together, so that an item finishing on the
+		# loop thread cannot set "idle" while this one is being queued:
+		with self._stats_lock:
+			self._pending.append((self._queued(), func, args))
+			self._idle.clear()
+		self._loop.call_soon_threadsafe(self._deliver_next)
+
+	def _deliver_next(self):
+		# One call is scheduled per item; an item already delivered by flush() leaves
+		# the queue empty.
+		try:
+			queued_at, func, args = self._pending.popleft()
+		except IndexError:
+			return
+		self._run(queued_at, func, args)
+		with self._stats_lock:
+			if self._queue_depth == 0:
+				self._idle.set()
+
+	def flush(self, timeout = None):
+		try:
+			running_loop = asyncio.get_running_loop()
+		except RuntimeError:
+			running_loop = None
+		if running_loop is self._loop:
+			while self._pending:
+				self._deliver_next()
+			return True
+		return self._idle.wait(timeout)
+
+
+def create_delivery(mode, **kwargs):
+	"""
+	Returns a delivery object for the given mode.
+	mode:		One of DELIVERY_SYNC, DELIVERY_THREAD, DELIVERY_ASYNCIO
+	kwargs:		Passed to the constructor of the delivery class, i.e.
+				"executor" / "max_workers" for DELIVERY_THREAD, "loop" for
+				DELIVERY_ASYNCIO.
+	"""
+	if mode == DELIVERY_SYNC:
+		return SyncDelivery()
+	if mode == DELIVERY_THREAD:
+		return ThreadPoolDelivery(**kwargs)
+	if mode == DELIVERY_ASYNCIO:
+		return AsyncioDelivery(**kwargs)
+	raise ValueError(f'Unknown delivery mode "{mode}"')
+
+
+#  end simple_carla/delivery.py
@@ -0,0 +1,428 @@
+#  simple_carla/discovery.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Headless plugin discovery, with a persistent index.
+
+	index = PluginIndex()
+	index.refresh()
+	plugin_def = index.find(label = 'audiogain_s')[0]
+	plugin = Plugin(plugin_def)
+
+Scans the LADSPA, DSSI, LV2, VST2, VST3, SF2 and SFZ paths (from the usual
+environment variables, e.g. LV2_PATH, or Carla's defaults), running Carla's
+"carla-discovery-native" tool on each plugin file, several at a time, in
+separate processes. No display is needed.
+
+Results are kept in a JSON file in the user's cache directory
+(~/.cache/simple_carla/plugin_index.json). On refresh, directories whose
+modification time has not changed since the last scan are not listed again,
+and files whose modification time has not changed are not discovered again.
+(Use "refresh(force = True)" to rescan everything.)
+
+SFZ files do not need discovery; their plugin_def is made from the filename.
+
+Carla's binding is imported on first use, so that importing this module (e.g. to
+read an existing index) does not require Carla.
+
+The plugin_def dicts returned contain the keys needed by Plugin ("name",
+"build", "type", "filename", "label", "uniqueId") as well as the other
+information reported by discovery ("maker", "category", "hints", "audio.ins",
+"audio.outs", "midi.ins", "midi.outs", etc.), in the same format as Carla's
+plugin dialog.
+"""
+import json, logging, os, subprocess
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+INDEX_VERSION	= 1
+DISCOVERY_TOOL	= 'carla-discovery-native'
+
+_plugin_paths = None
+
+# Integer properties reported by carla-discovery:
+_INT_PROPERTIES = ('build', 'uniqueId', 'hints', 'audio.ins', 'audio.outs', 'cv.ins', 'cv.outs',
+	'midi.ins', 'midi.outs', 'parameters.ins', 'parameters.outs')
+
+
+def default_index_path():
+	"""
+	Returns the path of the index file in the user's cache directory.
+	"""
+	cache = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+	return os.path.join(cache, 'simple_carla', 'plugin_index.json')
+
+def plugin_path_specs():
+	"""
+	Returns a dict of { plugin type: (discovery tool type, environment variable,
+	default paths, file extensions) } for each plugin type scanned.
+	LV2 is discovered a whole directory at a time, so has no extensions.
+	"""
+	global _plugin_paths
+	if _plugin_paths is None:
+		import simple_carla.backend		# Makes Carla's binding importable
+		from carla_backend import PLUGIN_LADSPA, PLUGIN_DSSI, PLUGIN_LV2, PLUGIN_VST2, \
+			PLUGIN_VST3, PLUGIN_SF2, PLUGIN_SFZ
+		from carla_shared import CARLA_DEFAULT_LADSPA_PATH, CARLA_DEFAULT_DSSI_PATH, \
+			CARLA_DEFAULT_LV2_PATH, CARLA_DEFAULT_VST2_PATH, CARLA_DEFAULT_VST3_PATH, \
+			CARLA_DEFAULT_SF2_PATH, CARLA_DEFAULT_SFZ_PATH
+		_plugin_paths = {
+			PLUGIN_LADSPA	: ('ladspa', 'LADSPA_PATH', CARLA_DEFAULT_LADSPA_PATH, ('.so',)),
+			PLUGIN_DSSI		: ('dssi', 'DSSI_PATH', CARLA_DEFAULT_DSSI_PATH, ('.so',)),
+			PLUGIN_LV2		: ('lv2', 'LV2_PATH', CARLA_DEFAULT_LV2_PATH, ()),
+			PLUGIN_VST2		: ('vst2', 'VST_PATH', CARLA_DEFAULT_VST2_PATH, ('.so',)),
+			PLUGIN_VST3		: ('vst3', 'VST3_PATH', CARLA_DEFAULT_VST3_PATH, ('.vst3',)),
+			PLUGIN_SF2		: ('sf2', 'SF2_PATH', CARLA_DEFAULT_SF2_PATH, ('.sf2', '.sf3')),
+			PLUGIN_SFZ		: ('sfz', 'SFZ_PATH', CARLA_DEFAULT_SFZ_PATH, ('.sfz',))
+		}
+	return _plugin_paths
+
+def plugin_paths(plugin_type):
+	"""
+	Returns a list of the directories searched for plugins of the given type.
+	"""
+	_, env_var, defaults, _ = plugin_path_specs()[plugin_type]
+	from carla_shared import splitter
+	paths = os.environ[env_var].split(splitter) if os.environ.get(env_var) else defaults
+	return [ os.path.expanduser(path) for path in paths if path ]
+
+def new_plugin_def(plugin_type, filename):
+	"""
+	Returns a plugin_def with default values for every key.
+	"""
+	import simple_carla.backend
+	from carla_backend import BINARY_NATIVE
+	plugin_def = { prop: 0 for prop in _INT_PROPERTIES }
+	plugin_def.update({
+		'name'		: '',
+		'label'		: '',
+		'maker'		: '',
+		'category'	: '',
+		'build'		: BINARY_NATIVE,
+		'type'		: plugin_type,
+		'filename'	: filename
+	})
+	return plugin_def
+
+def parse_discovery_output(plugin_type, filename, output):
+	"""
+	Returns a list of plugin_def parsed from the (str) output of carla-discovery.
+	"""
+	plugins, plugin_def = [], None
+	for line in output.splitlines():
+		if not line.startswith('carla-discovery::'):
+			continue
+		try:
+			prop, value = line[17:].split('::', 1)
+		except ValueError:
+			continue
+		value = value.strip()
+		if prop == 'init':
+			plugin_def = new_plugin_def(plugin_type, filename)
+		elif prop == 'end':
+			if plugin_def is not None:
+				plugins.append(plugin_def)
+				plugin_def = None
+		elif prop == 'error':
+			logging.debug('Discovery of "%s": %s', filename, value)
+		elif plugin_def is None or prop in ('info', 'warning'):
+			continue
+		elif prop in _INT_PROPERTIES:
+			if value.lstrip('-').isdigit():
+				plugin_def[prop] = int(value)
+		elif prop == 'uri':
+			plugin_def['label'] = value
+		elif prop in ('name', 'label'):
+			plugin_def[prop] = value or '(none)'
+		else:
+			plugin_def[prop] = value
+	return plugins
+
+def sfz_plugin_def(filename):
+	"""
+	Returns the plugin_def for an SFZ file. (No discovery is needed.)
+	"""
+	import simple_carla.backend
+	from carla_backend import PLUGIN_SFZ
+	plugin_def = new_plugin_def(PLUGIN_SFZ, filename)
+	name = os.path.splitext(os.path.basename(filename))[0]
+	plugin_def.update({ 'name': name, 'label': name, 'category': 'synth',
+		'audio.outs': 2, 'midi.ins': 1 })
+	return plugin_def
+
+
+# -------------------------------------------------------------------
+# Index
+
+class PluginIndex:
+	"""
+	A persistent index of the plugins installed on this system.
+	"""
+
+	def __init__(self, filename = None, tool = None, workers = None, timeout = 30.0):
+		"""
+		filename:	Path of the index file. Defaults to "default_index_path()"
+		tool:		Path of carla-discovery-native. Defaults to the one in Carla's
+					binaries path.
+		workers:	Number of discoveries to run at once. Defaults to the CPU count.
+		timeout:	Seconds to allow each discovery before giving up on a file.
+		"""
+		self.filename = filename or default_index_path()
+		if tool is None:
+			from simple_carla.backend import carla_binaries_path
+			tool = os.path.join(carla_binaries_path or '', DISCOVERY_TOOL)
+		self.tool = tool
+		self.workers = workers or os.cpu_count() or 4
+		self.timeout = timeout
+		self._directories = {}	# { path: { 'type', 'mtime', 'subdirs', 'files': { filename: { 'mtime', 'plugins' } } } }
+		self._plugins = []
+		self._by_key = {}		# { (key, lowercase value): [ plugin_def ] }
+		self.load()
+
+	# -------------------------------------------------------------------
+	# Persistence
+
+	def load(self):
+		"""
+		Read the index file, if it exists.
+		"""
+		try:
+			with open(self.filename) as fob:
+				data = json.load(fob)
+		except FileNotFoundError:
+			return
+		except ValueError:
+			logging.warning('Discarding unreadable plugin index "%s"', self.filename)
+			return
+		if data.get('version') == INDEX_VERSION:
+			self._directories = data['directories']
+			self._rebuild()
+
+	def save(self):
+		"""
+		Write the index file.
+		"""
+		os.makedirs(os.path.dirname(self.filename), exist_ok = True)
+		temp = self.filename + '.tmp'
+		with open(temp, 'w') as fob:
+			json.dump({ 'version': INDEX_VERSION, 'directories': self._directories }, fob)
+		os.replace(temp, self.filename)
+
+	# -------------------------------------------------------------------
+	# Scanning
+
+	def refresh(self, plugin_types = None, force = False):
+		"""
+		Scan for plugins, rediscovering only what changed, and save the index.
+		plugin_types:	List of PLUGIN_* types to scan. Defaults to all.
+		force:			Rediscover everything.
+		Returns a dict of statistics.
+		"""
+		start = perf_counter()
+		plugin_types = list(plugin_path_specs()) if plugin_types is None else plugin_types
+		directories, jobs, visited = {}, [], set()
+		for plugin_type in plugin_types:
+			for root in plugin_paths(plugin_type):
+				self._walk(plugin_type, root, directories, jobs, force, visited)
+		# Keep directories of types not scanned this time:
+		for path, entry in self._directories.items():
+			if entry['type'] not in plugin_types:
+				directories.setdefault(path, entry)
+		if jobs and not os.path.exists(self.tool):
+			logging.error('Discovery tool "%s" not found; %d files not scanned', self.tool, len(jobs))
+			# Make sure these get scanned next time:
+			for directory, _, filename, _ in jobs:
+				directories[directory]['mtime'] = None
+				directories[directory]['files'].pop(filename, None)
+			jobs = []
+		failed = 0
+		with ThreadPoolExecutor(max_workers = self.workers) as executor:
+			for (directory, plugin_type, filename, mtime), plugins in \
+				zip(jobs, executor.map(self._discover, jobs)):
+				if plugins is None:
+					# Not cached; an unknown mtime makes sure this is retried next time:
+					failed += 1
+					directories[directory]['mtime'] = None
+					plugins, mtime = [], None
+				directories[directory]['files'][filename] = { 'mtime': mtime, 'plugins': plugins }
+		self._directories = directories
+		self._rebuild()
+		self.save()
+		return {
+			'directories'	: len(directories),
+			'discovered'	: len(jobs),
+			'failed'		: failed,
+			'plugins'		: len(self._plugins),
+			'elapsed'		: perf_counter() - start
+		}
+
+	def _walk(self, plugin_type, path, directories, jobs, force, visited):
+		"""
+		Record the directory "path" and its subdirectories in "directories", and append
+		(directory, plugin_type, filename, mtime) to "jobs" for each file which needs
+		discovering. "visited" is the set of real paths already walked, so that a
+		directory reached through more than one symlink (or a symlink loop) is walked once.
+		"""
+		if path in directories:
+			return
+		real_path = os.path.realpath(path)
+		if real_path in visited:
+			return
+		visited.add(real_path)
+		try:
+			mtime = os.stat(path).st_mtime
+		except OSError:
+			return
+		cached = self._directories.get(path)
+		stype, _, _, extensions = plugin_path_specs()[plugin_type]
+		if stype == 'lv2':
+			# LV2 is discovered per directory; bundles updated in place change only
+			# their own mtime, so include those in the directory's mtime.
+			try:
+				mtime = max([ mtime ] + [ entry.stat().st_mtime for entry in os.scandir(path)
+					if entry.name.endswith('.lv2') and entry.is_dir() ])
+			except OSError:
+				return
+			if not force and cached is not None and cached['mtime'] == mtime and cached['type'] == plugin_type:
+				directories[path] = cached
+			else:
+				directories[path] = { 'type': plugin_type, 'mtime': mtime, 'subdirs': [], 'files': {} }
+				jobs.append((path, plugin_type, path, mtime))
+			return
+		if not force and cached is not None and cached['mtime'] == mtime and cached['type'] == plugin_type:
+			directories[path] = cached
+			subdirs = cached['subdirs']
+		else:
+			files, subdirs = {}, []
+			old_files = {} if cached is None or force else cached['files']
+			try:
+				entries = list(os.scandir(path))
+			except OSError:
+				return
+			for entry in entries:
+				if entry.name.endswith(extensions):
+					file_mtime = entry.stat().st_mtime
+					old = old_files.get(entry.path)
+					if old is not None and old['mtime'] == file_mtime:
+						files[entry.path] = old
+					elif stype == 'sfz':
+						files[entry.path] = { 'mtime': file_mtime, 'plugins': [ sfz_plugin_def(entry.path) ] }
+					else:
+						files[entry.path] = { 'mtime': file_mtime, 'plugins': [] }
+						jobs.append((path, plugin_type, entry.path, file_mtime))
+				elif entry.is_dir():
+					subdirs.append(entry.path)
+			directories[path] = { 'type': plugin_type, 'mtime': mtime, 'subdirs': subdirs, 'files': files }
+		for subdir in subdirs:
+			self._walk(plugin_type, subdir, directories, jobs, force, visited)
+
+	def _discover(self, job):
+		"""
+		Run carla-discovery on one file (or LV2 directory). Returns list of plugin_def,
+		or None if discovery timed out or could not be run.
+		"""
+		_, plugin_type, filename, _ = job
+		stype = plugin_path_specs()[plugin_type][0]
+		env = None
+		target = filename
+		if stype == 'lv2':
+			env = dict(os.environ, LV2_PATH = filename)
+			target = ':all'
+		try:
+			proc = subprocess.run([ self.tool, stype, target ], env = env,
+				stdout = subprocess.PIPE, stderr = subprocess.DEVNULL, timeout = self.timeout)
+		except subprocess.TimeoutExpired:
+			logging.warning('Discovery of "%s" timed out', filename)
+			return None
+		except OSError as e:
+			logging.warning('Discovery of "%s" failed: %s', filename, e)
+			return None
+		plugins = parse_discovery_output(plugin_type, filename, proc.stdout.decode('utf-8', 'replace'))
+		if stype == 'lv2':
+			for plugin_def in plugins:
+				plugin_def['filename'] = ''
+		return plugins
+
+	# -------------------------------------------------------------------
+	# Queries
+
+	def _rebuild(self):
+		self._plugins = [ plugin_def
+			for entry in self._directories.values()
+			for info in entry['files'].values()
+			for plugin_def in info['plugins'] ]
+		by_key = {}
+		for plugin_def in self._plugins:
+			for key in ('name', 'label', 'maker', 'category'):
+				by_key.setdefault((key, plugin_def[key].lower()), []).append(plugin_def)
+			by_key.setdefault(('type', plugin_def['type']), []).append(plugin_def)
+		self._by_key = by_key
+
+	def __len__(self):
+		return len(self._plugins)
+
+	def plugins(self):
+		"""
+		Returns a list of every plugin_def in the index.
+		"""
+		return [ dict(plugin_def) for plugin_def in self._plugins ]
+
+	def find(self, name = None, label = None, maker = None, category = None, plugin_type = None,
+		audio_ins = None, audio_outs = None, midi_ins = None, midi_outs = None):
+		"""
+		Returns a list of plugin_def (copies) matching every given criterion.
+		"name", "label", "maker" and "category" match whole values, ignoring case.
+		Port counts match exactly.
+		"""
+		candidates = None
+		for key, value in (('name', name), ('label', label), ('maker', maker),
+			('category', category), ('type', plugin_type)):
+			if value is None:
+				continue
+			matches = self._by_key.get((key, value if key == 'type' else value.lower()), [])
+			if candidates is None or len(matches) < len(candidates):
+				candidates = matches
+		if candidates is None:
+			candidates = self._plugins
+		results = []
+		for plugin_def in candidates:
+			if (name is None or plugin_def['name'].lower() == name.lower()) \
+				and (label is None or plugin_def['label'].lower() == label.lower()) \
+				and (maker is None or plugin_def['maker'].lower() == maker.lower()) \
+				and (category is None or plugin_def['category'].lower() == category.lower()) \
+				and (plugin_type is None or plugin_def['type'] == plugin_type) \
+				and (audio_ins is None or plugin_def['audio.ins'] == audio_ins) \
+				and (audio_outs is None or plugin_def['audio.outs'] == audio_outs) \
+				and (midi_ins is None or plugin_def['midi.ins'] == midi_ins) \
+				and (midi_outs is None or plugin_def['midi.outs'] == midi_outs):
+				results.append(dict(plugin_def))
+		return results
+
+	def search(self, text):
+		"""
+		Returns a list of plugin_def (copies) whose name, label or maker contains
+		"text", ignoring case.
+		"""
+		text = text.lower()
+		return [ dict(plugin_def) for plugin_def in self._plugins
+			if text in plugin_def['name'].lower() or text in plugin_def['label'].lower() \
+			or text in plugin_def['maker'].lower() ]
+
+
+#  end simple_carla/discovery.py
@@ -0,0 +1,310 @@
+#  simple_carla/event_bus.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+A multi-subscriber event bus for host notifications.
+
+Every Carla / CarlaQt instance owns an EventBus, accessible as "carla.events".
+Any number of subscribers may listen to any event. Subscribers may ask to only
+receive events concerning a particular plugin (or other patchbay client), in
+which case they are not called at all for events from other sources.
+
+For example:
+
+	from simple_carla.event_bus import EVENT_PARAMETER_CHANGED
+
+	def parameter_changed(plugin, parameter, value):
+		...
+
+	sub = carla.events.subscribe(EVENT_PARAMETER_CHANGED, parameter_changed, source = my_plugin)
+	...
+	sub.unsubscribe()
+
+Subscribers are called according to the host's delivery mode (see
+simple_carla.delivery), unless they were subscribed with an executor of their
+own, or with "synchronous = True".
+
+Callbacks are held by weak reference by default, so that subscribing does not
+keep the subscriber alive. Note that this means that a lambda or a locally
+defined function will be garbage collected immediately unless you hold onto it
+yourself. Pass "weak = False" to hold a strong reference. (Builtin functions and
+methods are always held strongly.)
+"""
+import logging, threading
+from time import perf_counter
+from types import BuiltinFunctionType, MethodType
+from weakref import ref, WeakMethod, WeakKeyDictionary
+
+# -------------------------------------------------------------------
+# Event names
+
+EVENT_CLIENT_ADDED				= 'client_added'				# (client)
+EVENT_CLIENT_REMOVED			= 'client_removed'				# (client)
+EVENT_PORT_ADDED				= 'port_added'					# (port)
+EVENT_PORT_REMOVED				= 'port_removed'				# (port)
+EVENT_CONNECTION_ADDED			= 'connection_added'			# (connection)
+EVENT_CONNECTION_REMOVED		= 'connection_removed'			# (connection)
+EVENT_PLUGIN_READY				= 'plugin_ready'				# (plugin)
+EVENT_PLUGIN_REMOVED			= 'plugin_removed'				# (plugin)
+EVENT_LAST_PLUGIN_REMOVED		= 'last_plugin_removed'			# ()
+EVENT_PARAMETER_CHANGED			= 'parameter_changed'			# (plugin, parameter, value)
+EVENT_ENGINE_STARTED			= 'engine_started'				# (plugin_count, process_mode, transport_mode, buffer_size, sample_rate, driver_name)
+EVENT_ENGINE_STOPPED			= 'engine_stopped'				# ()
+EVENT_PROCESS_MODE_CHANGED		= 'process_mode_changed'		# (process_mode)
+EVENT_TRANSPORT_MODE_CHANGED	= 'transport_mode_changed'		# (transport_mode, transport_extra)
+EVENT_BUFFER_SIZE_CHANGED		= 'buffer_size_changed'			# (buffer_size)
+EVENT_SAMPLE_RATE_CHANGED		= 'sample_rate_changed'			# (sample_rate)
+EVENT_CANCELABLE_ACTION			= 'cancelable_action'			# (plugin_id, started, action)
+EVENT_INFO						= 'info'						# (message)
+EVENT_ERROR						= 'error'						# (message)
+EVENT_QUIT						= 'quit'						# ()
+EVENT_APPLICATION_ERROR			= 'application_error'			# (exc_type_name, message, filename, line_number)
+EVENT_XRUN						= 'xrun'						# (XrunIncident)	see simple_carla.health
+EVENT_XRUN_BURST				= 'xrun_burst'					# (count, [XrunIncident])
+EVENT_LOAD_HIGH					= 'load_high'					# (load)
+EVENT_LOAD_NORMAL				= 'load_normal'					# (load)
+
+
+class Subscription:
+	"""
+	Returned by EventBus.subscribe(). Holds the callback and dispatch statistics.
+
+	Members of interest
+	-------------------
+	event:       (str)    The event subscribed to
+	calls:       (int)    Number of times the callback was called
+	total_time:  (float)  Cumulative time spent in the callback, in seconds
+	max_time:    (float)  Longest single call to the callback, in seconds
+	-------------------
+	"""
+
+	def __init__(self, bus, event, callback, source, executor, synchronous, weak):
+		self._bus = bus
+		self.event = event
+		self.executor = executor
+		self.synchronous = synchronous
+		self.calls = 0
+		self.total_time = 0.0
+		self.max_time = 0.0
+		self._source_ref = None if source is None else ref(source)
+		if not weak:
+			self._callback = lambda : callback
+		elif isinstance(callback, MethodType):
+			self._callback = WeakMethod(callback, self._referent_died)
+		elif isinstance(callback, BuiltinFunctionType):
+			# Builtin functions and methods (i.e. "print", "a_list.append") cannot be
+			# held weakly; "print" cannot be referenced, and a bound method would die at once:
+			self._callback = lambda : callback
+		else:
+			self._callback = ref(callback, self._referent_died)
+		self.name = getattr(callback, '__qualname__', repr(callback))
+
+	@property
+	def source(self):
+		"""
+		Returns the object this subscription is filtered on, or None.
+		"""
+		return None if self._source_ref is None else self._source_ref()
+
+	@property
+	def mean_time(self):
+		"""
+		Returns (float) the average time spent in the callback, in seconds.
+		"""
+		return self.total_time / self.calls if self.calls else 0.0
+
+	@property
+	def is_alive(self):
+		return self._callback() is not None
+
+	def unsubscribe(self):
+		"""
+		Stop receiving events.
+		"""
+		self._bus.unsubscribe(self)
+
+	def _referent_died(self, _):
+		self._bus.unsubscribe(self)
+
+	def _call(self, args):
+		callback = self._callback()
+		if callback is None:
+			return
+		start = perf_counter()
+		try:
+			callback(*args)
+		except Exception as e:
+			logging.exception(e)
+		finally:
+			elapsed = perf_counter() - start
+			self.calls += 1
+			self.total_time += elapsed
+			if elapsed > self.max_time:
+				self.max_time = elapsed
+
+	def __str__(self):
+		return f'<Subscription "{self.event}" {self.name} calls: {self.calls} mean: {self.mean_time:.6f}s max: {self.max_time:.6f}s>'
+
+
+class _EventSlot:
+	"""
+	Subscribers to a single event; those which receive everything, and those which
+	are filtered on a particular source.
+	"""
+
+	__slots__ = ('all', 'by_source')
+
+	def __init__(self):
+		self.all = ()
+		self.by_source = WeakKeyDictionary()
+
+
+class EventBus:
+	"""
+	Delivers events to any number of subscribers.
+	"""
+
+	def __init__(self):
+		self._slots = {}
+		self._lock = threading.Lock()
+		self.delivery = None	# Set by the host; see simple_carla.delivery
+
+	def subscribe(self, event, callback, *, source = None, executor = None,
+		synchronous = False, weak = True):
+		"""
+		Subscribe to an event.
+		Returns a Subscription.
+
+		event:		One of the EVENT_* names defined in this module.
+		callback:	Called with the arguments of the event.
+		source:		If given, only events concerning this object (i.e. a Plugin or
+					PatchbayClient) are delivered.
+		executor:	If given, the callback is submitted to this
+					(concurrent.futures.Executor -like) object rather than being called
+					from the thread which published the event.
+		synchronous:	Always call the callback from the thread which published the
+					event, regardless of the host's delivery mode.
+		weak:		Hold only a weak reference to the callback.
+		"""
+		subscription = Subscription(self, event, callback, source, executor, synchronous, weak)
+		with self._lock:
+			slot = self._slots.get(event)
+			if slot is None:
+				slot = self._slots[event] = _EventSlot()
+			if source is None:
+				slot.all = slot.all + (subscription,)
+			else:
+				slot.by_source[source] = slot.by_source.get(source, ()) + (subscription,)
+		return subscription
+
+	def unsubscribe(self, subscription):
+		"""
+		Remove the given Subscription. Does nothing if already removed.
+		"""
+		with self._lock:
+			slot = self._slots.get(subscription.event)
+			if slot is None:
+				return
+			if subscription in slot.all:
+				slot.all = tuple(sub for sub in slot.all if sub is not subscription)
+				return
+			source = subscription.source
+			if source is not None and source in slot.by_source:
+				remaining = tuple(sub for sub in slot.by_source[source] if sub is not subscription)
+				if remaining:
+					slot.by_source[source] = remaining
+				else:
+					del slot.by_source[source]
+
+	def forget_source(self, source):
+		"""
+		Remove all subscriptions filtered on the given source.
+		Called when a plugin or client is removed.
+		"""
+		with self._lock:
+			for slot in self._slots.values():
+				slot.by_source.pop(source, None)
+
+	def has_subscribers(self, event):
+		"""
+		Returns boolean True if anybody is listening to the given event.
+		"""
+		slot = self._slots.get(event)
+		return slot is not None and (bool(slot.all) or len(slot.by_source) > 0)
+
+	def publish(self, event, *args, sources = ()):
+		"""
+		Deliver an event to all subscribers.
+		sources:	Objects which this event concerns. Subscribers filtered on any of
+					these objects will receive the event.
+		"""
+		slot = self._slots.get(event)
+		if slot is None:
+			return
+		key = sources[0] if sources else None
+		for subscription in slot.all:
+			self._deliver(subscription, args, key)
+		if slot.by_source:
+			if len(sources) > 1:
+				sources = dict.fromkeys(sources)	# i.e. a client connected to itself
+			for source in sources:
+				for subscription in slot.by_source.get(source, ()):
+					self._deliver(subscription, args, key)
+
+	def _deliver(self, subscription, args, key):
+		if subscription.executor is not None:
+			subscription.executor.submit(subscription._call, args)
+		elif subscription.synchronous or self.delivery is None:
+			subscription._call(args)
+		else:
+			self.delivery.submit(key, subscription._call, args)
+
+	# -------------------------------------------------------------------
+	# Diagnostics
+
+	def subscriptions(self, event = None):
+		"""
+		Returns a list of all Subscription, optionally only those for the given event.
+		"""
+		subscriptions = []
+		for key, slot in list(self._slots.items()):
+			if event is None or key == event:
+				subscriptions.extend(slot.all)
+				for subs in list(slot.by_source.values()):
+					subscriptions.extend(subs)
+		return subscriptions
+
+	def slowest(self, count = 10):
+		"""
+		Returns a list of the Subscription with the highest mean dispatch time.
+		Use this to find slow event handlers.
+		"""
+		return sorted(self.subscriptions(), key = lambda sub: sub.mean_time, reverse = True)[:count]
+
+	def reset_timing(self):
+		"""
+		Reset dispatch statistics for all subscriptions.
+		"""
+		for sub in self.subscriptions():
+			sub.calls = 0
+			sub.total_time = 0.0
+			sub.max_time = 0.0
+
+
+#  end simple_carla/event_bus.py
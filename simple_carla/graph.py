@@ -0,0 +1,429 @@
+#  simple_carla/graph.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Structural analysis of the patchbay.
+
+	graph = carla.start_graph_analysis()
+	print(graph.topological_order())
+	print(graph.cycles())
+	print(graph.longest_chain())
+	print(graph.levels())
+	print(graph.components())
+
+The graph is built from the plugins known to Carla and the connections between
+them, and is kept up to date as clients and connections are added and removed.
+
+Nodes are plugin clients. System clients (hardware, and JACK clients which are
+not plugins added to this Carla instance) are not processed by Carla, so they are
+treated as the boundary of the graph: a plugin with an input connected to a
+system client is an "entry" and a plugin with an output connected to a system
+client is an "exit". This keeps "system:capture_1 -> plugin -> system:playback_1"
+from being reported as a cycle.
+
+The dependency graph of plugins is maintained incrementally. The analyses are
+computed on demand and cached. A connection which does not contradict the cached
+processing order, or a disconnection which does not break a cycle, does not
+invalidate it.
+
+In ENGINE_PROCESS_MODE_MULTIPLE_CLIENTS, JACK may run the plugins in each of the
+"levels" concurrently. The length of the longest chain bounds the latency of a
+process cycle, and "components" are independent sub-graphs which could be split
+across cores or Carla instances.
+"""
+import threading
+from simple_carla.event_bus import (
+	EVENT_CLIENT_ADDED, EVENT_CLIENT_REMOVED, EVENT_CONNECTION_ADDED, EVENT_CONNECTION_REMOVED
+)
+
+
+class PatchbayGraph:
+	"""
+	Dependency graph of the plugins in a Carla instance.
+	Usually created by Carla.start_graph_analysis()
+	"""
+
+	def __init__(self, carla):
+		self.carla = carla
+		self._lock = threading.RLock()
+		self._subscriptions = []
+		self._nodes = {}		# PatchbayClient, indexed on client_id
+		self._succ = {}			# { client_id: { client_id: connection count } }
+		self._pred = {}			# { client_id: { client_id: connection count } }
+		self._entries = {}		# { client_id: count of connections from system clients }
+		self._exits = {}		# { client_id: count of connections to system clients }
+		self._links = {}		# { connection_id: (src client_id, dst client_id) }, None for system clients
+		self._order = None		# Cached list of client_id in processing order
+		self._position = None	# { client_id: index in self._order }
+		self._sccs = None		# Cached list of strongly connected components (lists of client_id)
+		self._cached = {}		# Other analyses, discarded on any change
+		self.version = 0		# Incremented on every change to the graph
+
+	def start(self):
+		"""
+		Build the graph and follow changes to the patchbay.
+		"""
+		events = self.carla.events
+		self._subscriptions = [
+			events.subscribe(EVENT_CLIENT_ADDED, self._client_added, synchronous = True, weak = False),
+			events.subscribe(EVENT_CLIENT_REMOVED, self._client_removed, synchronous = True, weak = False),
+			events.subscribe(EVENT_CONNECTION_ADDED, self._connection_added, synchronous = True, weak = False),
+			events.subscribe(EVENT_CONNECTION_REMOVED, self._connection_removed, synchronous = True, weak = False)
+		]
+		self.rebuild()
+
+	def stop(self):
+		"""
+		Stop following changes. The graph is left as it was.
+		"""
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+		self._subscriptions = []
+
+	def rebuild(self):
+		"""
+		Discard everything and build the graph from the current state of Carla.
+		"""
+		with self._lock:
+			self._nodes.clear()
+			self._succ.clear()
+			self._pred.clear()
+			self._entries.clear()
+			self._exits.clear()
+			self._links.clear()
+			self._invalidate_order()
+			for client in list(self.carla._clients.values()):
+				self._client_added(client)
+			for connection in list(self.carla._connections.values()):
+				self._connection_added(connection)
+
+	def _is_plugin(self, client):
+		return client.client_name not in self.carla._sys_clients
+
+	# -------------------------------------------------------------------
+	# Incremental updates
+
+	def _changed(self):
+		self.version += 1
+		self._cached.clear()
+
+	def _invalidate_order(self):
+		self._order = self._position = self._sccs = None
+		self._changed()
+
+	def _client_added(self, client):
+		if not self._is_plugin(client):
+			return
+		with self._lock:
+			client_id = client.client_id
+			if client_id in self._nodes:
+				return
+			self._nodes[client_id] = client
+			self._succ[client_id] = {}
+			self._pred[client_id] = {}
+			# A node without connections may go anywhere in the processing order:
+			if self._order is not None:
+				self._position[client_id] = len(self._order)
+				self._order.append(client_id)
+				self._sccs.append([client_id])
+			self._changed()
+
+	def _client_removed(self, client):
+		with self._lock:
+			client_id = client.client_id
+			if self._nodes.get(client_id) is not client:
+				return
+			for connection_id, (src, dst) in list(self._links.items()):
+				if client_id in (src, dst):
+					self._unlink(connection_id)
+			in_cycle = self._sccs is not None and any(
+				client_id in scc for scc in self._sccs if len(scc) > 1)
+			del self._nodes[client_id], self._succ[client_id], self._pred[client_id]
+			if in_cycle:
+				self._invalidate_order()
+			elif self._order is not None:
+				# Removing a node never invalidates the order of the remaining nodes:
+				self._order.remove(client_id)
+				self._position = { node: index for index, node in enumerate(self._order) }
+				self._sccs.remove([ client_id ])
+			self._changed()
+
+	def _connection_added(self, connection):
+		src = connection.out_port.client_id
+		dst = connection.in_port.client_id
+		with self._lock:
+			if connection.connection_id in self._links:
+				return
+			if src in self._nodes and dst in self._nodes:
+				count = self._succ[src].get(dst, 0)
+				self._succ[src][dst] = self._pred[dst][src] = count + 1
+				if count == 0 and self._order is not None and (src == dst \
+					or self._position[src] >= self._position[dst]):
+					# The new edge contradicts the cached order, and may close a cycle.
+					self._invalidate_order()
+			elif dst in self._nodes:
+				self._entries[dst] = self._entries.get(dst, 0) + 1
+				src = None
+			elif src in self._nodes:
+				self._exits[src] = self._exits.get(src, 0) + 1
+				dst = None
+			else:
+				return
+			self._links[connection.connection_id] = (src, dst)
+			self._changed()
+
+	def _connection_removed(self, connection):
+		with self._lock:
+			if connection.connection_id in self._links:
+				self._unlink(connection.connection_id)
+				self._changed()
+
+	def _unlink(self, connection_id):
+		src, dst = self._links.pop(connection_id)
+		if src is None:
+			self._decrement(self._entries, dst)
+		elif dst is None:
+			self._decrement(self._exits, src)
+		else:
+			count = self._succ[src][dst]
+			if count > 1:
+				self._succ[src][dst] = self._pred[dst][src] = count - 1
+				return
+			del self._succ[src][dst], self._pred[dst][src]
+			if self._sccs is not None and (src == dst or any(
+				src in scc and dst in scc for scc in self._sccs if len(scc) > 1)):
+				# The removed edge may have been part of a cycle.
+				self._invalidate_order()
+
+	@staticmethod
+	def _decrement(counts, client_id):
+		if counts[client_id] > 1:
+			counts[client_id] -= 1
+		else:
+			del counts[client_id]
+
+	# -------------------------------------------------------------------
+	# Analysis
+
+	def _strongly_connected(self):
+		"""
+		Tarjan's algorithm, iterative so that long chains do not exhaust the stack.
+		Returns a list of components (lists of client_id) in reverse topological order.
+		"""
+		index, lowlink, on_stack = {}, {}, set()
+		stack, components = [], []
+		counter = 0
+		for root in self._nodes:
+			if root in index:
+				continue
+			work = [ (root, iter(self._succ[root])) ]
+			index[root] = lowlink[root] = counter
+			counter += 1
+			stack.append(root)
+			on_stack.add(root)
+			while work:
+				node, successors = work[-1]
+				for succ in successors:
+					if succ not in index:
+						index[succ] = lowlink[succ] = counter
+						counter += 1
+						stack.append(succ)
+						on_stack.add(succ)
+						work.append((succ, iter(self._succ[succ])))
+						break
+					if succ in on_stack and index[succ] < lowlink[node]:
+						lowlink[node] = index[succ]
+				else:
+					work.pop()
+					if work:
+						parent = work[-1][0]
+						if lowlink[node] < lowlink[parent]:
+							lowlink[parent] = lowlink[node]
+					if lowlink[node] == index[node]:
+						component = []
+						while True:
+							member = stack.pop()
+							on_stack.discard(member)
+							component.append(member)
+							if member == node:
+								break
+						components.append(component)
+		return components
+
+	def _ensure_order(self):
+		if self._order is None:
+			self._sccs = self._strongly_connected()
+			self._sccs.reverse()
+			self._order = [ node for scc in self._sccs for node in scc ]
+			self._position = { node: index for index, node in enumerate(self._order) }
+
+	def _condensation(self):
+		"""
+		Returns (component_of, successors) where "component_of" maps client_id to the
+		index of its strongly connected component in self._sccs, and "successors" maps
+		each component index to the set of component indexes it feeds.
+		"""
+		component_of = { node: index for index, scc in enumerate(self._sccs) for node in scc }
+		successors = { index: set() for index in range(len(self._sccs)) }
+		for src, targets in self._succ.items():
+			for dst in targets:
+				if component_of[src] != component_of[dst]:
+					successors[component_of[src]].add(component_of[dst])
+		return component_of, successors
+
+	def _clients(self, client_ids):
+		return [ self._nodes[client_id] for client_id in client_ids ]
+
+	def topological_order(self):
+		"""
+		Returns a list of PatchbayClient in an order in which they may be processed,
+		every plugin following all of the plugins which feed it.
+		The members of a feedback cycle are adjacent, in no particular order.
+		"""
+		with self._lock:
+			self._ensure_order()
+			return self._clients(self._order)
+
+	def cycles(self):
+		"""
+		Returns a list of feedback cycles, each a list of PatchbayClient.
+		"""
+		with self._lock:
+			self._ensure_order()
+			return [ self._clients(scc) for scc in self._sccs \
+				if len(scc) > 1 or scc[0] in self._succ[scc[0]] ]
+
+	def has_cycles(self):
+		"""
+		Returns boolean True if there is any feedback cycle.
+		"""
+		return bool(self.cycles())
+
+	def levels(self):
+		"""
+		Returns a list of lists of PatchbayClient. Each plugin is placed one level
+		after the deepest plugin which feeds it; the plugins in each level do not
+		depend upon one another, and may be processed concurrently.
+		(The members of a feedback cycle share a level.)
+		"""
+		with self._lock:
+			if 'levels' not in self._cached:
+				self._ensure_order()
+				component_of, successors = self._condensation()
+				depth = [ 0 ] * len(self._sccs)
+				for index in range(len(self._sccs)):
+					for succ in successors[index]:
+						if depth[index] + 1 > depth[succ]:
+							depth[succ] = depth[index] + 1
+				levels = [ [] for _ in range(max(depth) + 1 if depth else 0) ]
+				for index in range(len(self._sccs)):
+					levels[depth[index]].append(index)
+				self._cached['levels'] = levels
+			return [ self._clients(node for index in level for node in self._sccs[index]) \
+				for level in self._cached['levels'] ]
+
+	def parallelism(self):
+		"""
+		Returns (int) the largest number of plugins which may be processed concurrently.
+		(A feedback cycle counts as one, since its members must be processed in turn.)
+		"""
+		with self._lock:
+			self.levels()
+			return max((len(level) for level in self._cached['levels']), default = 0)
+
+	def longest_chain(self):
+		"""
+		Returns a list of PatchbayClient; the longest chain of plugins from a plugin fed
+		by a system client to a plugin feeding a system client. Returns an empty list if
+		no plugin path connects system inputs to system outputs.
+		"""
+		with self._lock:
+			if 'chain' not in self._cached:
+				self._ensure_order()
+				component_of, successors = self._condensation()
+				count = len(self._sccs)
+				entry = [ any(node in self._entries for node in scc) for scc in self._sccs ]
+				exit_ = [ any(node in self._exits for node in scc) for scc in self._sccs ]
+				length = [ len(scc) if entry[index] else 0 for index, scc in enumerate(self._sccs) ]
+				previous = [ None ] * count
+				for index in range(count):
+					if not length[index]:
+						continue
+					for succ in successors[index]:
+						if length[index] + len(self._sccs[succ]) > length[succ]:
+							length[succ] = length[index] + len(self._sccs[succ])
+							previous[succ] = index
+				best = max((index for index in range(count) if exit_[index] and length[index]),
+					key = lambda index: length[index], default = None)
+				chain = []
+				while best is not None:
+					chain[0:0] = self._sccs[best]
+					best = previous[best]
+				self._cached['chain'] = chain
+			return self._clients(self._cached['chain'])
+
+	def chain_depth(self):
+		"""
+		Returns (int) the number of plugins in the longest chain.
+		"""
+		return len(self.longest_chain())
+
+	def components(self):
+		"""
+		Returns a list of lists of PatchbayClient; the independent sub-graphs of
+		plugins, which share no connections with one another. (Connections through
+		system clients are not counted.) Largest first.
+		"""
+		with self._lock:
+			if 'components' not in self._cached:
+				seen, components = set(), []
+				for root in self._nodes:
+					if root in seen:
+						continue
+					seen.add(root)
+					component, pending = [], [ root ]
+					while pending:
+						node = pending.pop()
+						component.append(node)
+						for other in (*self._succ[node], *self._pred[node]):
+							if other not in seen:
+								seen.add(other)
+								pending.append(other)
+					components.append(component)
+				components.sort(key = len, reverse = True)
+				self._cached['components'] = components
+			return [ self._clients(component) for component in self._cached['components'] ]
+
+	def summary(self):
+		"""
+		Returns a dict summarizing the structure of the graph.
+		"""
+		with self._lock:
+			return {
+				'plugins'		: len(self._nodes),
+				'edges'			: sum(len(targets) for targets in self._succ.values()),
+				'cycles'		: len(self.cycles()),
+				'chain_depth'	: self.chain_depth(),
+				'levels'		: len(self.levels()),
+				'parallelism'	: self.parallelism(),
+				'components'	: len(self.components())
+			}
+
+
+#  end simple_carla/graph.py
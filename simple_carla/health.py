@@ -0,0 +1,217 @@
+#  simple_carla/health.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Engine runtime health monitoring.
+
+The HealthMonitor samples the engine's DSP load and xrun count from the engine
+idle thread, keeping a history in a ring buffer. When xruns occur, it records
+an XrunIncident listing the engine operations (plugin adds and removals,
+connections, parameter changes) issued shortly before, so that it is possible
+to tell which control actions cause dropouts.
+
+	monitor = carla.start_health_monitor(interval = 0.25, load_threshold = 75.0)
+	carla.events.subscribe(EVENT_XRUN, xrun_handler)
+	...
+	print(monitor.culprits())
+
+Events published on "carla.events":
+
+	EVENT_XRUN			(XrunIncident)			Every time new xruns are detected
+	EVENT_XRUN_BURST	(count, [XrunIncident])	"burst_count" or more xruns occurred
+												within "burst_window" seconds
+	EVENT_LOAD_HIGH		(load)					DSP load rose above "load_threshold"
+	EVENT_LOAD_NORMAL	(load)					DSP load fell back below "load_threshold"
+"""
+from collections import deque, namedtuple
+from time import perf_counter
+from simple_carla.event_bus import EVENT_XRUN, EVENT_XRUN_BURST, EVENT_LOAD_HIGH, EVENT_LOAD_NORMAL
+
+# Engine operations recorded by the host while monitoring:
+OPERATION_PLUGIN_ADD		= 'plugin_add'
+OPERATION_PLUGIN_REMOVE		= 'plugin_remove'
+OPERATION_CONNECT			= 'connect'
+OPERATION_DISCONNECT		= 'disconnect'
+OPERATION_PARAMETER			= 'parameter'
+
+HealthSample = namedtuple('HealthSample', ['time', 'load', 'xruns', 'new_xruns'])
+Operation = namedtuple('Operation', ['time', 'operation', 'details'])
+
+
+class XrunIncident:
+	"""
+	One or more xruns detected by a single sample.
+
+	Members of interest
+	-------------------
+	time:        (float)  perf_counter() time the xruns were detected
+	count:       (int)    Number of new xruns
+	load:        (float)  DSP load at the time
+	operations:  (list)   Operation tuples issued within "correlation_window" seconds
+	                      before the xruns were detected
+	-------------------
+	"""
+
+	def __init__(self, time, count, load, operations):
+		self.time = time
+		self.count = count
+		self.load = load
+		self.operations = operations
+
+	def operation_counts(self):
+		"""
+		Returns a dict of { operation: count } for the operations preceding this incident.
+		"""
+		counts = {}
+		for op in self.operations:
+			counts[op.operation] = counts.get(op.operation, 0) + 1
+		return counts
+
+	def __str__(self):
+		return f'<XrunIncident {self.count} xruns, load {self.load:.1f}% after {self.operation_counts()}>'
+
+
+class HealthMonitor:
+	"""
+	Samples engine runtime info from the engine idle thread.
+	Usually created by Carla.start_health_monitor()
+	"""
+
+	def __init__(self, carla, interval = 0.5, history = 1200, load_threshold = 80.0,
+		burst_count = 3, burst_window = 2.0, correlation_window = 1.0, max_operations = 8192):
+		"""
+		interval:			Seconds between samples.
+		history:			Number of samples kept.
+		load_threshold:		DSP load (percent) above which EVENT_LOAD_HIGH is published.
+		burst_count:		Number of xruns within "burst_window" seconds which
+							constitute a burst.
+		burst_window:		Seconds.
+		correlation_window:	Operations issued up to this many seconds before xruns are
+							detected are attached to the XrunIncident.
+		max_operations:		Number of recent engine operations kept for correlation.
+		"""
+		self.carla = carla
+		self.interval = interval
+		self.load_threshold = load_threshold
+		self.burst_count = burst_count
+		self.burst_window = burst_window
+		self.correlation_window = correlation_window
+		self.samples = deque(maxlen = history)
+		self.incidents = deque(maxlen = history)
+		self.operations = deque(maxlen = max_operations)
+		self.load_high = False
+		self._last_xruns = None
+		self._next_sample = 0.0
+
+	def start(self):
+		"""
+		Start sampling, and start recording engine operations.
+		"""
+		self.carla._operations = self.operations
+		self.carla.add_idle_hook(self.idle)
+
+	def stop(self):
+		"""
+		Stop sampling. The history is retained.
+		"""
+		self.carla.remove_idle_hook(self.idle)
+		if self.carla._operations is self.operations:
+			self.carla._operations = None
+
+	def idle(self):
+		"""
+		Called from the engine idle thread. Takes a sample if one is due.
+		"""
+		now = perf_counter()
+		if now < self._next_sample:
+			return
+		self._next_sample = now + self.interval
+		self.sample(now)
+
+	def sample(self, now = None):
+		"""
+		Read the engine's runtime info, store it, and publish any events which result.
+		"""
+		if now is None:
+			now = perf_counter()
+		info = self.carla.get_runtime_engine_info()
+		load, xruns = info['load'], info['xruns']
+		if self._last_xruns is None or xruns < self._last_xruns:
+			# First sample, or the counter was reset by clear_engine_xruns()
+			new_xruns = 0
+		else:
+			new_xruns = xruns - self._last_xruns
+		self._last_xruns = xruns
+		self.samples.append(HealthSample(now, load, xruns, new_xruns))
+		events = self.carla.events
+		if new_xruns:
+			since = now - self.interval - self.correlation_window
+			incident = XrunIncident(now, new_xruns, load,
+				[ op for op in list(self.operations) if op.time >= since ])
+			self.incidents.append(incident)
+			events.publish(EVENT_XRUN, incident)
+			recent = [ inc for inc in self.incidents if inc.time >= now - self.burst_window ]
+			count = sum(inc.count for inc in recent)
+			if count >= self.burst_count:
+				events.publish(EVENT_XRUN_BURST, count, recent)
+		if load > self.load_threshold:
+			if not self.load_high:
+				self.load_high = True
+				events.publish(EVENT_LOAD_HIGH, load)
+		elif self.load_high:
+			self.load_high = False
+			events.publish(EVENT_LOAD_NORMAL, load)
+		return self.samples[-1]
+
+	# -------------------------------------------------------------------
+	# Reporting
+
+	def culprits(self):
+		"""
+		Returns a list of (operation, incident_count, operation_count) tuples, sorted
+		by the number of xrun incidents each kind of operation preceded.
+		"""
+		incidents, totals = {}, {}
+		for incident in self.incidents:
+			for operation, count in incident.operation_counts().items():
+				incidents[operation] = incidents.get(operation, 0) + 1
+				totals[operation] = totals.get(operation, 0) + count
+		return sorted(((op, incidents[op], totals[op]) for op in incidents),
+			key = lambda row: row[1], reverse = True)
+
+	def summary(self):
+		"""
+		Returns a dict summarizing the samples in the history.
+		"""
+		samples = list(self.samples)
+		if not samples:
+			return { 'samples': 0 }
+		loads = [ sample.load for sample in samples ]
+		return {
+			'samples'		: len(samples),
+			'duration'		: samples[-1].time - samples[0].time,
+			'mean_load'		: sum(loads) / len(loads),
+			'max_load'		: max(loads),
+			'xruns'			: sum(sample.new_xruns for sample in samples),
+			'incidents'		: len(self.incidents),
+			'culprits'		: self.culprits()
+		}
+
+
+#  end simple_carla/health.py
@@ -0,0 +1,475 @@
+#  simple_carla/journal.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Crash-safe autosave; a base session snapshot plus a write-ahead journal of the
+changes made since.
+
+	journal = carla.start_journal('~/.local/state/myhost')
+	...
+	# After a crash:
+	future = carla.recover_session('~/.local/state/myhost')
+
+Every change is appended to the journal as a small record as it happens:
+parameter changes, plugin vars (active, volume, dry_wet, balance, panning),
+connections made and removed, and plugins added and removed. Each record is
+written with a single unbuffered write, so the cost of an append does not grow
+with the size of the session, and a record survives the process crashing.
+
+From time to time (every "compact_interval" seconds, or when the journal grows
+beyond "compact_bytes") the journal is folded into a new base snapshot. The
+session is encoded in the engine idle thread, and written in a background thread.
+
+Files in the journal directory:
+
+	base.scs		Session snapshot. (See simple_carla.session)
+	journal.scj		Records since the snapshot.
+	journal.old		Records being folded into a new snapshot. Only present if
+					compaction was interrupted or failed; replayed between the two.
+
+Recovery reads the snapshot and replays the journals into a model of the
+session, without touching Carla, and then loads the result in one pass with
+Carla.load_session(). A truncated or corrupted final record (from a crash
+mid-write) ends the replay.
+
+Journal records are a one-byte record type, a uint32 payload length, and the
+CRC32 of the payload, followed by the payload:
+
+	RECORD_PARAMETER		moniker, parameter_id, value
+	RECORD_VAR				moniker, var name, value
+	RECORD_CONNECT			source client, source port, target client, target port
+	RECORD_DISCONNECT		source client, source port, target client, target port
+	RECORD_PLUGIN_ADDED		plugin saved state
+	RECORD_PLUGIN_REMOVED	moniker
+	RECORD_CHUNK			moniker, chunk
+"""
+import io, logging, os, shutil, struct, threading
+from time import perf_counter
+from zlib import crc32
+from simple_carla.event_bus import (
+	EVENT_CONNECTION_ADDED, EVENT_CONNECTION_REMOVED, EVENT_PLUGIN_READY, EVENT_PLUGIN_REMOVED
+)
+from simple_carla.session import (
+	SessionReader, SessionWriter, save_session, encode_value, decode_value,
+	encode_plugin_state, decode_plugin_state, RECORD_HEADER, RECORD_PLUGIN, RECORD_CONNECTION
+)
+
+BASE_FILENAME			= 'base.scs'
+JOURNAL_FILENAME		= 'journal.scj'
+OLD_JOURNAL_FILENAME	= 'journal.old'
+
+COMPACT_RETRY_DELAY		= 30.0	# Seconds to wait after a compaction fails
+
+JOURNAL_MAGIC			= b'SCJRNL\x00'
+
+RECORD_PARAMETER		= 0x70	# 'p'
+RECORD_VAR				= 0x76	# 'v'
+RECORD_CONNECT			= 0x63	# 'c'
+RECORD_DISCONNECT		= 0x64	# 'd'
+RECORD_PLUGIN_ADDED		= 0x61	# 'a'
+RECORD_PLUGIN_REMOVED	= 0x72	# 'r'
+RECORD_CHUNK			= 0x6B	# 'k'
+
+_RECORD = struct.Struct('<BII')
+
+
+# -------------------------------------------------------------------
+# Reading
+
+def read_journal(fob):
+	"""
+	Yields (record type, payload memoryview) for each intact record in the journal
+	file object "fob". Stops at the first truncated or corrupted record.
+	"""
+	if fob.read(len(JOURNAL_MAGIC)) != JOURNAL_MAGIC:
+		raise ValueError('Not a simple_carla journal')
+	data = memoryview(fob.read())
+	pos, end = 0, len(data)
+	while pos + _RECORD.size <= end:
+		record_type, length, checksum = _RECORD.unpack_from(data, pos)
+		pos += _RECORD.size
+		payload = data[pos:pos + length]
+		if len(payload) != length or crc32(payload) != checksum:
+			logging.warning('Journal ends with an incomplete record at offset %d', pos - _RECORD.size)
+			return
+		pos += length
+		yield record_type, payload
+
+
+class SessionModel:
+	"""
+	A model of a session - plugin saved states and connection names - which
+	journal records are replayed into.
+	"""
+
+	def __init__(self):
+		self.info = {}
+		self.plugins = {}		# Saved state dict, indexed on moniker (in order added)
+		self.connections = {}	# (source client, source port, target client, target port): None
+		self.records = 0
+
+	def load_base(self, fob):
+		for record_type, data in SessionReader(fob):
+			if record_type == RECORD_PLUGIN:
+				self.plugins[data['vars']['moniker']] = data
+			elif record_type == RECORD_CONNECTION:
+				self.connections[data] = None
+			elif record_type == RECORD_HEADER:
+				self.info = data
+
+	def replay(self, fob):
+		"""
+		Apply every intact record of the journal file object "fob".
+		"""
+		plugins, connections = self.plugins, self.connections
+		for record_type, payload in read_journal(fob):
+			self.records += 1
+			if record_type == RECORD_PARAMETER:
+				moniker, pos = decode_value(payload, 0)
+				parameter_id, pos = decode_value(payload, pos)
+				value = decode_value(payload, pos)[0]
+				if moniker in plugins:
+					plugins[moniker]['parameters'][parameter_id] = value
+			elif record_type == RECORD_VAR:
+				moniker, pos = decode_value(payload, 0)
+				key, pos = decode_value(payload, pos)
+				value = decode_value(payload, pos)[0]
+				if moniker in plugins:
+					plugins[moniker]['vars'][key] = value
+			elif record_type == RECORD_CONNECT or record_type == RECORD_DISCONNECT:
+				names, pos = [], 0
+				for _ in range(4):
+					name, pos = decode_value(payload, pos)
+					names.append(name)
+				if record_type == RECORD_CONNECT:
+					connections[tuple(names)] = None
+				else:
+					connections.pop(tuple(names), None)
+			elif record_type == RECORD_PLUGIN_ADDED:
+				state = decode_plugin_state(payload, 0)[0]
+				# May already be in a snapshot taken after the record was written:
+				plugins.setdefault(state['vars']['moniker'], state)
+			elif record_type == RECORD_PLUGIN_REMOVED:
+				plugins.pop(decode_value(payload, 0)[0], None)
+			elif record_type == RECORD_CHUNK:
+				moniker, pos = decode_value(payload, 0)
+				if moniker in plugins:
+					plugins[moniker]['chunk'] = decode_value(payload, pos)[0]
+			else:
+				logging.debug('Skipping unknown journal record type 0x%02x', record_type)
+
+	def write_session(self, fob):
+		"""
+		Write the model as a session to the binary file object "fob".
+		"""
+		writer = SessionWriter(fob)
+		writer.write_header(dict(self.info, plugins = len(self.plugins),
+			connections = len(self.connections)))
+		for state in self.plugins.values():
+			writer.write_plugin(state)
+		for names in self.connections:
+			writer.write_connection(*names)
+		writer.close()
+
+
+def recover(directory):
+	"""
+	Returns a SessionModel built from the snapshot and journals in "directory".
+	Raises FileNotFoundError if there is no snapshot.
+	"""
+	model = SessionModel()
+	with open(os.path.join(directory, BASE_FILENAME), 'rb') as fob:
+		model.load_base(fob)
+	for filename in (OLD_JOURNAL_FILENAME, JOURNAL_FILENAME):
+		path = os.path.join(directory, filename)
+		if os.path.exists(path):
+			with open(path, 'rb') as fob:
+				model.replay(fob)
+	return model
+
+
+# -------------------------------------------------------------------
+# Writing
+
+class Journal:
+	"""
+	Appends changes to a journal, and compacts it into a snapshot from time to time.
+	Usually created by Carla.start_journal()
+	"""
+
+	def __init__(self, carla, directory, compact_interval = 300.0, compact_bytes = 4 * 1024 * 1024,
+		sync_interval = 1.0):
+		"""
+		directory:			Where to keep the snapshot and journal. Created if necessary.
+		compact_interval:	Seconds between compactions.
+		compact_bytes:		Compact as soon as the journal grows beyond this size.
+		sync_interval:		Seconds between calls to fsync(). 0 to sync after every record.
+							(Records survive a crash of this process as soon as they are
+							written; syncing protects them from a crash of the system.)
+		"""
+		self.carla = carla
+		self.directory = os.path.expanduser(directory)
+		self.compact_interval = compact_interval
+		self.compact_bytes = compact_bytes
+		self.sync_interval = sync_interval
+		self.records = 0
+		self.bytes_written = 0
+		self.compactions = 0
+		self._lock = threading.Lock()
+		self._fd = None
+		self._journal_bytes = 0
+		self._unsynced = False
+		self._next_sync = 0.0
+		self._next_compaction = 0.0
+		self._retry_compaction = 0.0
+		self._compactor = None
+		self._pending_chunks = []
+		self._subscriptions = []
+
+	def start(self):
+		"""
+		Write a snapshot of the current session, start a new journal, and start
+		recording changes.
+		"""
+		os.makedirs(self.directory, exist_ok = True)
+		self._open_journal()
+		events = self.carla.events
+		self._subscriptions = [
+			events.subscribe(EVENT_CONNECTION_ADDED, self._connection_added, synchronous = True, weak = False),
+			events.subscribe(EVENT_CONNECTION_REMOVED, self._connection_removed, synchronous = True, weak = False),
+			events.subscribe(EVENT_PLUGIN_READY, self._plugin_ready, synchronous = True, weak = False),
+			events.subscribe(EVENT_PLUGIN_REMOVED, self._plugin_removed, synchronous = True, weak = False)
+		]
+		self.carla.add_state_listener(self._state_changed)
+		self.compact()
+		self.carla.add_idle_hook(self.idle)
+
+	def stop(self):
+		"""
+		Stop recording changes, and close the journal. The files are left in place.
+		"""
+		self.carla.remove_idle_hook(self.idle)
+		self.carla.remove_state_listener(self._state_changed)
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+		self._subscriptions = []
+		# The compaction thread clears "_compactor" when it finishes:
+		compactor = self._compactor
+		if compactor is not None:
+			compactor.join()
+		with self._lock:
+			if self._fd is not None:
+				os.fsync(self._fd)
+				os.close(self._fd)
+				self._fd = None
+
+	def _path(self, filename):
+		return os.path.join(self.directory, filename)
+
+	def _open_journal(self, truncate = True):
+		path = self._path(JOURNAL_FILENAME)
+		if truncate or not os.path.exists(path):
+			self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+			os.write(self._fd, JOURNAL_MAGIC)
+			self._journal_bytes = len(JOURNAL_MAGIC)
+		else:
+			self._fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+			self._journal_bytes = os.fstat(self._fd).st_size
+
+	def append(self, record_type, payload):
+		"""
+		Append a single record. Called from whichever thread made the change.
+		"""
+		record = _RECORD.pack(record_type, len(payload), crc32(payload)) + payload
+		with self._lock:
+			if self._fd is None:
+				return
+			os.write(self._fd, record)
+			if self.sync_interval == 0:
+				os.fsync(self._fd)
+			else:
+				self._unsynced = True
+			self._journal_bytes += len(record)
+			self.records += 1
+			self.bytes_written += len(record)
+
+	# -------------------------------------------------------------------
+	# Change listeners
+
+	def _state_changed(self, plugin, key, value):
+		payload = bytearray()
+		encode_value(plugin.moniker, payload)
+		encode_value(key, payload)
+		encode_value(value, payload)
+		self.append(RECORD_PARAMETER if type(key) is int else RECORD_VAR, payload)
+
+	def _connection(self, record_type, connection):
+		try:
+			state = connection.encode_saved_state()
+		except KeyError:
+			return	# Client already removed
+		payload = bytearray()
+		for name in (state['source']['client'], state['source']['port'],
+			state['target']['client'], state['target']['port']):
+			encode_value(name, payload)
+		self.append(record_type, payload)
+
+	def _connection_added(self, connection):
+		self._connection(RECORD_CONNECT, connection)
+
+	def _connection_removed(self, connection):
+		self._connection(RECORD_DISCONNECT, connection)
+
+	def _plugin_ready(self, plugin):
+		# The engine lock is held; chunk data is requested later, from idle()
+		payload = bytearray()
+		encode_plugin_state(plugin.encode_saved_state(include_chunk = False), payload)
+		self.append(RECORD_PLUGIN_ADDED, payload)
+		if getattr(plugin, 'use_chunks', False):
+			self._pending_chunks.append(plugin)
+
+	def _plugin_removed(self, plugin):
+		payload = bytearray()
+		encode_value(plugin.moniker, payload)
+		self.append(RECORD_PLUGIN_REMOVED, payload)
+
+	# -------------------------------------------------------------------
+	# Housekeeping
+
+	def idle(self):
+		"""
+		Called from the engine idle thread. Records chunk data of newly added plugins,
+		syncs the journal, and starts compaction when due.
+		"""
+		while self._pending_chunks:
+			plugin = self._pending_chunks.pop(0)
+			if plugin.plugin_id is None or plugin.removing_from_carla:
+				continue
+			payload = bytearray()
+			encode_value(plugin.moniker, payload)
+			encode_value(self.carla.get_chunk_data(plugin.plugin_id), payload)
+			self.append(RECORD_CHUNK, payload)
+		now = perf_counter()
+		if self._unsynced and now >= self._next_sync:
+			self._next_sync = now + self.sync_interval
+			with self._lock:
+				if self._fd is not None:
+					os.fsync(self._fd)
+				self._unsynced = False
+		if self._compactor is None and now >= self._retry_compaction and \
+			(now >= self._next_compaction or self._journal_bytes > self.compact_bytes):
+			self._start_compaction()
+
+	def _start_compaction(self):
+		try:
+			snapshot = self._take_snapshot()
+		except Exception as e:
+			logging.exception(e)
+			self._compaction_failed()
+			return
+		self._compactor = threading.Thread(target = self._compact_in_background,
+			args = (snapshot,), name = 'simple_carla_journal', daemon = True)
+		self._compactor.start()
+
+	def _compact_in_background(self, snapshot):
+		try:
+			self._write_snapshot(snapshot)
+		except Exception as e:
+			logging.exception(e)
+			self._compaction_failed()
+		finally:
+			self._compactor = None
+
+	def _compaction_failed(self):
+		# Retry later, rather than on every idle tick:
+		self._retry_compaction = perf_counter() + COMPACT_RETRY_DELAY
+
+	def compact(self):
+		"""
+		Fold the journal into a new snapshot.
+
+		The journal is first set aside, so that changes made while the snapshot is
+		being written go to a new journal. The snapshot is written to a temporary file
+		and renamed over the old one; only then is the old journal removed.
+		"""
+		self._write_snapshot(self._take_snapshot())
+
+	def _take_snapshot(self):
+		"""
+		Set the journal aside, start a new one, and return the encoded session.
+		Called from the engine idle thread, (or the thread which called compact()),
+		so that plugin chunk data is not requested from the compaction thread.
+		"""
+		self._set_aside()
+		fob = io.BytesIO()
+		save_session(self.carla, fob, mark_clean = False)
+		return fob.getvalue()
+
+	def _set_aside(self):
+		"""
+		Move the journal to the old journal. If an old journal was left by a compaction
+		which failed, its records have not been folded into the snapshot yet, and the
+		journal is appended to it instead.
+		"""
+		journal, old_journal = self._path(JOURNAL_FILENAME), self._path(OLD_JOURNAL_FILENAME)
+		with self._lock:
+			fd, self._fd = self._fd, None
+			try:
+				os.fsync(fd)
+				os.close(fd)
+				if os.path.exists(old_journal):
+					with open(journal, 'rb') as src, open(old_journal, 'ab') as dst:
+						src.seek(len(JOURNAL_MAGIC))
+						shutil.copyfileobj(src, dst)
+						dst.flush()
+						os.fsync(dst.fileno())
+				else:
+					os.replace(journal, old_journal)
+			except Exception:
+				# Keep appending to the journal where it is:
+				self._open_journal(truncate = False)
+				raise
+			self._open_journal()
+			self._unsynced = False
+
+	def _write_snapshot(self, snapshot):
+		start = perf_counter()
+		temp = self._path(BASE_FILENAME + '.tmp')
+		with open(temp, 'wb') as fob:
+			fob.write(snapshot)
+			fob.flush()
+			os.fsync(fob.fileno())
+		os.replace(temp, self._path(BASE_FILENAME))
+		os.unlink(self._path(OLD_JOURNAL_FILENAME))
+		self.compactions += 1
+		self._next_compaction = perf_counter() + self.compact_interval
+		logging.debug('Journal compacted in %.3fs', perf_counter() - start)
+
+
+def recovered_session(directory):
+	"""
+	Returns a binary file object containing the session recovered from "directory".
+	"""
+	fob = io.BytesIO()
+	recover(directory).write_session(fob)
+	fob.seek(0)
+	return fob
+
+
+#  end simple_carla/journal.py
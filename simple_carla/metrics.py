@@ -0,0 +1,223 @@
+#  simple_carla/metrics.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Exports host statistics in the Prometheus text exposition format, over HTTP on
+a localhost port, or over a Unix domain socket.
+
+	exporter = carla.start_metrics(port = 9105)
+	# curl http://127.0.0.1:9105/metrics
+	...
+	carla.stop_metrics()
+
+The metrics text is rebuilt from the engine idle thread every "interval"
+seconds. Scrapes only return the most recent snapshot; they never call into
+Carla nor take the engine lock.
+"""
+import logging, os, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn, UnixStreamServer
+from time import perf_counter
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+
+	def do_GET(self):
+		if self.path.split('?')[0] not in ('/', '/metrics'):
+			self.send_error(404)
+			return
+		body = self.server.exporter.text.encode('utf-8')
+		self.send_response(200)
+		self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+		self.send_header('Content-Length', str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def address_string(self):
+		return str(self.client_address[0]) if self.client_address else 'unix'
+
+	def log_message(self, format, *args):
+		logging.debug('metrics: ' + format, *args)
+
+
+class _ThreadingUnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+
+	daemon_threads = True
+
+
+def _escape(value):
+	return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsExporter:
+	"""
+	Keeps a snapshot of host statistics and serves it to scrapers.
+	Usually created by Carla.start_metrics()
+	"""
+
+	def __init__(self, carla, port = 9105, host = '127.0.0.1', unix_socket = None, interval = 1.0):
+		"""
+		port:			TCP port to listen on. Ignored if "unix_socket" is given.
+		host:			Address to bind to. Defaults to localhost only.
+		unix_socket:	Path of a Unix domain socket to listen on instead of TCP.
+		interval:		Seconds between snapshots.
+		"""
+		self.carla = carla
+		self.port = port
+		self.host = host
+		self.unix_socket = unix_socket
+		self.interval = interval
+		self.text = ''
+		self._server = None
+		self._thread = None
+		self._next_snapshot = 0.0
+		self._last_counts = {}
+		self._last_snapshot_time = None
+		self._max_tick = 0.0
+		self._max_lock_wait = 0.0
+
+	def start(self):
+		"""
+		Start collecting snapshots and serving them.
+		"""
+		self.carla._callback_counts = {}
+		self.carla.add_idle_hook(self.idle)
+		if self.unix_socket is None:
+			self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+			self.port = self._server.server_address[1]
+		else:
+			if os.path.exists(self.unix_socket):
+				os.unlink(self.unix_socket)
+			self._server = _ThreadingUnixHTTPServer(self.unix_socket, _MetricsHandler)
+		self._server.exporter = self
+		self._thread = threading.Thread(target = self._server.serve_forever,
+			name = 'simple_carla_metrics', daemon = True)
+		self._thread.start()
+
+	def stop(self):
+		"""
+		Stop serving and collecting.
+		"""
+		self.carla.remove_idle_hook(self.idle)
+		self.carla._callback_counts = None
+		if self._server is not None:
+			self._server.shutdown()
+			self._server.server_close()
+			self._server = None
+			if self.unix_socket is not None and os.path.exists(self.unix_socket):
+				os.unlink(self.unix_socket)
+
+	def idle(self):
+		"""
+		Called from the engine idle thread after every tick. Tracks the slowest idle
+		tick, and rebuilds the snapshot when due.
+		"""
+		lock_wait, tick = self.carla.last_idle_tick
+		if tick > self._max_tick:
+			self._max_tick = tick
+		if lock_wait > self._max_lock_wait:
+			self._max_lock_wait = lock_wait
+		now = perf_counter()
+		if now >= self._next_snapshot:
+			self._next_snapshot = now + self.interval
+			try:
+				self.text = self.snapshot(now)
+			finally:
+				self._max_tick = self._max_lock_wait = 0.0
+
+	def snapshot(self, now = None):
+		"""
+		Returns the current metrics as (str) text in the Prometheus exposition format.
+		"""
+		if now is None:
+			now = perf_counter()
+		carla = self.carla
+		lines = []
+
+		def metric(name, mtype, help_text, samples):
+			lines.append(f'# HELP simple_carla_{name} {help_text}')
+			lines.append(f'# TYPE simple_carla_{name} {mtype}')
+			for labels, value in samples:
+				if labels:
+					label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+					lines.append(f'simple_carla_{name}{{{label_text}}} {value}')
+				else:
+					lines.append(f'simple_carla_{name} {value}')
+
+		plugins = carla.plugins()
+		clients = carla.clients()
+		metric('plugins', 'gauge', 'Number of plugins loaded', [({}, len(plugins))])
+		metric('clients', 'gauge', 'Number of patchbay clients', [({}, len(clients))])
+		metric('ports', 'gauge', 'Number of patchbay ports',
+			[({}, sum(len(client.ports) for client in clients))])
+		metric('connections', 'gauge', 'Number of patchbay connections', [({}, len(carla._connections))])
+
+		counts = carla.callback_counts()
+		metric('callbacks_total', 'counter', 'Engine callbacks received, by action',
+			[({ 'action': action }, count) for action, count in sorted(counts.items())])
+		if self._last_snapshot_time is not None:
+			elapsed = now - self._last_snapshot_time
+			metric('callback_rate', 'gauge', 'Engine callbacks per second since the previous snapshot',
+				[({ 'action': action }, (count - self._last_counts.get(action, 0)) / elapsed)
+				for action, count in sorted(counts.items())])
+		self._last_counts = counts
+		self._last_snapshot_time = now
+
+		lock_wait, tick = carla.last_idle_tick
+		metric('idle_tick_seconds', 'gauge', 'Duration of the most recent engine idle tick', [({}, tick)])
+		metric('idle_tick_max_seconds', 'gauge', 'Longest engine idle tick since the previous snapshot',
+			[({}, self._max_tick)])
+		metric('idle_lock_wait_max_seconds', 'gauge',
+			'Longest wait for the engine lock by the idle thread since the previous snapshot',
+			[({}, self._max_lock_wait)])
+		metric('delivery_queue_depth', 'gauge', 'User notifications waiting to be delivered',
+			[({}, carla.delivery.queue_depth)])
+
+		info = carla.get_runtime_engine_info()
+		metric('dsp_load_percent', 'gauge', 'Engine DSP load', [({}, info['load'])])
+		metric('xruns', 'gauge', 'Engine xrun count', [({}, info['xruns'])])
+
+		peaks = []
+		for plugin in plugins:
+			if plugin.plugin_id is None:
+				continue
+			for direction, getter in (('in', carla.get_input_peak_value), ('out', carla.get_output_peak_value)):
+				for channel, is_left in (('left', True), ('right', False)):
+					peaks.append(({ 'plugin': plugin.moniker, 'direction': direction, 'channel': channel },
+						getter(plugin.plugin_id, is_left)))
+		metric('plugin_peak', 'gauge', 'Plugin peak level', peaks)
+
+		pool = carla.pool
+		if pool is not None:
+			stats = pool.stats()
+			metric('pool_hits_total', 'counter', 'Plugins handed out from the pool', [({}, stats['hits'])])
+			metric('pool_misses_total', 'counter', 'Plugins requested when none were idle in the pool',
+				[({}, stats['misses'])])
+			metric('pool_idle', 'gauge', 'Idle plugin instances in the pool', [({}, stats['idle'])])
+			metric('pool_loading', 'gauge', 'Plugin instances loading into the pool', [({}, stats['loading'])])
+			if stats['ready_time_mean'] is not None:
+				metric('pool_ready_seconds_mean', 'gauge', 'Mean time for pooled instances to become ready',
+					[({}, stats['ready_time_mean'])])
+				metric('pool_ready_seconds_max', 'gauge', 'Longest time for pooled instances to become ready',
+					[({}, stats['ready_time_max'])])
+		lines.append('')
+		return '\n'.join(lines)
+
+
+#  end simple_carla/metrics.py
@@ -0,0 +1,379 @@
+#  simple_carla/mixer.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Mixer groups: named groups of plugins with a group gain, pan and mute, acting
+like VCA faders on the plugins' own volume and panning.
+
+	mixer = Mixer(carla)
+	pads = mixer.add_group('pads', [ strings, choir ])
+	everything = mixer.add_group('all', carla.plugins())
+	pads.gain = -6.0			# dB, relative to each plugin's own volume
+	everything.fade_gain(-90.0, 4.0)	# Fade out over 4 seconds
+	pads.pan = -0.25			# Offset added to each plugin's own panning
+	pads.muted = True
+
+A plugin may be in any number of groups. Its volume is its own ("base") volume
+multiplied by the gain of every group it is in, and zero if any of its groups is
+muted. Its panning (or balance, for stereo plugins) is its own plus the pan
+offsets of its groups. The mixer holds base values and group settings in arrays,
+computes every plugin's resulting values at once, and sends only the values
+which changed to Carla, in one batch. (See Carla.apply_plugin_states)
+
+Once a plugin is in a group, the mixer owns its volume, panning and balance. Use
+"Mixer.set_base" rather than setting them on the plugin directly.
+
+Fades are stepped from the engine idle thread after every tick.
+"""
+import logging, threading
+from time import perf_counter
+from numpy import array, clip, flatnonzero, power, where, zeros
+
+MIN_DB = -90.0		# Gain treated as silence when fading from -inf
+
+_OUTPUT_KEYS = ('volume', 'panning', 'balance_left', 'balance_right')
+
+
+class MixerGroup:
+	"""
+	A handle on a group kept by a Mixer. Usually created by Mixer.add_group()
+	"""
+
+	def __init__(self, mixer, name):
+		self.mixer = mixer
+		self.name = name
+
+	@property
+	def plugins(self):
+		"""
+		Returns list of the Plugins in this group.
+		"""
+		return self.mixer.members(self.name)
+
+	def add(self, plugin):
+		self.mixer.add_to_group(self.name, plugin)
+
+	def remove(self, plugin):
+		self.mixer.remove_from_group(self.name, plugin)
+
+	@property
+	def gain(self):
+		"""
+		Group gain in dB.
+		"""
+		return self.mixer.gain(self.name)
+
+	@gain.setter
+	def gain(self, value):
+		self.mixer.set_gain(self.name, value)
+
+	def fade_gain(self, value, duration):
+		self.mixer.set_gain(self.name, value, duration)
+
+	@property
+	def pan(self):
+		"""
+		Group pan offset, -1.0 to 1.0.
+		"""
+		return self.mixer.pan(self.name)
+
+	@pan.setter
+	def pan(self, value):
+		self.mixer.set_pan(self.name, value)
+
+	def fade_pan(self, value, duration):
+		self.mixer.set_pan(self.name, value, duration)
+
+	@property
+	def muted(self):
+		return self.mixer.is_muted(self.name)
+
+	@muted.setter
+	def muted(self, value):
+		self.mixer.set_muted(self.name, value)
+
+	def __str__(self):
+		return f'<MixerGroup "{self.name}">'
+
+
+class Mixer:
+	"""
+	Keeps mixer groups, and applies them to their plugins.
+	"""
+
+	def __init__(self, carla):
+		self.carla = carla
+		self._lock = threading.RLock()
+		self._names = []			# Group names; row index of group arrays
+		self._plugins = []			# Member Plugins; column index of plugin arrays
+		self._membership = zeros((0, 0), dtype = bool)
+		self._gain_db = zeros(0)
+		self._pan = zeros(0)
+		self._muted = zeros(0, dtype = bool)
+		self._base = zeros((4, 0))	# volume, panning, balance_left, balance_right per plugin
+		self._capable = zeros((4, 0), dtype = bool)
+		self._pushed = zeros((4, 0))
+		self._fades = {}			# { (group row, "gain" or "pan"): (start time, duration, from, to) }
+
+	# -------------------------------------------------------------------
+	# Groups and members
+
+	def add_group(self, name, plugins = ()):
+		"""
+		Create a group. Returns its MixerGroup handle.
+		"""
+		with self._lock:
+			if name in self._names:
+				raise ValueError(f'Mixer group "{name}" already exists')
+			self._names.append(name)
+			self._membership = self._resized(self._membership, len(self._names), len(self._plugins))
+			self._gain_db = self._extended(self._gain_db, 0.0)
+			self._pan = self._extended(self._pan, 0.0)
+			self._muted = self._extended(self._muted, False)
+			for plugin in plugins:
+				self._add_member(name, plugin)
+			self._push()
+		return MixerGroup(self, name)
+
+	def remove_group(self, name):
+		"""
+		Remove a group. Its plugins return to their base values, unless in other groups.
+		"""
+		with self._lock:
+			row = self._names.index(name)
+			self._fades = { (fade_row - (fade_row > row), what): fade
+				for (fade_row, what), fade in self._fades.items() if fade_row != row }
+			del self._names[row]
+			keep = [ index for index in range(len(self._gain_db)) if index != row ]
+			self._membership = self._membership[keep]
+			self._gain_db = self._gain_db[keep]
+			self._pan = self._pan[keep]
+			self._muted = self._muted[keep]
+			self._push()
+
+	def group(self, name):
+		"""
+		Returns the MixerGroup handle of an existing group.
+		"""
+		if name not in self._names:
+			raise KeyError(name)
+		return MixerGroup(self, name)
+
+	def groups(self):
+		"""
+		Returns list of MixerGroup.
+		"""
+		return [ MixerGroup(self, name) for name in self._names ]
+
+	def members(self, name):
+		"""
+		Returns list of the Plugins in the named group.
+		"""
+		with self._lock:
+			row = self._names.index(name)
+			return [ self._plugins[column] for column in flatnonzero(self._membership[row]) ]
+
+	def add_to_group(self, name, plugin):
+		"""
+		Add a plugin to a group. The first time a plugin is added to any group, its
+		current volume, panning and balance become its base values.
+		"""
+		with self._lock:
+			self._add_member(name, plugin)
+			self._push()
+
+	def remove_from_group(self, name, plugin):
+		with self._lock:
+			row = self._names.index(name)
+			self._membership[row, self._plugins.index(plugin)] = False
+			self._push()
+
+	def set_base(self, plugin, volume = None, panning = None, balance_left = None, balance_right = None):
+		"""
+		Set a member plugin's own volume, panning or balance, to which group settings
+		are applied.
+		"""
+		with self._lock:
+			column = self._plugins.index(plugin)
+			for row, value in enumerate((volume, panning, balance_left, balance_right)):
+				if value is not None:
+					self._base[row, column] = value
+			self._push()
+
+	def _add_member(self, name, plugin):
+		row = self._names.index(name)
+		if plugin not in self._plugins:
+			self._plugins.append(plugin)
+			column = len(self._plugins) - 1
+			self._membership = self._resized(self._membership, len(self._names), len(self._plugins))
+			base = [ plugin.volume, plugin.panning, plugin.balance_left, plugin.balance_right ]
+			base = [ default if value is None else value
+				for value, default in zip(base, (1.0, 0.0, -1.0, 1.0)) ]
+			self._base = self._resized(self._base, 4, len(self._plugins))
+			self._base[:, column] = base
+			self._pushed = self._resized(self._pushed, 4, len(self._plugins))
+			self._pushed[:, column] = base
+			self._capable = self._resized(self._capable, 4, len(self._plugins))
+			self._capable[:, column] = (plugin.can_volume, plugin.can_pan,
+				plugin.can_balance, plugin.can_balance)
+		self._membership[row, self._plugins.index(plugin)] = True
+
+	def _prune(self):
+		# Forget plugins which have been removed from Carla.
+		keep = [ column for column, plugin in enumerate(self._plugins)
+			if not plugin.removing_from_carla ]
+		if len(keep) < len(self._plugins):
+			self._plugins = [ self._plugins[column] for column in keep ]
+			self._membership = self._membership[:, keep]
+			self._base = self._base[:, keep]
+			self._pushed = self._pushed[:, keep]
+			self._capable = self._capable[:, keep]
+
+	@staticmethod
+	def _resized(old, rows, columns):
+		new = zeros((rows, columns), dtype = old.dtype)
+		new[:old.shape[0], :old.shape[1]] = old
+		return new
+
+	@staticmethod
+	def _extended(old, value):
+		new = zeros(len(old) + 1, dtype = old.dtype)
+		new[:-1] = old
+		new[-1] = value
+		return new
+
+	# -------------------------------------------------------------------
+	# Group settings
+
+	def gain(self, name):
+		return float(self._gain_db[self._names.index(name)])
+
+	def set_gain(self, name, value, fade = 0.0):
+		"""
+		Set a group's gain in dB, immediately or over "fade" seconds.
+		"""
+		self._set(name, 'gain', self._gain_db, value, fade)
+
+	def pan(self, name):
+		return float(self._pan[self._names.index(name)])
+
+	def set_pan(self, name, value, fade = 0.0):
+		"""
+		Set a group's pan offset (-1.0 to 1.0), immediately or over "fade" seconds.
+		"""
+		self._set(name, 'pan', self._pan, value, fade)
+
+	def is_muted(self, name):
+		return bool(self._muted[self._names.index(name)])
+
+	def set_muted(self, name, value):
+		with self._lock:
+			self._muted[self._names.index(name)] = value
+			self._push()
+
+	def mute(self, name):
+		self.set_muted(name, True)
+
+	def unmute(self, name):
+		self.set_muted(name, False)
+
+	def _set(self, name, what, values, value, fade):
+		with self._lock:
+			row = self._names.index(name)
+			if fade > 0.0:
+				start = max(float(values[row]), MIN_DB) if what == 'gain' else float(values[row])
+				if not self._fades:
+					self.carla.add_idle_hook(self._fade_tick)
+				self._fades[(row, what)] = (perf_counter(), fade, start, max(value, MIN_DB) \
+					if what == 'gain' else value)
+			else:
+				self._fades.pop((row, what), None)
+				values[row] = value
+				self._push()
+
+	@property
+	def fading(self):
+		"""
+		Returns True if any group fade is in progress.
+		"""
+		return bool(self._fades)
+
+	def _fade_tick(self):
+		with self._lock:
+			now = perf_counter()
+			for (row, what), (start, duration, begin, end) in list(self._fades.items()):
+				position = min(1.0, (now - start) / duration)
+				values = self._gain_db if what == 'gain' else self._pan
+				values[row] = begin + (end - begin) * position
+				if position >= 1.0:
+					del self._fades[(row, what)]
+			if not self._fades:
+				self.carla.remove_idle_hook(self._fade_tick)
+			self._push()
+
+	# -------------------------------------------------------------------
+	# Output
+
+	def values(self):
+		"""
+		Returns an array of shape (4, plugins) holding the volume, panning, balance_left
+		and balance_right resulting from the current group settings, in the order of
+		"plugins()".
+		"""
+		with self._lock:
+			return self._values()
+
+	def plugins(self):
+		"""
+		Returns list of all Plugins in any group.
+		"""
+		return list(self._plugins)
+
+	def _values(self):
+		membership = self._membership.T		# (plugins, groups)
+		# Summed with where() rather than a product, as 0 * -inf (not a member of a
+		# group at -inf dB) is nan:
+		gain = power(10.0, where(membership, self._gain_db, 0.0).sum(axis = 1) / 20.0)
+		muted = (membership @ self._muted) > 0
+		offset = membership @ self._pan
+		return array([
+			clip(self._base[0] * gain * ~muted, 0.0, 1.0),
+			clip(self._base[1] + offset, -1.0, 1.0),
+			clip(self._base[2] + offset, -1.0, 1.0),
+			clip(self._base[3] + offset, -1.0, 1.0)
+		])
+
+	def _push(self):
+		self._prune()
+		if not self._plugins:
+			return
+		values = self._values()
+		changed = (values != self._pushed) & self._capable
+		changes = [ (self._plugins[column], _OUTPUT_KEYS[row], float(values[row, column]))
+			for row, column in zip(*changed.nonzero()) ]
+		if changes:
+			try:
+				self.carla.apply_plugin_states(changes)
+			except Exception as e:
+				logging.error('Mixer failed to apply %d changes: %s', len(changes), e)
+			else:
+				self._pushed = values
+
+
+#  end simple_carla/mixer.py
@@ -8,7 +8,7 @@ Provides a means to use Carla's plugin dialog to compile a plugin's
 loading the plugin.
 """
 import sys, os
-from simple_carla import carla_binaries_path
+from simple_carla.backend import carla_binaries_path
 from carla_frontend import CarlaFrontendLib
 from carla_shared import DLL_EXTENSION
 from resources_rc import qCleanupResources
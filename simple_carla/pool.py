@@ -0,0 +1,274 @@
+#  simple_carla/pool.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Keeps preloaded, idle instances of plugins, so that they may be handed out
+without waiting for them to load.
+
+	pool = carla.start_pool(size = 2)
+	pool.reserve(sampler_def)
+	...
+	plugin = pool.acquire(sampler_def, saved_state = patch['sampler'])
+	if plugin.is_ready:
+		connect_it(plugin)		# A "hit"; the plugin is ready now
+	else:
+		plugin.on_ready(connect_it)	# A "miss"; loading as usual
+
+Reserved plugins are loaded in a background thread, and when ready are
+deactivated and disconnected, and kept idle. "acquire" hands out an idle
+instance if there is one, either resetting its parameters and activating it, or
+applying the given saved state. The pool is then topped up in the background.
+
+Idle instances are ordinary plugins as far as Carla is concerned; they are
+included in Carla.plugins() and in saved sessions. Call "clear()" before saving
+a session if that is not wanted.
+"""
+import logging, threading
+from collections import deque
+from queue import Queue
+from time import perf_counter
+from simple_carla.event_bus import EVENT_PLUGIN_READY, EVENT_PLUGIN_REMOVED
+
+READY_TIMES_KEPT = 100
+
+
+def plugin_key(plugin_def):
+	"""
+	Returns a hashable key identifying the plugin a plugin_def describes.
+	"""
+	return (plugin_def['build'], plugin_def['type'], plugin_def['filename'],
+		plugin_def['label'], int(plugin_def['uniqueId'] or 0))
+
+
+class PluginPool:
+	"""
+	Preloads instances of reserved plugins. Usually created by Carla.start_pool()
+	"""
+
+	def __init__(self, carla, plugin_class, size = 1):
+		"""
+		plugin_class:	Class used to create plugins. (Plugin or a subclass)
+		size:			Number of idle instances to keep of each reserved plugin,
+						unless given when reserving.
+		"""
+		self.carla = carla
+		self.plugin_class = plugin_class
+		self.size = size
+		self.hits = 0
+		self.misses = 0
+		self.ready_times = deque(maxlen = READY_TIMES_KEPT)	# Seconds from add_to_carla to idle
+		self._lock = threading.Lock()
+		self._reserved = {}		# { key: (plugin_def, size) }
+		self._idle = {}			# { key: [ Plugin ] }
+		self._loading = {}		# { Plugin: (key, start time) }
+		self._arrived = deque()	# Plugins ready, waiting to be deactivated from the idle hook
+		self._refill = Queue()
+		self._thread = None
+		self._subscriptions = ()
+
+	def start(self):
+		"""
+		Start the refill thread and begin following plugin lifecycle events.
+		"""
+		events = self.carla.events
+		self._subscriptions = (
+			events.subscribe(EVENT_PLUGIN_READY, self._plugin_ready, synchronous = True, weak = False),
+			events.subscribe(EVENT_PLUGIN_REMOVED, self._plugin_removed, synchronous = True, weak = False)
+		)
+		self.carla.add_idle_hook(self.idle)
+		self._thread = threading.Thread(target = self._refill_loop, name = 'simple_carla_pool', daemon = True)
+		self._thread.start()
+
+	def stop(self, clear = True):
+		"""
+		Stop refilling. If "clear" is True, idle instances are removed from Carla.
+		"""
+		self._reserved = {}
+		if self._thread is not None:
+			self._refill.put(None)
+			self._thread.join()
+			self._thread = None
+		self.carla.remove_idle_hook(self.idle)
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+		self._subscriptions = ()
+		if clear:
+			self.clear()
+
+	# -------------------------------------------------------------------
+	# Reservations
+
+	def reserve(self, plugin_def, size = None):
+		"""
+		Keep "size" idle instances of the plugin described by plugin_def (or the pool's
+		default size if not given). Loading begins in the background.
+		"""
+		key = plugin_key(plugin_def)
+		self._reserved[key] = (plugin_def, self.size if size is None else size)
+		self._refill.put(key)
+
+	def unreserve(self, plugin_def):
+		"""
+		Stop keeping instances of the plugin described by plugin_def, and remove its
+		idle instances from Carla.
+		"""
+		key = plugin_key(plugin_def)
+		self._reserved.pop(key, None)
+		with self._lock:
+			idle = self._idle.pop(key, [])
+		self._remove(idle)
+
+	def clear(self):
+		"""
+		Remove all idle instances from Carla. Reservations are kept, so the pool will
+		be refilled when next a plugin is acquired or reserved.
+		"""
+		with self._lock:
+			idle = [ plugin for plugins in self._idle.values() for plugin in plugins ]
+			self._idle = {}
+		self._remove(idle)
+
+	def _remove(self, plugins):
+		# Remove highest plugin_id first, as Carla renumbers the plugins following the
+		# one removed before we are told.
+		for plugin in sorted(plugins, key = lambda plugin: plugin.plugin_id, reverse = True):
+			plugin.remove_from_carla()
+
+	# -------------------------------------------------------------------
+	# Handing out
+
+	def acquire(self, plugin_def, saved_state = None):
+		"""
+		Returns a Plugin described by plugin_def.
+
+		If an idle instance is available, it is returned ready, with "saved_state"
+		applied if given, or else with its parameters reset and activated. Otherwise,
+		a new Plugin is created and added to Carla, and will become ready as usual.
+
+		Do not call this from a synchronous event handler or callback.
+		"""
+		key = plugin_key(plugin_def)
+		with self._lock:
+			idle = self._idle.get(key)
+			plugin = idle.pop(0) if idle else None
+		if plugin is None:
+			self.misses += 1
+			plugin = self.plugin_class(plugin_def, saved_state = saved_state)
+			plugin.add_to_carla()
+		else:
+			self.hits += 1
+			if saved_state is None:
+				self.carla.reset_parameters(plugin.plugin_id)
+				for param in plugin.parameters.values():
+					param.get_internal_value()
+				plugin.active = True
+			else:
+				plugin.restore_saved_state(saved_state)
+		if key in self._reserved:
+			self._refill.put(key)
+		return plugin
+
+	def idle_count(self, plugin_def = None):
+		"""
+		Returns the number of idle instances of the plugin described by plugin_def, or
+		of all plugins if not given.
+		"""
+		with self._lock:
+			if plugin_def is None:
+				return sum(len(plugins) for plugins in self._idle.values())
+			return len(self._idle.get(plugin_key(plugin_def), []))
+
+	def stats(self):
+		"""
+		Returns a dict of pool statistics.
+		"""
+		ready_times = list(self.ready_times)
+		with self._lock:
+			idle = sum(len(plugins) for plugins in self._idle.values())
+			loading = len(self._loading)
+		return {
+			'hits'				: self.hits,
+			'misses'			: self.misses,
+			'idle'				: idle,
+			'loading'			: loading,
+			'ready_time_mean'	: sum(ready_times) / len(ready_times) if ready_times else None,
+			'ready_time_max'	: max(ready_times) if ready_times else None
+		}
+
+	# -------------------------------------------------------------------
+	# Filling
+
+	def _refill_loop(self):
+		while True:
+			key = self._refill.get()
+			if key is None:
+				break
+			reservation = self._reserved.get(key)
+			if reservation is None:
+				continue
+			plugin_def, size = reservation
+			with self._lock:
+				count = len(self._idle.get(key, [])) \
+					+ sum(1 for loading_key, _ in self._loading.values() if loading_key == key)
+			for _ in range(size - count):
+				plugin = self.plugin_class(plugin_def)
+				with self._lock:
+					self._loading[plugin] = (key, perf_counter())
+				try:
+					plugin.add_to_carla()
+				except Exception as e:
+					logging.error('Pool failed to load "%s": %s', plugin_def['name'], e)
+					with self._lock:
+						self._loading.pop(plugin, None)
+					break
+
+	def _plugin_ready(self, plugin):
+		# Called synchronously, with the engine lock held; defer to the idle hook.
+		if plugin in self._loading:
+			self._arrived.append(plugin)
+
+	def _plugin_removed(self, plugin):
+		with self._lock:
+			self._loading.pop(plugin, None)
+			for key, plugins in self._idle.items():
+				if plugin in plugins:
+					plugins.remove(plugin)
+					if key in self._reserved:
+						self._refill.put(key)
+					break
+
+	def idle(self):
+		"""
+		Called from the engine idle thread after every tick. Deactivates and
+		disconnects newly ready instances, and makes them available.
+		"""
+		while self._arrived:
+			plugin = self._arrived.popleft()
+			plugin.active = False
+			plugin.disconnect_all()
+			with self._lock:
+				loading = self._loading.pop(plugin, None)
+				if loading is None:		# Removed meanwhile
+					continue
+				key, started = loading
+				self._idle.setdefault(key, []).append(plugin)
+			self.ready_times.append(perf_counter() - started)
+
+
+#  end simple_carla/pool.py
@@ -0,0 +1,293 @@
+#  simple_carla/probe.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Headless probing of plugins, many at once, in a pool of worker processes.
+
+Each worker process runs its own engine (on the "Dummy" driver by default),
+loads each plugin it is given, and reports its ports, parameters and ranges, the
+time taken to load and the change in the worker's resident memory:
+
+	with open('plugins.jsonl', 'w') as fob:
+		run_batch(plugin_defs, fob, workers = 8, timeout = 20.0)
+
+A plugin which crashes or hangs only takes down the worker probing it. That
+plugin is reported as "crashed" or "timeout", the worker is replaced, and the
+batch continues.
+
+This is the engine behind "sc-plugin-info --batch".
+"""
+import json, logging, os, sys, time
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+from simple_carla import Carla, Plugin
+
+BATCH_TIMEOUT	= 30.0
+POLL_INTERVAL	= 0.1
+
+def resident_memory():
+	"""
+	Returns (int) the resident memory of this process in bytes, or None if unknown.
+	"""
+	try:
+		with open('/proc/self/statm') as fob:
+			return int(fob.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+	except (OSError, ValueError, IndexError):
+		return None
+
+def wait_for(predicate, timeout):
+	"""
+	Wait until predicate() returns True. Returns False if timed out.
+	"""
+	deadline = time.perf_counter() + timeout
+	while not predicate():
+		if time.perf_counter() > deadline:
+			return False
+		time.sleep(0.001)
+	return True
+
+def describe_parameter(param):
+	"""
+	Returns a dict describing a Parameter, suitable for encoding as JSON.
+	"""
+	return {
+		'id'			: param.parameter_id,
+		'name'			: param.name,
+		'symbol'		: getattr(param, 'symbol', ''),
+		'unit'			: getattr(param, 'unit', ''),
+		'group'			: getattr(param, 'groupName', ''),
+		'output'		: param.is_output,
+		'boolean'		: param.is_boolean,
+		'integer'		: param.is_integer,
+		'logarithmic'	: param.is_logarithmic,
+		'automatable'	: param.is_automatable,
+		'read_only'		: param.is_read_only,
+		'default'		: getattr(param, 'def', None),
+		'min'			: getattr(param, 'min', None),
+		'max'			: getattr(param, 'max', None),
+		'step'			: getattr(param, 'step', None),
+		'scale_points'	: getattr(param, 'scale_points', None)
+	}
+
+def probe_plugin(plugin_def, timeout):
+	"""
+	Loads a plugin into the running engine, describes it, and removes it.
+	Returns a dict suitable for encoding as JSON.
+	A plugin which is not ready within "timeout" seconds is left half-loaded in the
+	engine, so the record's status is "timeout", and the worker which made it
+	should not be used again.
+	"""
+	record = { 'plugin_def': plugin_def }
+	memory = resident_memory()
+	start = time.perf_counter()
+	plugin = Plugin(plugin_def)
+	try:
+		plugin.add_to_carla()
+	except Exception as e:
+		record.update(status = 'error', error = str(e))
+		return record
+	if not wait_for(lambda: plugin.is_ready, timeout):
+		record.update(status = 'timeout', error = f'Not ready after {timeout} seconds')
+		return record
+	record['load_time'] = time.perf_counter() - start
+	after = resident_memory()
+	record['memory_delta'] = None if memory is None or after is None else after - memory
+	record.update({
+		'status'		: 'ok',
+		'name'			: plugin.original_plugin_name,
+		'maker'			: plugin.maker,
+		'category'		: plugin.category,
+		'label'			: plugin.label,
+		'filename'		: plugin.filename,
+		'audio_ins'		: plugin.audio_in_count,
+		'audio_outs'	: plugin.audio_out_count,
+		'midi_ins'		: plugin.midi_in_count,
+		'midi_outs'		: plugin.midi_out_count,
+		'parameters'	: [ describe_parameter(param) for param in plugin.parameters.values() if param.is_used ]
+	})
+	plugin.remove_from_carla()
+	if not wait_for(Carla.instance.is_clear, timeout):
+		logging.warning('Plugin "%s" not removed after %s seconds', plugin_def['name'], timeout)
+	return record
+
+def batch_worker(worker_id, driver, timeout, conn):
+	"""
+	Worker process. Starts an engine, then probes each (index, plugin_def) received
+	on the connection "conn", until it receives None.
+	"""
+	logging.basicConfig(level = logging.ERROR)
+	# NumPy is imported when the first Plugin is created; import it now, so that it
+	# is not counted in the first plugin's "memory_delta":
+	import numpy
+	carla = Carla(f'sc-plugin-info-{worker_id}')
+	carla.engine_init(driver)
+	conn.send(('ready', None, None))
+	while True:
+		task = conn.recv()
+		if task is None:
+			break
+		index, plugin_def = task
+		conn.send(('done', index, probe_plugin(plugin_def, timeout)))
+	Carla.delete()
+
+
+class BatchWorker:
+	"""
+	A worker process, as seen from the parent.
+
+	Each worker has its own pipe, so that a worker which dies part way through
+	sending cannot block the others.
+	"""
+
+	def __init__(self, context, worker_id, driver, timeout):
+		self.worker_id = worker_id
+		self.conn, child_conn = context.Pipe()
+		self.process = context.Process(target = batch_worker,
+			args = (worker_id, driver, timeout, child_conn), daemon = True)
+		self.ready = False
+		self.task = None		# (index, plugin_def) being probed
+		self.started = time.perf_counter()	# When started, then when the task was sent
+		self.process.start()
+		child_conn.close()
+
+	def send(self, task):
+		self.task = task
+		self.started = time.perf_counter()
+		self.conn.send(task)
+
+	def stop(self):
+		try:
+			self.conn.send(None)
+		except OSError:
+			pass
+
+	def kill(self):
+		self.process.kill()
+		self.process.join()
+		self.conn.close()
+
+
+def run_batch(plugin_defs, output, workers = None, timeout = BATCH_TIMEOUT, driver = 'Dummy'):
+	"""
+	Probes each plugin_def in a pool of worker processes, writing one JSON object per
+	plugin to the (text) file object "output", in the order they complete. Each
+	object includes the "index" of its plugin_def in "plugin_defs", and a "status"
+	of "ok", "error", "timeout" or "crashed".
+	workers:	Number of worker processes. Defaults to the CPU count.
+	timeout:	Seconds to allow a plugin to load. A worker which is still busy
+				with a plugin, or has not started its engine, after twice this time
+				is killed. A worker whose plugin timed out is replaced.
+	Returns dict of counts by status.
+	"""
+	context = multiprocessing.get_context('spawn')
+	pending = deque(enumerate(plugin_defs))
+	workers = min(workers or os.cpu_count() or 4, len(pending))
+	pool = []
+	next_worker_id = 0
+	failed_starts = 0
+	counts = {}
+
+	def start_worker():
+		nonlocal next_worker_id
+		pool.append(BatchWorker(context, next_worker_id, driver, timeout))
+		next_worker_id += 1
+
+	def emit(index, record):
+		record['index'] = index
+		counts[record['status']] = counts.get(record['status'], 0) + 1
+		output.write(json.dumps(record) + '\n')
+		output.flush()
+
+	def retire(worker, status, error):
+		nonlocal failed_starts
+		pool.remove(worker)
+		if worker.task is not None:
+			index, plugin_def = worker.task
+			emit(index, { 'plugin_def': plugin_def, 'status': status, 'error': error })
+		elif not worker.ready:
+			failed_starts += 1
+			if failed_starts > workers * 2:
+				raise RuntimeError('Batch workers failed to start the engine')
+		if pending:
+			start_worker()
+
+	for _ in range(workers):
+		start_worker()
+	while pending or any(worker.task is not None for worker in pool):
+		for worker in pool:
+			if worker.ready and worker.task is None and pending:
+				worker.send(pending.popleft())
+		by_conn = { worker.conn: worker for worker in pool }
+		for conn in wait(list(by_conn), POLL_INTERVAL):
+			worker = by_conn[conn]
+			try:
+				message, index, record = conn.recv()
+			except (EOFError, OSError):
+				worker.process.join()
+				retire(worker, 'crashed', f'Worker exited with code {worker.process.exitcode}')
+				continue
+			if message == 'ready':
+				worker.ready = True
+			elif worker.task is not None and worker.task[0] == index:
+				worker.task = None
+				emit(index, record)
+				if record['status'] == 'timeout':
+					# The plugin is still loading in the worker's engine; start afresh:
+					worker.kill()
+					retire(worker, None, None)
+		now = time.perf_counter()
+		for worker in list(pool):
+			if (worker.task is not None or not worker.ready) and now - worker.started > timeout * 2:
+				worker.kill()
+				retire(worker, 'timeout', f'Worker unresponsive after {timeout * 2} seconds')
+	for worker in pool:
+		worker.stop()
+	for worker in pool:
+		worker.process.join(timeout)
+		if worker.process.is_alive():
+			worker.kill()
+	return counts
+
+def read_plugin_defs(filename):
+	"""
+	Returns a list of plugin_def read from a JSON list or JSON Lines file.
+	filename:	Path to the file, or "-" to read stdin.
+	"""
+	if filename == '-':
+		text = sys.stdin.read()
+	else:
+		with open(filename) as fob:
+			text = fob.read()
+	if text.lstrip().startswith('['):
+		return json.loads(text)
+	return [ json.loads(line) for line in text.splitlines() if line.strip() ]
+
+def search_plugin_defs(text):
+	"""
+	Returns a list of plugin_def from the discovery index whose name, label or
+	maker contains "text".
+	"""
+	from simple_carla.discovery import PluginIndex
+	index = PluginIndex()
+	index.refresh()
+	return index.search(text)
+
+
+#  end simple_carla/probe.py
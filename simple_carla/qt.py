@@ -19,11 +19,36 @@
 #
 """
 Qt -enabled classes which utilize signals rather than callbacks.
+
+Loading a session may emit thousands of signals, each of which is queued for the
+GUI thread. With signal batching started, CarlaQt also gathers ports,
+connections and parameter changes during each engine idle tick, and emits them
+as lists once per tick:
+
+	carla = CarlaQt('client')
+	carla.sig_patchbay_ports_added.connect(self.ports_added)	# list of PatchbayPort
+	carla.sig_parameters_changed.connect(self.parameters_changed)	# list of (Plugin, Parameter, float)
+	carla.start_signal_batching()
+
+The per-item signals are still emitted; connect to one or the other.
 """
-import logging, traceback, os, sys
+import logging, traceback, os, sys, threading
 from PyQt5.QtCore import	QObject, pyqtSignal
-from simple_carla import	_SimpleCarla, Plugin, Parameter, \
+from simple_carla import	_SimpleCarla, Carla, Plugin, Parameter, \
 							PatchbayClient, PatchbayPort, PatchbayConnection
+from simple_carla.event_bus import (
+	EVENT_ENGINE_STARTED,
+	EVENT_ENGINE_STOPPED,
+	EVENT_PROCESS_MODE_CHANGED,
+	EVENT_TRANSPORT_MODE_CHANGED,
+	EVENT_BUFFER_SIZE_CHANGED,
+	EVENT_SAMPLE_RATE_CHANGED,
+	EVENT_CANCELABLE_ACTION,
+	EVENT_INFO,
+	EVENT_ERROR,
+	EVENT_QUIT,
+	EVENT_APPLICATION_ERROR
+)
 
 from carla_backend import (
 
@@ -108,10 +133,73 @@ class CarlaQt(_SimpleCarla, QObject):
 	sig_quit = pyqtSignal()
 	sig_application_error = pyqtSignal(str, str, str, int)
 
+	# Batched signals, emitted once per idle tick (see start_signal_batching):
+	sig_patchbay_ports_added = pyqtSignal(list)
+	sig_patchbay_ports_removed = pyqtSignal(list)
+	sig_connections_added = pyqtSignal(list)
+	sig_connections_removed = pyqtSignal(list)
+	sig_parameters_changed = pyqtSignal(list)
+
 
 	def __init__(self, client_name):
 		QObject.__init__(self)
 		_SimpleCarla.__init__(self, client_name)
+		if not hasattr(self, '_batch_lock'):
+			self.batching_signals = False
+			self._batch_lock = threading.Lock()
+			self._batch_runs = []			# [ [ signal, [ items ] ] ] in the order received
+			self._batch_parameters = {}		# { (Plugin, parameter_id): (Plugin, Parameter, value) }
+
+	# -----------------------------
+	# Batched signals
+	# -----------------------------
+
+	def start_signal_batching(self):
+		"""
+		Begin gathering ports and connections added or removed, and parameter changes,
+		and emitting them as lists once per engine idle tick.
+		Repeated changes to the same parameter within a tick are emitted once, with
+		the latest value.
+		"""
+		if not self.batching_signals:
+			self.batching_signals = True
+			self.add_idle_hook(self.flush_signal_batches)
+
+	def stop_signal_batching(self):
+		"""
+		Stop gathering batched signals, emitting any already gathered.
+		"""
+		if self.batching_signals:
+			self.batching_signals = False
+			self.remove_idle_hook(self.flush_signal_batches)
+			self.flush_signal_batches()
+
+	def flush_signal_batches(self):
+		"""
+		Emit the batched signals gathered since last called. Called from the engine
+		idle thread after every tick while batching.
+		"""
+		with self._batch_lock:
+			runs, self._batch_runs = self._batch_runs, []
+			parameters, self._batch_parameters = self._batch_parameters, {}
+		for signal, items in runs:
+			signal.emit(items)
+		if parameters:
+			self.sig_parameters_changed.emit(list(parameters.values()))
+
+	def _batch(self, signal, item):
+		# Consecutive items for the same signal are emitted together, so that the
+		# order of additions and removals is kept. (Each access to a signal returns
+		# a new bound signal object, so they are compared for equality, not identity.)
+		with self._batch_lock:
+			if self._batch_runs and self._batch_runs[-1][0] == signal:
+				self._batch_runs[-1][1].append(item)
+			else:
+				self._batch_runs.append([ signal, [ item ] ])
+
+	def _batch_parameter_change(self, plugin, parameter, value):
+		with self._batch_lock:
+			self._batch_parameters[(plugin, parameter.parameter_id)] = (plugin, parameter, value)
 
 	# -----------------------------
 	# Engine callback
@@ -234,27 +322,34 @@ class CarlaQt(_SimpleCarla, QObject):
 			if action == ENGINE_CALLBACK_ENGINE_STARTED:
 				self.processMode = value_1
 				self.transportMode = value_2
+				self.events.publish(EVENT_ENGINE_STARTED, plugin_id, value_1, value_2, value_3, float_val, string_val)
 				return self.sig_engine_started.emit(plugin_id, value_1, value_2, value_3, float_val, string_val)
 
 			if action == ENGINE_CALLBACK_ENGINE_STOPPED:
+				self.events.publish(EVENT_ENGINE_STOPPED)
 				return self.sig_engine_stopped.emit()
 
 			if action == ENGINE_CALLBACK_PROCESS_MODE_CHANGED:
 				self.processMode = value_1
+				self.events.publish(EVENT_PROCESS_MODE_CHANGED, value_1)
 				return self.sig_process_mode_changed.emit(value_1)
 
 			if action == ENGINE_CALLBACK_TRANSPORT_MODE_CHANGED:
 				self.transportMode = value_1
 				self.transportExtra = string_val
+				self.events.publish(EVENT_TRANSPORT_MODE_CHANGED, value_1, string_val)
 				return self.sig_transport_mode_changed.emit(value_1, string_val)
 
 			if action == ENGINE_CALLBACK_BUFFER_SIZE_CHANGED:
+				self.events.publish(EVENT_BUFFER_SIZE_CHANGED, value_1)
 				return self.sig_buffer_size_changed.emit(value_1)
 
 			if action == ENGINE_CALLBACK_SAMPLE_RATE_CHANGED:
+				self.events.publish(EVENT_SAMPLE_RATE_CHANGED, float_val)
 				return self.sig_sample_rate_changed.emit(float_val)
 
 			if action == ENGINE_CALLBACK_CANCELABLE_ACTION:
+				self.events.publish(EVENT_CANCELABLE_ACTION, plugin_id, bool(value_1 != 0), string_val)
 				return self.sig_cancelable_action.emit(plugin_id, bool(value_1 != 0), string_val)
 
 			if action == ENGINE_CALLBACK_PROJECT_LOAD_FINISHED:
@@ -267,12 +362,15 @@ class CarlaQt(_SimpleCarla, QObject):
 				return
 
 			if action == ENGINE_CALLBACK_INFO:
+				self.events.publish(EVENT_INFO, string_val)
 				return self.sig_info.emit(string_val)
 
 			if action == ENGINE_CALLBACK_ERROR:
+				self.events.publish(EVENT_ERROR, string_val)
 				return self.sig_error.emit(string_val)
 
 			if action == ENGINE_CALLBACK_QUIT:
+				self.events.publish(EVENT_QUIT)
 				return self.sig_quit.emit()
 
 			logging.warning('Unhandled action %d', action)
@@ -281,6 +379,7 @@ class CarlaQt(_SimpleCarla, QObject):
 			logging.exception(e)
 			exc_type, _, exc_tb = sys.exc_info()
 			fname = os.path.split(exc_tb.tb_frame.f_code.co_filename)[1]
+			self.events.publish(EVENT_APPLICATION_ERROR, exc_type.__name__, str(e), fname, exc_tb.tb_lineno)
 			self.sig_application_error.emit(exc_type.__name__, str(e), fname, exc_tb.tb_lineno)
 
 	# -----------------------------
@@ -296,20 +395,28 @@ class CarlaQt(_SimpleCarla, QObject):
 
 	def _alert_port_added(self, port):
 		self.sig_patchbay_port_added.emit(port)
+		if self.batching_signals:
+			self._batch(self.sig_patchbay_ports_added, port)
 
 	def _alert_port_removed(self, port):
 		self.sig_patchbay_port_removed.emit(port)
+		if self.batching_signals:
+			self._batch(self.sig_patchbay_ports_removed, port)
 
 	def _alert_connection_added(self, connection):
 		self.sig_connection_added.emit(connection)
+		if self.batching_signals:
+			self._batch(self.sig_connections_added, connection)
 
 	def _alert_connection_removed(self, connection):
 		self.sig_connection_removed.emit(connection)
+		if self.batching_signals:
+			self._batch(self.sig_connections_removed, connection)
 
 	def _alert_plugin_removed(self, plugin):
 		self.sig_plugin_removed.emit(plugin)
 
-	def _alert_last_plugin_removed(self):
+	def _alert_last_plugin_removed(self, plugin):
 		self.sig_last_plugin_removed.emit()
 
 
@@ -409,6 +516,9 @@ class AbstractQtPlugin(Plugin):
 		The value of the Parameter object will have already been set when this is called.
 		"""
 		self.sig_parameter_changed.emit(self, parameter, value)
+		carla = Carla.instance
+		if isinstance(carla, CarlaQt) and carla.batching_signals:
+			carla._batch_parameter_change(self, parameter, value)
 
 
 class QtPlugin(AbstractQtPlugin, QObject):
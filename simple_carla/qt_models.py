@@ -0,0 +1,499 @@
+#  simple_carla/qt_models.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Qt item models backed by the host's plugins, parameters and patchbay:
+
+	plugins = PluginListModel(carla)
+	plugin_list_view.setModel(plugins)
+	parameters = ParameterTableModel(carla, plugin)
+	parameter_table_view.setModel(parameters)
+	patchbay = PatchbayModel(carla)
+	patchbay_tree_view.setModel(patchbay)
+	...
+	patchbay.close()	# Stop following the host before discarding a model
+
+The models work with either Carla or CarlaQt, and with any Plugin class.
+
+Host events are noted as they happen, in whichever thread, and applied to the
+model in the thread which owns it (normally the GUI thread) once per batch of
+events. Additions under the same parent become a single row insert, removals
+remove only the rows concerned, and parameter and var changes become one
+"dataChanged" per contiguous range of rows. Models are never reset after they
+are created, so views of large sessions keep their selection and scroll
+position, and stay responsive.
+
+Item data is available for the DisplayRole, and the host object an index
+represents (Plugin, Parameter, PatchbayClient, PatchbayPort, or
+PatchbayConnection) for ITEM_ROLE.
+"""
+import logging, threading
+from PyQt5.QtCore import	Qt, QObject, QModelIndex, QAbstractItemModel, QAbstractListModel, \
+							QAbstractTableModel, pyqtSignal
+from simple_carla import	PatchbayClient, PatchbayPort, PatchbayConnection
+from simple_carla.event_bus import (
+	EVENT_CLIENT_ADDED, EVENT_CLIENT_REMOVED, EVENT_PORT_ADDED, EVENT_PORT_REMOVED,
+	EVENT_CONNECTION_ADDED, EVENT_CONNECTION_REMOVED, EVENT_PLUGIN_READY, EVENT_PLUGIN_REMOVED
+)
+
+ITEM_ROLE = Qt.UserRole
+
+
+def _ranges(rows):
+	"""
+	Returns list of (first, last) contiguous ranges of the given row numbers.
+	"""
+	ranges = []
+	for row in sorted(rows):
+		if ranges and row == ranges[-1][1] + 1:
+			ranges[-1][1] = row
+		else:
+			ranges.append([ row, row ])
+	return ranges
+
+
+class _Relay(QObject):
+	"""
+	Carries notice of pending host events to the thread which owns a model.
+	"""
+
+	sig_pending = pyqtSignal()
+
+
+class _PendingEvents:
+	"""
+	Mixin which gathers host events from any thread, and applies them in the
+	model's own thread.
+	"""
+
+	def _init_pending(self, carla):
+		self.carla = carla
+		self._pending_lock = threading.Lock()
+		self._pending = []			# [ (operation, item) ] in the order received
+		self._scheduled = False
+		self._subscriptions = ()
+		self._listening = False
+		self._relay = _Relay(self)
+		self._relay.sig_pending.connect(self._apply_pending, Qt.QueuedConnection)
+
+	def _subscribe(self, *events):
+		bus = self.carla.events
+		self._subscriptions = tuple(
+			bus.subscribe(event, callback, synchronous = True, weak = False)
+			for event, callback in events)
+
+	def _listen(self):
+		self.carla.add_state_listener(self._state_changed)
+		self._listening = True
+
+	def _queue(self, operation, item):
+		with self._pending_lock:
+			self._pending.append((operation, item))
+			if self._scheduled:
+				return
+			self._scheduled = True
+		self._relay.sig_pending.emit()
+
+	def _take_pending(self):
+		with self._pending_lock:
+			pending, self._pending = self._pending, []
+			self._scheduled = False
+		return pending
+
+	def close(self):
+		"""
+		Stop following host events. The model keeps its current rows.
+		"""
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+		self._subscriptions = ()
+		if self._listening:
+			self.carla.remove_state_listener(self._state_changed)
+			self._listening = False
+
+
+class PluginListModel(_PendingEvents, QAbstractListModel):
+	"""
+	A list of the host's plugins which are ready, in the order they became ready.
+	The CheckStateRole shows and sets whether each plugin is active.
+	"""
+
+	def __init__(self, carla, parent = None):
+		QAbstractListModel.__init__(self, parent)
+		self._init_pending(carla)
+		self._subscribe(
+			(EVENT_PLUGIN_READY, lambda plugin: self._queue('add', plugin)),
+			(EVENT_PLUGIN_REMOVED, lambda plugin: self._queue('remove', plugin))
+		)
+		self._listen()
+		self._plugins = [ plugin for plugin in carla.plugins() if plugin.is_ready ]
+		self._rows = { plugin: row for row, plugin in enumerate(self._plugins) }
+
+	def plugin(self, row):
+		"""
+		Returns the Plugin at the given row.
+		"""
+		return self._plugins[row]
+
+	def row_of(self, plugin):
+		"""
+		Returns the row of the given Plugin, or -1 if not in this model.
+		"""
+		return self._rows.get(plugin, -1)
+
+	def rowCount(self, parent = QModelIndex()):
+		return 0 if parent.isValid() else len(self._plugins)
+
+	def data(self, index, role = Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		plugin = self._plugins[index.row()]
+		if role == Qt.DisplayRole:
+			return plugin.moniker
+		if role == Qt.ToolTipRole:
+			return plugin.plugin_def['name']
+		if role == Qt.CheckStateRole:
+			return Qt.Checked if plugin.active else Qt.Unchecked
+		if role == ITEM_ROLE:
+			return plugin
+		return None
+
+	def flags(self, index):
+		flags = super().flags(index)
+		return flags | Qt.ItemIsUserCheckable if index.isValid() else flags
+
+	def setData(self, index, value, role = Qt.EditRole):
+		if role != Qt.CheckStateRole or not index.isValid():
+			return False
+		self._plugins[index.row()].active = value == Qt.Checked
+		self.dataChanged.emit(index, index, [ role ])
+		return True
+
+	def _state_changed(self, plugin, key, value):
+		if key == 'active':
+			self._queue('change', plugin)
+
+	def _apply_pending(self):
+		pending = self._take_pending()
+		changed = set()
+		added = []
+		for operation, plugin in pending:
+			if operation == 'add':
+				if plugin not in self._rows and plugin not in added:
+					added.append(plugin)
+				continue
+			self._insert(added)
+			added = []
+			if operation == 'remove':
+				row = self._rows.get(plugin)
+				if row is not None:
+					self.beginRemoveRows(QModelIndex(), row, row)
+					del self._plugins[row]
+					self._rows = { plugin: row for row, plugin in enumerate(self._plugins) }
+					self.endRemoveRows()
+					changed = { changed_row - (changed_row > row) for changed_row in changed
+						if changed_row != row }
+			elif plugin in self._rows:
+				changed.add(self._rows[plugin])
+		self._insert(added)
+		for first, last in _ranges(changed):
+			self.dataChanged.emit(self.index(first), self.index(last), [ Qt.CheckStateRole ])
+
+	def _insert(self, plugins):
+		if plugins:
+			first = len(self._plugins)
+			self.beginInsertRows(QModelIndex(), first, first + len(plugins) - 1)
+			for plugin in plugins:
+				self._rows[plugin] = len(self._plugins)
+				self._plugins.append(plugin)
+			self.endInsertRows()
+
+
+class ParameterTableModel(_PendingEvents, QAbstractTableModel):
+	"""
+	A table of one plugin's used parameters, in parameter_id order, with columns
+	for the name, value, unit, minimum and maximum. The values of input
+	parameters which are not read-only may be edited.
+	"""
+
+	COLUMNS = ('Name', 'Value', 'Unit', 'Min', 'Max')
+	VALUE_COLUMN = 1
+
+	def __init__(self, carla, plugin, parent = None):
+		QAbstractTableModel.__init__(self, parent)
+		self._init_pending(carla)
+		self.plugin = plugin
+		self._parameters = [ plugin.parameters[parameter_id]
+			for parameter_id in sorted(plugin.parameters) if plugin.parameters[parameter_id].is_used ]
+		self._rows = { param.parameter_id: row for row, param in enumerate(self._parameters) }
+		self._listen()
+
+	def parameter(self, row):
+		"""
+		Returns the Parameter at the given row.
+		"""
+		return self._parameters[row]
+
+	def rowCount(self, parent = QModelIndex()):
+		return 0 if parent.isValid() else len(self._parameters)
+
+	def columnCount(self, parent = QModelIndex()):
+		return 0 if parent.isValid() else len(self.COLUMNS)
+
+	def headerData(self, section, orientation, role = Qt.DisplayRole):
+		if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+			return self.COLUMNS[section]
+		return None
+
+	def data(self, index, role = Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		param = self._parameters[index.row()]
+		if role in (Qt.DisplayRole, Qt.EditRole):
+			column = index.column()
+			if column == 0:
+				return param.name
+			if column == self.VALUE_COLUMN:
+				return param.value
+			return (param.unit, param.min, param.max)[column - 2]
+		if role == ITEM_ROLE:
+			return param
+		return None
+
+	def flags(self, index):
+		flags = super().flags(index)
+		if index.isValid() and index.column() == self.VALUE_COLUMN:
+			param = self._parameters[index.row()]
+			if param.is_input and not param.is_read_only:
+				flags |= Qt.ItemIsEditable
+		return flags
+
+	def setData(self, index, value, role = Qt.EditRole):
+		if role != Qt.EditRole or not index.isValid() or index.column() != self.VALUE_COLUMN:
+			return False
+		param = self._parameters[index.row()]
+		try:
+			value = float(value)
+		except (TypeError, ValueError):
+			return False
+		if not param.min <= value <= param.max:
+			return False
+		param.value = value		# The change is shown when the state listener is called
+		return True
+
+	def _state_changed(self, plugin, key, value):
+		if plugin is self.plugin and key in self._rows:
+			self._queue('change', key)
+
+	def _apply_pending(self):
+		rows = { self._rows[parameter_id] for _, parameter_id in self._take_pending() }
+		for first, last in _ranges(rows):
+			self.dataChanged.emit(self.index(first, self.VALUE_COLUMN),
+				self.index(last, self.VALUE_COLUMN), [ Qt.DisplayRole, Qt.EditRole ])
+
+
+class _Node:
+	"""
+	A row in a PatchbayModel.
+	"""
+
+	__slots__ = ('item', 'parent', 'children', 'row')
+
+	def __init__(self, item, parent):
+		self.item = item			# PatchbayClient, PatchbayPort, or PatchbayConnection
+		self.parent = parent
+		self.children = []
+		self.row = 0				# Index in parent.children, kept up to date by PatchbayModel
+
+
+class PatchbayModel(_PendingEvents, QAbstractItemModel):
+	"""
+	A tree of patchbay clients, their ports, and the connections from each output
+	port, shown as children of the output port.
+	"""
+
+	def __init__(self, carla, parent = None):
+		QAbstractItemModel.__init__(self, parent)
+		self._init_pending(carla)
+		self._root = _Node(None, None)
+		self._nodes = {}			# _Node, indexed on the item it represents
+		self._client_nodes = {}		# _Node, indexed on client_id
+		self._connections_to = {}	# { in_port: set of PatchbayConnection }
+		self._subscribe(
+			(EVENT_CLIENT_ADDED, lambda client: self._queue('add', client)),
+			(EVENT_CLIENT_REMOVED, lambda client: self._queue('remove', client)),
+			(EVENT_PORT_ADDED, lambda port: self._queue('add', port)),
+			(EVENT_PORT_REMOVED, lambda port: self._queue('remove', port)),
+			(EVENT_CONNECTION_ADDED, lambda connection: self._queue('add', connection)),
+			(EVENT_CONNECTION_REMOVED, lambda connection: self._queue('remove', connection))
+		)
+		for client in carla.clients():
+			client_node = self._new_node(client, self._root)
+			for port in list(client.ports.values()):
+				self._new_node(port, client_node)
+		for connection in list(carla._connections.values()):
+			parent_node = self._nodes.get(connection.out_port)
+			if parent_node is not None:
+				self._new_node(connection, parent_node)
+
+	def _new_node(self, item, parent_node):
+		node = self._nodes[item] = _Node(item, parent_node)
+		node.row = len(parent_node.children)
+		parent_node.children.append(node)
+		if isinstance(item, PatchbayClient):
+			self._client_nodes[item.client_id] = node
+		elif isinstance(item, PatchbayConnection):
+			self._connections_to.setdefault(item.in_port, set()).add(item)
+		return node
+
+	def _parent_node(self, item):
+		# Returns the node which a new node for "item" belongs under, or None.
+		if isinstance(item, PatchbayConnection):
+			return self._nodes.get(item.out_port)
+		if isinstance(item, PatchbayPort):
+			return self._client_nodes.get(item.client_id)
+		return self._root
+
+	def _index_of(self, node):
+		return QModelIndex() if node is self._root else self.createIndex(node.row, 0, node)
+
+	# -------------------------------------------------------------------
+	# QAbstractItemModel
+
+	def index(self, row, column, parent = QModelIndex()):
+		parent_node = parent.internalPointer() if parent.isValid() else self._root
+		if column != 0 or not 0 <= row < len(parent_node.children):
+			return QModelIndex()
+		return self.createIndex(row, 0, parent_node.children[row])
+
+	def parent(self, index):
+		if not index.isValid():
+			return QModelIndex()
+		return self._index_of(index.internalPointer().parent)
+
+	def rowCount(self, parent = QModelIndex()):
+		if parent.isValid() and parent.column() != 0:
+			return 0
+		return len((parent.internalPointer() if parent.isValid() else self._root).children)
+
+	def columnCount(self, parent = QModelIndex()):
+		return 1
+
+	def data(self, index, role = Qt.DisplayRole):
+		if not index.isValid():
+			return None
+		item = index.internalPointer().item
+		if role == Qt.DisplayRole:
+			if isinstance(item, PatchbayConnection):
+				target = self._client_nodes.get(item.in_port.client_id)
+				return item.in_port.port_name if target is None \
+					else f'{target.item.moniker}:{item.in_port.port_name}'
+			if isinstance(item, PatchbayPort):
+				return item.port_name
+			return item.moniker
+		if role == ITEM_ROLE:
+			return item
+		return None
+
+	def item(self, index):
+		"""
+		Returns the PatchbayClient, PatchbayPort, or PatchbayConnection at the given index.
+		"""
+		return index.internalPointer().item if index.isValid() else None
+
+	def index_of(self, item):
+		"""
+		Returns the QModelIndex of the given PatchbayClient, PatchbayPort, or
+		PatchbayConnection, or an invalid index if not in this model.
+		"""
+		node = self._nodes.get(item)
+		return QModelIndex() if node is None else self._index_of(node)
+
+	# -------------------------------------------------------------------
+	# Applying host events
+
+	def _apply_pending(self):
+		pending = self._take_pending()
+		added, added_parent = [], None
+		for operation, item in pending:
+			if operation == 'add':
+				if item in self._nodes or item in added:
+					continue
+				parent_node = self._parent_node(item)
+				if parent_node is None:
+					if added:
+						self._insert(added_parent, added)
+						added = []
+					parent_node = self._parent_node(item)
+					if parent_node is None:
+						logging.debug('PatchbayModel: no parent for %s', item)
+						continue
+				if parent_node is not added_parent:
+					self._insert(added_parent, added)
+					added, added_parent = [], parent_node
+				added.append(item)
+			else:
+				self._insert(added_parent, added)
+				added, added_parent = [], None
+				node = self._nodes.get(item)
+				if node is not None:
+					self._remove(node)
+		self._insert(added_parent, added)
+
+	def _insert(self, parent_node, items):
+		if items:
+			first = len(parent_node.children)
+			self.beginInsertRows(self._index_of(parent_node), first, first + len(items) - 1)
+			for item in items:
+				self._new_node(item, parent_node)
+			self.endInsertRows()
+
+	def _remove(self, node):
+		row, siblings = node.row, node.parent.children
+		self.beginRemoveRows(self._index_of(node.parent), row, row)
+		del siblings[row]
+		for index in range(row, len(siblings)):
+			siblings[index].row = index
+		removed = []
+		self._forget(node, removed)
+		self.endRemoveRows()
+		# Connections to removed input ports are shown under other clients' output ports:
+		for item in removed:
+			if isinstance(item, PatchbayPort) and item.is_input:
+				for connection in list(self._connections_to.get(item, ())):
+					other = self._nodes.get(connection)
+					if other is not None:
+						self._remove(other)
+
+	def _forget(self, node, removed):
+		del self._nodes[node.item]
+		if isinstance(node.item, PatchbayClient):
+			self._client_nodes.pop(node.item.client_id, None)
+		elif isinstance(node.item, PatchbayConnection):
+			connections = self._connections_to.get(node.item.in_port)
+			if connections is not None:
+				connections.discard(node.item)
+				if not connections:
+					del self._connections_to[node.item.in_port]
+		removed.append(node.item)
+		for child in node.children:
+			self._forget(child, removed)
+
+
+#  end simple_carla/qt_models.py
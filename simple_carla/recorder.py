@@ -0,0 +1,200 @@
+#  simple_carla/recorder.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Recording and replay of engine callback streams.
+
+A recording captures every call Carla makes to the engine callback, in a
+compact binary log. It may be played back through the same dispatch path
+(Carla.engine_callback), at the original speed, at a scaled speed, or as fast
+as possible.
+
+Record a session:
+
+	carla.start_recording('session.sccb')
+	...
+	carla.stop_recording()
+
+Play it back:
+
+	replayer = CallbackReplayer('session.sccb')
+	stats = replayer.replay(carla, speed = None)	# As fast as possible
+
+Carla announces each plugin with the unique name it was given when added, and
+the host binds the announcement to the Plugin it holds under that name. On
+replay, a Plugin is created for every plugin added in the recording, (a
+simple_carla.host.StandInPlugin unless "plugin_factory" is given), so that the
+plugin, client, port and parameter handlers all run as they did when recorded.
+
+File format
+-----------
+Header:		b"SCCB", (uint16) version, (float64) wall-clock start time
+Records:	(float64) seconds since start, (uint8) action, (uint32) plugin_id,
+			(int32) value_1, (int32) value_2, (int32) value_3, (float64) float_val,
+			(uint32) string length, followed by the UTF-8 encoded string.
+All values are little-endian. Version 1 recordings, in which float_val is a
+float32, may still be read.
+"""
+import struct, threading, time, tracemalloc
+
+MAGIC			= b'SCCB'
+VERSION			= 2
+
+_HEADER			= struct.Struct('<4sHd')
+_RECORDS		= {
+	1	: struct.Struct('<dBIiiifI'),
+	2	: struct.Struct('<dBIiiidI')
+}
+_RECORD			= _RECORDS[VERSION]
+
+
+class CallbackRecorder:
+	"""
+	Writes engine callback invocations to a binary log.
+	Usually created by Carla.start_recording()
+	"""
+
+	def __init__(self, filename):
+		self.filename = filename
+		self.count = 0
+		self._lock = threading.Lock()
+		self._start = time.perf_counter()
+		self._file = open(filename, 'wb')
+		self._file.write(_HEADER.pack(MAGIC, VERSION, time.time()))
+
+	def record(self, action, plugin_id, value_1, value_2, value_3, float_val, string_val):
+		"""
+		Append a single callback to the log.
+		"string_val" may be bytes (as passed from Carla), str, or None.
+		"""
+		if string_val is None:
+			string_val = b''
+		elif isinstance(string_val, str):
+			string_val = string_val.encode('utf-8')
+		with self._lock:
+			if self._file is None:
+				return
+			self._file.write(_RECORD.pack(
+				time.perf_counter() - self._start,
+				action, plugin_id, value_1, value_2, value_3, float_val,
+				len(string_val)
+			))
+			self._file.write(string_val)
+			self.count += 1
+
+	def close(self):
+		"""
+		Flush and close the log.
+		"""
+		with self._lock:
+			if self._file is not None:
+				self._file.close()
+				self._file = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+class CallbackReplayer:
+	"""
+	Reads a log written by CallbackRecorder, and feeds it back to a Carla instance.
+	"""
+
+	def __init__(self, filename):
+		self.filename = filename
+		with open(filename, 'rb') as fob:
+			magic, self.version, self.recorded_at = _HEADER.unpack(fob.read(_HEADER.size))
+		if magic != MAGIC:
+			raise ValueError(f'"{filename}" is not a callback recording')
+		if self.version not in _RECORDS:
+			raise ValueError(f'Unsupported callback recording version {self.version}')
+
+	def records(self):
+		"""
+		Generator which yields a tuple for every recorded callback:
+			(timestamp, action, plugin_id, value_1, value_2, value_3, float_val, string_val)
+		string_val is bytes, exactly as Carla passes it to the engine callback.
+		"""
+		with open(self.filename, 'rb') as fob:
+			fob.seek(_HEADER.size)
+			read = fob.read
+			record = _RECORDS[self.version]
+			size = record.size
+			unpack = record.unpack
+			while True:
+				data = read(size)
+				if len(data) < size:
+					return
+				timestamp, action, plugin_id, value_1, value_2, value_3, float_val, strlen = unpack(data)
+				yield (timestamp, action, plugin_id, value_1, value_2, value_3, float_val,
+					read(strlen) if strlen else None)
+
+	def replay(self, carla, speed = 1.0, measure_memory = False, plugin_factory = None):
+		"""
+		Dispatches every recorded callback through carla.dispatch_callback().
+
+		speed:				1.0 plays back at the original speed, 2.0 twice as fast, etc.
+							None (or 0) plays back as fast as possible.
+		measure_memory:		Trace memory allocations during replay (slower).
+		plugin_factory:		Callable which takes the unique name of a plugin added in the
+							recording, and returns a Plugin (not added to Carla) to stand
+							in for it. Defaults to creating a StandInPlugin. Plugins which
+							"carla" already holds under the recorded name are used as they are.
+
+		Returns a dict with the keys:
+			count:			Number of callbacks dispatched
+			elapsed:		Seconds spent replaying
+			per_second:		Callbacks dispatched per second
+			memory_current:	Bytes allocated during replay and still held (if measure_memory)
+			memory_peak:	Peak bytes allocated during replay (if measure_memory)
+		"""
+		from simple_carla.host import ENGINE_CALLBACK_PLUGIN_ADDED, StandInPlugin
+		if plugin_factory is None:
+			plugin_factory = StandInPlugin
+		if measure_memory:
+			tracemalloc.start()
+		count = 0
+		start = time.perf_counter()
+		for record in self.records():
+			if speed:
+				delay = start + record[0] / speed - time.perf_counter()
+				if delay > 0:
+					time.sleep(delay)
+			if record[1] == ENGINE_CALLBACK_PLUGIN_ADDED and record[7]:
+				unique_name = record[7].decode('utf-8', errors = 'replace')
+				if carla.plugin_from_uuid(unique_name) is None:
+					carla.adopt_plugin(plugin_factory(unique_name), unique_name)
+			carla.dispatch_callback(*record[1:])
+			count += 1
+		elapsed = time.perf_counter() - start
+		stats = {
+			'count'			: count,
+			'elapsed'		: elapsed,
+			'per_second'	: count / elapsed if elapsed else 0.0
+		}
+		if measure_memory:
+			stats['memory_current'], stats['memory_peak'] = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+		return stats
+
+
+#  end simple_carla/recorder.py
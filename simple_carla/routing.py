@@ -0,0 +1,256 @@
+#  simple_carla/routing.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Declarative patchbay routing.
+
+Rather than disconnecting everything and reconnecting, describe the routing you
+want, and let Carla.apply_routing() work out the difference:
+
+	future = carla.apply_routing([
+		(synth.audio_outs()[0], 'system:playback_1'),
+		(synth.audio_outs()[1], 'system:playback_2'),
+		('system:midi_capture_1', synth.midi_ins()[0])
+	])
+	result = future.result(timeout = 2.0)
+
+Each edge is an (output port, input port) tuple. Ports may be given as
+PatchbayPort objects or as JACK names ("client:port"). For plugins, the plugin's
+moniker may be used in place of the JACK client name.
+
+Only connections which are not wanted are removed, and only connections which
+do not already exist are made. All of the necessary connects and disconnects are
+issued in a single batch, holding the engine lock once. The returned
+concurrent.futures.Future resolves to a RoutingResult once Carla has confirmed
+every change, or when "timeout" expires; changes not confirmed by then are
+listed in RoutingResult.failed. Cancelling the Future stops waiting.
+
+By default, every existing connection which is not in the desired set is
+removed. Pass "scope" (a list of PatchbayClient) to only consider connections
+which touch those clients.
+"""
+import threading
+from concurrent.futures import Future, InvalidStateError
+from time import perf_counter
+from simple_carla.event_bus import EVENT_CONNECTION_ADDED, EVENT_CONNECTION_REMOVED
+
+
+class RoutingResult:
+	"""
+	The outcome of Carla.apply_routing()
+
+	Members of interest
+	-------------------
+	connected:     (list)   (out_port, in_port) tuples connected
+	disconnected:  (list)   PatchbayConnection objects removed
+	unchanged:     (int)    Number of desired edges which already existed
+	failed:        (list)   (out_port, in_port, reason) tuples which could not be changed
+	elapsed:       (float)  Seconds between the request and the last confirmation
+	-------------------
+	"""
+
+	def __init__(self):
+		self.connected = []
+		self.disconnected = []
+		self.unchanged = 0
+		self.failed = []
+		self.elapsed = 0.0
+
+	@property
+	def ok(self):
+		return not self.failed
+
+	def __str__(self):
+		return f'<RoutingResult +{len(self.connected)} -{len(self.disconnected)} ' + \
+			f'={self.unchanged} failed: {len(self.failed)} in {self.elapsed * 1000:.1f}ms>'
+
+
+def port_index(carla):
+	"""
+	Returns a dict of { name: PatchbayPort } for every port known to Carla, keyed
+	on both the JACK name and the "moniker:port_name" of plugin ports.
+	"""
+	index = {}
+	for client in carla.clients():
+		moniker = getattr(client, 'moniker', None)
+		for port in client.ports.values():
+			index[f'{client.client_name}:{port.port_name}'] = port
+			if moniker:
+				index.setdefault(f'{moniker}:{port.port_name}', port)
+	return index
+
+
+def resolve_port(port, index):
+	"""
+	Returns the PatchbayPort described by "port", which may be a PatchbayPort or a
+	(str) name. Raises KeyError if a name cannot be found.
+	"""
+	if isinstance(port, str):
+		try:
+			return index[port]
+		except KeyError:
+			raise KeyError(f'Port "{port}" not found') from None
+	return port
+
+
+class RoutingReconciler:
+	"""
+	Computes and applies the difference between the current and desired routing.
+	Used by Carla.apply_routing()
+	"""
+
+	def __init__(self, carla, edges, scope = None, timeout = 5.0):
+		"""
+		timeout:	Seconds to wait for Carla to confirm every change.
+		"""
+		self.carla = carla
+		self.timeout = timeout
+		self.future = Future()
+		self.result = RoutingResult()
+		self._lock = threading.Lock()
+		self._pending_connects = {}		# (out client, out port, in client, in port): (out_port, in_port)
+		self._pending_disconnects = {}	# connection_id: PatchbayConnection
+		self._subscriptions = []
+		self._start = perf_counter()
+		self._deadline = None
+		index = port_index(carla)
+		self.desired = {}
+		for out_port, in_port in edges:
+			out_port = resolve_port(out_port, index)
+			in_port = resolve_port(in_port, index)
+			self.desired[self._key(out_port, in_port)] = (out_port, in_port)
+		self.scope = None if scope is None else { client.client_id for client in scope }
+
+	@staticmethod
+	def _key(out_port, in_port):
+		return (out_port.client_id, out_port.port_id, in_port.client_id, in_port.port_id)
+
+	def _in_scope(self, connection):
+		return self.scope is None \
+			or connection.out_port.client_id in self.scope \
+			or connection.in_port.client_id in self.scope
+
+	def diff(self):
+		"""
+		Returns (connects, disconnects):
+			connects:		list of (out_port, in_port) to connect
+			disconnects:	list of PatchbayConnection to remove
+		"""
+		existing = dict(self.carla._connection_index)
+		connects = [ edge for key, edge in self.desired.items() if key not in existing ]
+		disconnects = [ connection for key, connection in existing.items()
+			if key not in self.desired and self._in_scope(connection) ]
+		self.result.unchanged = len(self.desired) - len(connects)
+		return connects, disconnects
+
+	def apply(self):
+		"""
+		Issue the necessary changes. Returns the Future.
+		"""
+		connects, disconnects = self.diff()
+		if not connects and not disconnects:
+			self.future.set_result(self.result)
+			return self.future
+		for out_port, in_port in connects:
+			self._pending_connects[self._key(out_port, in_port)] = (out_port, in_port)
+		for connection in disconnects:
+			self._pending_disconnects[connection.connection_id] = connection
+		# Subscribe before making any change, so that no confirmation can be missed:
+		events = self.carla.events
+		self._subscriptions = [
+			events.subscribe(EVENT_CONNECTION_ADDED, self._connection_added,
+				synchronous = True, weak = False),
+			events.subscribe(EVENT_CONNECTION_REMOVED, self._connection_removed,
+				synchronous = True, weak = False)
+		]
+		# However the Future is resolved, (confirmed, timed out, or cancelled):
+		self.future.add_done_callback(self._cleanup)
+		self._deadline = perf_counter() + self.timeout
+		self.carla.add_idle_hook(self.idle)
+		failed_connects, failed_disconnects = self.carla.patchbay_batch(
+			[ (out_port.client_id, out_port.port_id, in_port.client_id, in_port.port_id)
+				for out_port, in_port in connects ],
+			[ connection.connection_id for connection in disconnects ])
+		with self._lock:
+			for key, reason in failed_connects:
+				out_port, in_port = self._pending_connects.pop(key)
+				self.result.failed.append((out_port, in_port, reason))
+			for connection_id, reason in failed_disconnects:
+				connection = self._pending_disconnects.pop(connection_id, None)
+				if connection is not None:
+					self.result.failed.append((connection.out_port, connection.in_port, reason))
+			self._check_done()
+		return self.future
+
+	def _connection_added(self, connection):
+		with self._lock:
+			edge = self._pending_connects.pop(self._key(connection.out_port, connection.in_port), None)
+			if edge is not None:
+				self.result.connected.append(edge)
+				self._check_done()
+
+	def _connection_removed(self, connection):
+		with self._lock:
+			if self._pending_disconnects.pop(connection.connection_id, None) is not None:
+				self.result.disconnected.append(connection)
+				self._check_done()
+
+	def _check_done(self):
+		if self._pending_connects or self._pending_disconnects:
+			return
+		self._resolve()
+
+	def _resolve(self):
+		if self.future.done():
+			return
+		self.result.elapsed = perf_counter() - self._start
+		try:
+			self.future.set_result(self.result)
+		except InvalidStateError:
+			pass	# Cancelled meanwhile
+
+	def idle(self):
+		"""
+		Called from the engine idle thread. Gives up waiting when the timeout expires;
+		changes which were not confirmed are listed as failed.
+		"""
+		if perf_counter() < self._deadline:
+			return
+		with self._lock:
+			for out_port, in_port in self._pending_connects.values():
+				self.result.failed.append((out_port, in_port, 'Not confirmed'))
+			for connection in self._pending_disconnects.values():
+				self.result.failed.append((connection.out_port, connection.in_port, 'Not confirmed'))
+			self._pending_connects.clear()
+			self._pending_disconnects.clear()
+			self._resolve()
+
+	def _cleanup(self, _):
+		self.carla.remove_idle_hook(self.idle)
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+
+	def cancel(self):
+		"""
+		Stop waiting for confirmations. The Future is cancelled.
+		"""
+		self.future.cancel()
+
+
+#  end simple_carla/routing.py
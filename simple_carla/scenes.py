@@ -0,0 +1,303 @@
+#  simple_carla/scenes.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Scenes are named sets of plugin vars and parameter values which may be recalled
+all at once.
+
+	scenes = SceneManager(carla)
+	scenes.capture('verse')
+	scenes.capture('chorus fx', plugins = [ reverb, delay ], keys = [ 'dry_wet', 'parameters' ])
+	...
+	result = scenes.recall('chorus fx', fade = 0.5)
+
+A scene may be partial; recalling it only changes the plugins and values it
+holds. Plugins are identified by moniker, so scenes may be saved along with a
+session and recalled after it is loaded. (See "Scene.encode_saved_state")
+
+On recall, the scene is compared with the plugins' cached values, and only the
+values which differ are sent to Carla, all while holding the engine lock once
+(see Carla.apply_plugin_states), so they take effect together.
+
+With a fade, continuous values (volume, dry/wet, balance, panning, and float
+parameters) move from their current values to the scene's values over the
+given time, updated from the engine idle thread after every tick. Other values,
+and values which are not known yet (such as the volume of a plugin which has
+never been set), change at the start of the fade, except for plugins being
+deactivated, which are deactivated at the end.
+"""
+import logging, threading
+from time import perf_counter
+
+SCENE_VARS			= ('active', 'dry_wet', 'volume', 'balance_left', 'balance_right', 'panning')
+CONTINUOUS_VARS		= ('dry_wet', 'volume', 'balance_left', 'balance_right', 'panning')
+ALL_PARAMETERS		= 'parameters'
+
+
+def _is_continuous(plugin, key):
+	if isinstance(key, int):
+		param = plugin.parameters[key]
+		return not (param.is_boolean or param.is_integer)
+	return key in CONTINUOUS_VARS
+
+
+class Scene:
+	"""
+	A named set of plugin states.
+
+	Members of interest
+	-------------------
+	name:      (str)
+	states:    (dict)   { plugin moniker: { key: value } } where each key is a
+	                    var name (str) or parameter_id (int)
+	-------------------
+	"""
+
+	def __init__(self, name, states = None):
+		self.name = name
+		self.states = {} if states is None else states
+
+	@classmethod
+	def capture(cls, name, plugins, keys = None):
+		"""
+		Returns a new Scene holding the current (cached) state of the given plugins.
+		keys:	List of var names, parameter_ids, or "parameters" (meaning all input
+				parameters), to capture. Defaults to all vars and input parameters.
+		"""
+		scene = cls(name)
+		for plugin in plugins:
+			state = {}
+			for key in (SCENE_VARS + (ALL_PARAMETERS,) if keys is None else keys):
+				if key == ALL_PARAMETERS:
+					for param in plugin.parameters.values():
+						if param.is_used and param.is_input and not param.is_read_only \
+							and param.value is not None:
+							state[param.parameter_id] = param.value
+				elif isinstance(key, int):
+					if key in plugin.parameters and plugin.parameters[key].value is not None:
+						state[key] = plugin.parameters[key].value
+				elif key in SCENE_VARS:
+					value = getattr(plugin, key)
+					if value is not None:
+						state[key] = value
+				else:
+					raise ValueError(f'"{key}" cannot be captured in a scene')
+			scene.states[plugin.moniker] = state
+		return scene
+
+	def diff(self, plugins):
+		"""
+		Returns a list of (Plugin, key, value) for each value in this scene which
+		differs from the plugin's current (cached) value.
+		plugins:	dict of Plugin, indexed on moniker. Plugins in this scene which
+					are not found are skipped.
+		"""
+		changes = []
+		for moniker, state in self.states.items():
+			plugin = plugins.get(moniker)
+			if plugin is None:
+				continue
+			for key, value in state.items():
+				if isinstance(key, int):
+					param = plugin.parameters.get(key)
+					if param is None or param.value == value:
+						continue
+					if not param.min <= value <= param.max:
+						logging.warning('Scene "%s": %s out of range for %s', self.name, value, param)
+						continue
+				elif getattr(plugin, key) == value:
+					continue
+				changes.append((plugin, key, value))
+		return changes
+
+	def encode_saved_state(self):
+		"""
+		Returns a dict which may be encoded as JSON, and decoded using "Scene.decode".
+		"""
+		return {
+			'name'		: self.name,
+			'states'	: { moniker: { str(key): value for key, value in state.items() }
+							for moniker, state in self.states.items() }
+		}
+
+	@classmethod
+	def decode(cls, saved_state):
+		"""
+		Returns a Scene from a dict returned by "encode_saved_state".
+		"""
+		return cls(saved_state['name'], {
+			moniker: { int(key) if key.isdigit() else key: value for key, value in state.items() }
+			for moniker, state in saved_state['states'].items()
+		})
+
+	def __str__(self):
+		return f'<Scene "{self.name}" ({len(self.states)} plugins)>'
+
+
+class SceneRecall:
+	"""
+	The outcome of SceneManager.recall()
+
+	Members of interest
+	-------------------
+	scene:          (str)    Name of the scene recalled
+	changes:        (int)    Number of values which differed, and were changed
+	diff_time:      (float)  Seconds spent comparing the scene with current values
+	apply_time:     (float)  Seconds spent applying changes (the first step of a fade)
+	fade:           (float)  Fade duration requested
+	fade_complete:  (bool)   False until the fade (if any) finishes
+	elapsed:        (float)  Seconds from the start of the recall until applied,
+	                         or until the fade finished
+	-------------------
+	"""
+
+	def __init__(self, scene, changes, diff_time, apply_time, fade):
+		self.scene = scene
+		self.changes = changes
+		self.diff_time = diff_time
+		self.apply_time = apply_time
+		self.fade = fade
+		self.fade_complete = fade == 0.0
+		self.elapsed = diff_time + apply_time
+
+	def __str__(self):
+		return f'<SceneRecall "{self.scene}" {self.changes} changes in {self.elapsed * 1000:.2f} ms>'
+
+
+class _Fade:
+
+	def __init__(self, ramps, final, duration, recall):
+		self.ramps = ramps				# [ (plugin, key, start value, end value) ]
+		self.final = final				# [ (plugin, key, value) ] applied at the end
+		self.duration = duration
+		self.recall = recall
+		self.start = perf_counter()
+
+
+class SceneManager:
+	"""
+	Keeps scenes by name, and recalls them.
+	"""
+
+	def __init__(self, carla):
+		self.carla = carla
+		self.scenes = {}		# Scene, indexed on name
+		self.last_recall = None
+		self._fade = None
+		self._lock = threading.Lock()	# Held while recalling and for each step of a fade
+
+	def capture(self, name, plugins = None, keys = None):
+		"""
+		Capture the current state of the given plugins (default all) as a scene, and
+		keep it as "name", replacing any scene of that name. Returns the Scene.
+		(See "Scene.capture")
+		"""
+		if plugins is None:
+			plugins = [ plugin for plugin in self.carla.plugins() if plugin.is_ready ]
+		scene = self.scenes[name] = Scene.capture(name, plugins, keys)
+		return scene
+
+	def add(self, scene):
+		"""
+		Keep the given Scene, replacing any scene of the same name.
+		"""
+		self.scenes[scene.name] = scene
+
+	def remove(self, name):
+		"""
+		Forget the scene called "name". Does nothing if there is none.
+		"""
+		self.scenes.pop(name, None)
+
+	def recall(self, scene, fade = 0.0):
+		"""
+		Apply a scene. Returns a SceneRecall.
+		scene:	Scene, or the name of a scene kept by this SceneManager.
+		fade:	Seconds over which to move continuous values to the scene's values.
+		A fade in progress is abandoned, leaving values where they are.
+		"""
+		start = perf_counter()
+		if not isinstance(scene, Scene):
+			scene = self.scenes[scene]
+		with self._lock:
+			return self._recall(scene, fade, start)
+
+	def _recall(self, scene, fade, start):
+		self.cancel_fade()
+		plugins = { plugin.moniker: plugin for plugin in self.carla.plugins()
+			if plugin.is_ready and not plugin.removing_from_carla }
+		changes = scene.diff(plugins)
+		diffed = perf_counter()
+		if fade > 0.0 and changes:
+			immediate, ramps, final = [], [], []
+			for plugin, key, value in changes:
+				current = plugin.parameters[key].value if isinstance(key, int) else getattr(plugin, key)
+				if current is not None and _is_continuous(plugin, key):
+					ramps.append((plugin, key, current, value))
+				elif key == 'active' and not value:
+					final.append((plugin, key, value))
+				else:
+					immediate.append((plugin, key, value))
+			self.carla.apply_plugin_states(immediate)
+			recall = SceneRecall(scene.name, len(changes), diffed - start, perf_counter() - diffed, fade)
+			self._fade = _Fade(ramps, final, fade, recall)
+			self.carla.add_idle_hook(self._fade_tick)
+		else:
+			self.carla.apply_plugin_states(changes)
+			recall = SceneRecall(scene.name, len(changes), diffed - start, perf_counter() - diffed, 0.0)
+		logging.debug('Recalled %s', recall)
+		self.last_recall = recall
+		return recall
+
+	@property
+	def fading(self):
+		"""
+		Returns True if a fade is in progress.
+		"""
+		return self._fade is not None
+
+	def cancel_fade(self):
+		"""
+		Stop a fade in progress, leaving values where they are.
+		"""
+		if self._fade is not None:
+			self._fade = None
+			self.carla.remove_idle_hook(self._fade_tick)
+
+	def _fade_tick(self):
+		with self._lock:
+			self._fade_step()
+
+	def _fade_step(self):
+		fade = self._fade
+		if fade is None:
+			return
+		elapsed = perf_counter() - fade.start
+		position = min(1.0, elapsed / fade.duration)
+		changes = [ (plugin, key, start + (end - start) * position)
+			for plugin, key, start, end in fade.ramps if not plugin.removing_from_carla ]
+		if position >= 1.0:
+			changes.extend(change for change in fade.final if not change[0].removing_from_carla)
+			self.cancel_fade()
+			fade.recall.fade_complete = True
+			fade.recall.elapsed = fade.recall.diff_time + elapsed
+		self.carla.apply_plugin_states(changes)
+
+
+#  end simple_carla/scenes.py
@@ -0,0 +1,487 @@
+#  simple_carla/scripts/sc_benchmark.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Runs a suite of benchmarks against the simple_carla host and prints the results
+as JSON, so that they may be compared between releases.
+
+Runs headless, either against the simulated backend (set the environment
+variable SIMPLE_CARLA_BACKEND=simulated) or against Carla using the "Dummy"
+driver. The benchmarks use Carla's internal "Audio Gain (Stereo)" plugin.
+"""
+import argparse, io, json, logging, platform, subprocess, sys, time, tracemalloc
+from datetime import datetime
+from statistics import mean, median
+from simple_carla import (
+	__version__,
+	SIMULATED_BACKEND,
+	Carla,
+	Plugin,
+	Parameter,
+	PatchbayPort,
+	PLUGIN_INTERNAL,
+	PATCHBAY_PORT_TYPE_AUDIO,
+	PATCHBAY_PORT_IS_INPUT,
+	ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED,
+	ENGINE_CALLBACK_NOTE_ON,
+	ENGINE_CALLBACK_NOTE_OFF,
+	ENGINE_OPTION_PROCESS_MODE,
+	ENGINE_PROCESS_MODE_PATCHBAY,
+	PARAMETER_IS_BOOLEAN,
+	PARAMETER_IS_ENABLED,
+	PARAMETER_IS_AUTOMATABLE
+)
+from carla_backend import BINARY_NATIVE
+
+BENCHMARKS = ['dispatch', 'add', 'remove', 'connect', 'saved_state', 'session', 'parameters', 'memory', 'import']
+
+# Modules timed by the "import" benchmark, each in a fresh interpreter:
+IMPORT_MODULES = ['simple_carla', 'simple_carla.session', 'simple_carla.discovery', 'simple_carla.host',
+	'simple_carla.qt']
+
+# Heavy modules whose presence is reported after each import:
+HEAVY_MODULES = ['carla_backend', 'numpy', 'PyQt5.QtCore', 'simple_carla.host']
+
+_IMPORT_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps([ elapsed, [ name for name in {heavy!r} if name in sys.modules ] ]))
+'''
+
+TIMEOUT = 30.0
+
+
+class GainPlugin(Plugin):
+
+	plugin_def = {
+		'name'		: 'Audio Gain (Stereo)',
+		'build'		: BINARY_NATIVE,
+		'type'		: PLUGIN_INTERNAL,
+		'filename'	: '',
+		'label'		: 'audiogain_s',
+		'uniqueId'	: 0
+	}
+
+
+def register_simulated_plugin():
+	"""
+	Registers a simulated plugin with the same ports and parameters as Carla's
+	internal "audiogain_s".
+	"""
+	from simple_carla.simulated import register_plugin
+	toggle = PARAMETER_IS_ENABLED | PARAMETER_IS_AUTOMATABLE | PARAMETER_IS_BOOLEAN
+	register_plugin('audiogain_s', audio_ins = 2, audio_outs = 2, parameters = [
+		{ 'name': 'Gain', 'min': 0.0, 'max': 4.0, 'def': 1.0 },
+		{ 'name': 'Apply Left', 'min': 0.0, 'max': 1.0, 'def': 1.0, 'hints': toggle },
+		{ 'name': 'Apply Right', 'min': 0.0, 'max': 1.0, 'def': 1.0, 'hints': toggle }
+	])
+
+
+# -------------------------------------------------------------------
+# Helpers
+
+def wait_for(predicate, timeout = TIMEOUT):
+	"""
+	Wait until predicate() returns True. Raises TimeoutError.
+	"""
+	deadline = time.perf_counter() + timeout
+	while not predicate():
+		if time.perf_counter() > deadline:
+			raise TimeoutError()
+		time.sleep(0.0002)
+
+def summarize(samples):
+	"""
+	Returns a dict of statistics for a list of timings, in seconds.
+	"""
+	if not samples:
+		return { 'count': 0 }
+	ordered = sorted(samples)
+	return {
+		'count'		: len(ordered),
+		'mean'		: mean(ordered),
+		'median'	: median(ordered),
+		'p95'		: ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+		'min'		: ordered[0],
+		'max'		: ordered[-1]
+	}
+
+def add_plugin():
+	"""
+	Adds a GainPlugin and waits until it is ready.
+	Returns (plugin, seconds taken)
+	"""
+	plugin = GainPlugin()
+	start = time.perf_counter()
+	plugin.add_to_carla()
+	wait_for(lambda: plugin.is_ready)
+	return plugin, time.perf_counter() - start
+
+def build_rack(size):
+	"""
+	Adds plugins until "size" plugins are loaded. Returns list of Plugin.
+	"""
+	while Carla.instance.plugin_count() < size:
+		add_plugin()
+	return Carla.instance.plugins()
+
+def clear_rack():
+	carla = Carla.instance
+	if not carla.is_clear():
+		carla.remove_all_plugins()
+		wait_for(carla.is_clear)
+
+
+# -------------------------------------------------------------------
+# Benchmarks
+
+def bench_dispatch(options):
+	"""
+	Throughput of the engine callback dispatch path, feeding synthetic parameter
+	change and note callbacks through Carla.dispatch_callback().
+	"""
+	carla = Carla.instance
+	plugin_ids = [ plugin.plugin_id for plugin in build_rack(options.plugins) ]
+	results = {}
+	for name, stream in [
+		('parameter_changed', [
+			(ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED, plugin_ids[idx % len(plugin_ids)], 0, 0, 0,
+				float(idx % 4), None)
+			for idx in range(options.callbacks)
+		]),
+		('notes', [
+			(ENGINE_CALLBACK_NOTE_ON if idx % 2 == 0 else ENGINE_CALLBACK_NOTE_OFF,
+				plugin_ids[idx % len(plugin_ids)], 0, 60, 100, 0.0, None)
+			for idx in range(options.callbacks)
+		])
+	]:
+		start = time.perf_counter()
+		for callback in stream:
+			carla.dispatch_callback(*callback)
+		carla.delivery.flush()
+		elapsed = time.perf_counter() - start
+		results[name] = {
+			'count'			: len(stream),
+			'elapsed'		: elapsed,
+			'per_second'	: len(stream) / elapsed if elapsed else 0.0
+		}
+	clear_rack()
+	return results
+
+def bench_add(options):
+	"""
+	Latency between Plugin.add_to_carla() and the plugin becoming ready, adding
+	plugins one at a time, and adding many plugins at once.
+	"""
+	sequential = [ add_plugin()[1] for _ in range(options.plugins) ]
+	clear_rack()
+	plugins = []
+	start = time.perf_counter()
+	for _ in range(options.plugins):
+		# Unique names are assigned at construction, from the plugins already added,
+		# so each plugin must be added before the next is constructed:
+		plugins.append(GainPlugin())
+		plugins[-1].add_to_carla()
+	wait_for(lambda: all(plugin.is_ready for plugin in plugins))
+	burst = time.perf_counter() - start
+	clear_rack()
+	return {
+		'sequential'	: summarize(sequential),
+		'burst'			: { 'count': len(plugins), 'elapsed': burst }
+	}
+
+def bench_remove(options):
+	"""
+	Time taken to remove a single plugin from the middle of racks of varying sizes,
+	(which causes every subsequent plugin to be renumbered), and to clear the rack.
+	"""
+	results = {}
+	for size in options.rack_sizes:
+		samples = []
+		for _ in range(options.repeat):
+			plugins = build_rack(size)
+			plugin = plugins[len(plugins) // 2]
+			removed = []
+			plugin.on_removed(lambda *_: removed.append(True))
+			start = time.perf_counter()
+			plugin.remove_from_carla()
+			wait_for(lambda: removed)
+			samples.append(time.perf_counter() - start)
+		build_rack(size)
+		start = time.perf_counter()
+		clear_rack()
+		results[str(size)] = {
+			'remove_one'	: summarize(samples),
+			'remove_all'	: time.perf_counter() - start
+		}
+	return results
+
+def bench_connect(options):
+	"""
+	Connection storm; chains every plugin's audio outputs to the next plugin's
+	audio inputs, and measures the time until every connection is registered. Then
+	disconnects everything.
+	"""
+	carla = Carla.instance
+	plugins = build_rack(options.plugins)
+	pairs = []
+	for upstream, downstream in zip(plugins, plugins[1:]):
+		pairs.extend(zip(upstream.audio_outs(), downstream.audio_ins()))
+	expected = len(carla._connections) + len(pairs)
+	start = time.perf_counter()
+	for out_port, in_port in pairs:
+		carla.connect(out_port, in_port)
+	requested = time.perf_counter() - start
+	wait_for(lambda: len(carla._connections) >= expected)
+	connected = time.perf_counter() - start
+	start = time.perf_counter()
+	for plugin in plugins:
+		for connection in plugin.output_connections():
+			connection.disconnect()
+	wait_for(lambda: not any(plugin.connections() for plugin in plugins))
+	disconnected = time.perf_counter() - start
+	clear_rack()
+	return {
+		'connections'		: len(pairs),
+		'request_time'		: requested,
+		'connect_time'		: connected,
+		'connect_per_second': len(pairs) / connected if connected else 0.0,
+		'disconnect_time'	: disconnected
+	}
+
+def bench_saved_state(options):
+	"""
+	Time taken by Plugin.encode_saved_state() and Plugin.restore_saved_state()
+	"""
+	plugins = build_rack(options.plugins)
+	encode, restore = [], []
+	for _ in range(options.repeat):
+		for plugin in plugins:
+			start = time.perf_counter()
+			plugin.saved_state = plugin.encode_saved_state()
+			encode.append(time.perf_counter() - start)
+		for plugin in plugins:
+			start = time.perf_counter()
+			plugin.restore_saved_state()
+			restore.append(time.perf_counter() - start)
+	clear_rack()
+	return {
+		'encode'	: summarize(encode),
+		'restore'	: summarize(restore)
+	}
+
+def bench_session(options):
+	"""
+	Time taken to save a chained rack to a binary session, and to load it again
+	until every plugin is ready and every connection made.
+	"""
+	carla = Carla.instance
+	plugins = build_rack(options.plugins)
+	pairs = []
+	for upstream, downstream in zip(plugins, plugins[1:]):
+		pairs.extend(zip(upstream.audio_outs(), downstream.audio_ins()))
+	carla.connect_many(pairs)
+	wait_for(lambda: len(carla._connections) >= len(pairs))
+	save, load = [], []
+	for _ in range(options.repeat):
+		fob = io.BytesIO()
+		start = time.perf_counter()
+		carla.save_session(fob)
+		save.append(time.perf_counter() - start)
+		clear_rack()
+		fob.seek(0)
+		start = time.perf_counter()
+		result = carla.load_session(fob, lambda saved_state: GainPlugin(saved_state = saved_state),
+			timeout = TIMEOUT).result(TIMEOUT)
+		load.append(time.perf_counter() - start)
+	size = len(fob.getvalue())
+	clear_rack()
+	return {
+		'bytes'		: size,
+		'ok'		: result.ok,
+		'save'		: summarize(save),
+		'load'		: summarize(load)
+	}
+
+def bench_parameters(options):
+	"""
+	Throughput of writes to Parameter.value, alternating each parameter between
+	its minimum and maximum values so that every write reaches Carla.
+	"""
+	parameters = [ param for plugin in build_rack(options.plugins)
+		for param in plugin.parameters.values() if param.is_used and param.is_input ]
+	writes = 0
+	start = time.perf_counter()
+	for idx in range(options.repeat * 10):
+		for param in parameters:
+			param.value = param.min if idx % 2 else param.max
+			writes += 1
+	elapsed = time.perf_counter() - start
+	clear_rack()
+	return {
+		'writes'		: writes,
+		'elapsed'		: elapsed,
+		'per_second'	: writes / elapsed if elapsed else 0.0
+	}
+
+def bench_memory(options):
+	"""
+	Memory allocated per Plugin (including its ports and parameters), per
+	PatchbayPort, and per Parameter.
+	"""
+	clear_rack()
+	tracemalloc.start()
+	before = tracemalloc.take_snapshot()
+	plugins = build_rack(options.plugins)
+	after = tracemalloc.take_snapshot()
+	per_plugin = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / len(plugins)
+	before = tracemalloc.take_snapshot()
+	ports = [ PatchbayPort(0, idx, PATCHBAY_PORT_TYPE_AUDIO | PATCHBAY_PORT_IS_INPUT, 0, f'port_{idx}')
+		for idx in range(options.callbacks // 10) ]
+	after = tracemalloc.take_snapshot()
+	per_port = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / len(ports)
+	before = tracemalloc.take_snapshot()
+	params = [ Parameter(plugins[0].plugin_id, 0) for _ in range(options.callbacks // 10) ]
+	after = tracemalloc.take_snapshot()
+	per_parameter = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / len(params)
+	tracemalloc.stop()
+	del ports, params
+	clear_rack()
+	return {
+		'bytes_per_plugin'		: per_plugin,
+		'bytes_per_port'		: per_port,
+		'bytes_per_parameter'	: per_parameter
+	}
+
+
+def bench_import(options):
+	"""
+	Time taken to import each of IMPORT_MODULES in a fresh interpreter, and which
+	heavy dependencies each import loads.
+	"""
+	results = {}
+	for module in IMPORT_MODULES:
+		samples, loaded = [], None
+		for _ in range(options.repeat):
+			process = subprocess.run([ sys.executable, '-c',
+				_IMPORT_SCRIPT.format(module = module, heavy = HEAVY_MODULES) ],
+				capture_output = True, text = True, timeout = TIMEOUT, check = False)
+			if process.returncode:
+				logging.error('Importing %s failed: %s', module, process.stderr.strip())
+				break
+			elapsed, loaded = json.loads(process.stdout.splitlines()[-1])
+			samples.append(elapsed)
+		results[module] = summarize(samples)
+		results[module]['loads'] = loaded
+	return results
+
+
+# -------------------------------------------------------------------
+# Main
+
+def run(options):
+	"""
+	Starts the engine, runs the selected benchmarks, and returns a dict of results.
+	"""
+	if SIMULATED_BACKEND:
+		register_simulated_plugin()
+	carla = Carla('sc_benchmark')
+	carla.idle_interval = options.idle_interval
+	if options.driver != 'JACK':
+		carla.processMode = ENGINE_PROCESS_MODE_PATCHBAY
+		carla.set_engine_option(ENGINE_OPTION_PROCESS_MODE, carla.processMode, '')
+	carla.engine_init(options.driver)
+	tracer = carla.start_tracing() if options.trace else None
+	report = {
+		'meta'	: {
+			'simple_carla_version'	: __version__,
+			'python_version'		: platform.python_version(),
+			'platform'				: platform.platform(),
+			'backend'				: 'simulated' if SIMULATED_BACKEND else 'carla',
+			'driver'				: options.driver,
+			'idle_interval'			: options.idle_interval,
+			'plugins'				: options.plugins,
+			'callbacks'				: options.callbacks,
+			'repeat'				: options.repeat,
+			'timestamp'				: datetime.now().isoformat(timespec = 'seconds')
+		},
+		'results'	: {}
+	}
+	try:
+		for name in options.benchmarks:
+			logging.debug('Running benchmark "%s"', name)
+			start = time.perf_counter()
+			report['results'][name] = globals()[f'bench_{name}'](options)
+			logging.debug('Benchmark "%s" took %.3fs', name, time.perf_counter() - start)
+		if tracer is not None:
+			carla.stop_tracing()
+			report['library_calls'] = tracer.summary()
+			tracer.write_trace(options.trace)
+	finally:
+		Carla.delete()
+	return report
+
+def main():
+	p = argparse.ArgumentParser()
+	p.epilog = __doc__
+	p.add_argument('benchmarks', type = str, nargs = '*',
+		help = 'Benchmarks to run (default: all). One or more of: ' + ', '.join(BENCHMARKS))
+	p.add_argument('--driver', '-d', type = str, default = 'Dummy',
+		help = 'Carla audio driver to use (default "Dummy")')
+	p.add_argument('--plugins', '-p', type = int, default = 16,
+		help = 'Number of plugins to load for rack -based benchmarks')
+	p.add_argument('--rack-sizes', type = int, nargs = '+', default = [1, 8, 32, 64],
+		help = 'Rack sizes used by the "remove" benchmark')
+	p.add_argument('--callbacks', '-c', type = int, default = 20000,
+		help = 'Number of callbacks dispatched by the "dispatch" benchmark')
+	p.add_argument('--repeat', '-r', type = int, default = 5,
+		help = 'Number of repetitions, where applicable')
+	p.add_argument('--idle-interval', type = float, default = 0.001,
+		help = 'Engine idle interval, in seconds')
+	p.add_argument('--output', '-o', type = str,
+		help = 'Write JSON results to this file instead of stdout')
+	p.add_argument('--trace', '-t', type = str,
+		help = 'Trace library calls; include a summary in the results and write a trace file')
+	p.add_argument("--verbose", "-v", action = "store_true",
+		help = "Show detailed debug information")
+	options = p.parse_args()
+	for name in options.benchmarks:
+		if not name in BENCHMARKS:
+			p.error(f'Unknown benchmark "{name}"')
+	options.benchmarks = options.benchmarks or BENCHMARKS
+	logging.basicConfig(
+		level = logging.DEBUG if options.verbose else logging.ERROR,
+		format = "[%(filename)24s:%(lineno)-4d] %(levelname)-8s %(message)s"
+	)
+	report = run(options)
+	if options.output:
+		with open(options.output, 'w') as fob:
+			json.dump(report, fob, indent = "\t")
+	else:
+		json.dump(report, sys.stdout, indent = "\t")
+		print()
+
+
+if __name__ == "__main__":
+	main()
+
+
+#  end simple_carla/scripts/sc_benchmark.py
@@ -20,45 +20,58 @@
 """
 Allows the user to select a plugin using Carla's plugin dialog and display a
 bunch of info about the plugin in a human -readable format.
+
+In batch mode ("--batch FILE" or "--search TEXT") runs headless, probing many
+plugins at once in a pool of worker processes, and writes one JSON object per
+plugin (JSON Lines). (See simple_carla.probe)
+
+	sc-plugin-info --search reverb --workers 8 > reverbs.jsonl
 """
-import argparse, logging
-from threading import Event
-from PyQt5.QtWidgets import QApplication, QMainWindow
-from PyQt5.QtCore import Qt, pyqtSlot
-from qt_extras import DevilBox
-from simple_carla import EngineInitFailure
-from simple_carla.qt import CarlaQt, QtPlugin, Plugin
-from simple_carla.plugin_dialog import CarlaPluginDialog
-
-
-class MainWindow(QMainWindow):
-
-	def __init__(self):
-		super().__init__()
-		self.ready_event = Event()
-		self.carla = CarlaQt('carla')
-		self.carla.sig_engine_started.connect(self.slot_engine_started)
-		self.carla.engine_init()
-
-	@pyqtSlot(int, int, int, int, float, str)
-	def slot_engine_started(self, *_):
-		logging.debug('======= Engine started ======== ')
-		self.ready_event.set()
-
-	def show_dialog(self):
-		self.ready_event.wait()
-		plugin_def = CarlaPluginDialog(self).exec_dialog()
-		if plugin_def is None:
-			self.close()
-		else:
-			plugin = QtPlugin(plugin_def)
-			plugin.sig_ready.connect(self.plugin_ready, type = Qt.QueuedConnection)
-			plugin.add_to_carla()
-
-	@pyqtSlot(Plugin)
-	def plugin_ready(self, plugin):
-		logging.debug('Received sig_ready from %s', plugin)
-		print(f"""
+import argparse, logging, sys
+from simple_carla.probe import BATCH_TIMEOUT, run_batch, read_plugin_defs, search_plugin_defs
+
+
+def run_dialog():
+	"""
+	Show Carla's plugin dialog and print info about the selected plugin.
+	The Qt modules are imported here, so that batch mode runs without them.
+	"""
+	from threading import Event
+	from PyQt5.QtWidgets import QApplication, QMainWindow
+	from PyQt5.QtCore import Qt, pyqtSlot
+	from qt_extras import DevilBox
+	from simple_carla import EngineInitFailure
+	from simple_carla.qt import CarlaQt, QtPlugin, Plugin
+	from simple_carla.plugin_dialog import CarlaPluginDialog
+
+	class MainWindow(QMainWindow):
+
+		def __init__(self):
+			super().__init__()
+			self.ready_event = Event()
+			self.carla = CarlaQt('carla')
+			self.carla.sig_engine_started.connect(self.slot_engine_started)
+			self.carla.engine_init()
+
+		@pyqtSlot(int, int, int, int, float, str)
+		def slot_engine_started(self, *_):
+			logging.debug('======= Engine started ======== ')
+			self.ready_event.set()
+
+		def show_dialog(self):
+			self.ready_event.wait()
+			plugin_def = CarlaPluginDialog(self).exec_dialog()
+			if plugin_def is None:
+				self.close()
+			else:
+				plugin = QtPlugin(plugin_def)
+				plugin.sig_ready.connect(self.plugin_ready, type = Qt.QueuedConnection)
+				plugin.add_to_carla()
+
+		@pyqtSlot(Plugin)
+		def plugin_ready(self, plugin):
+			logging.debug('Received sig_ready from %s', plugin)
+			print(f"""
 Plugin Name:          {plugin.original_plugin_name}
 Audio Inputs:         {plugin.audio_in_count}
 Audio Outputs:        {plugin.audio_out_count}
@@ -71,41 +84,63 @@ Category:             {plugin.category}
 Label:                {plugin.label}
 Filename:             {plugin.filename}
 """)
-		for param in plugin.parameters.values():
-			param.type_name = 'Boolean' if param.is_boolean \
-				else 'Integer' if param.is_integer \
-				else 'Float'
-			for label, att in [
-				('Parameter:           ', 'name'),
-				('Symbol:              ', 'symbol'),
-				('Comment:             ', 'comment'),
-				('Group Name:          ', 'groupName'),
-				('Unit:                ', 'unit'),
-				('Enabled:             ', 'is_enabled'),
-				('Type:                ', 'type_name'),
-				('Min:                 ', 'min'),
-				('Max:                 ', 'max'),
-				('Step:                ', 'step'),
-				('Automatable:         ', 'is_automatable'),
-				('Read only:           ', 'is_read_only'),
-				('Uses samplerate:     ', 'uses_samplerate'),
-				('Uses scalepoints:    ', 'uses_scalepoints'),
-				('Scale point count:   ', 'scalePointCount'),
-				('Uses custom text:    ', 'uses_custom_text'),
-				('Can be CV controlled:', 'can_be_cv_controlled')
-			]:
-				try:
-					print(label, getattr(param, att));
-				except AttributeError:
-					pass
-			print()
-		self.carla.delete()
-		QApplication.instance().quit()
+			for param in plugin.parameters.values():
+				param.type_name = 'Boolean' if param.is_boolean \
+					else 'Integer' if param.is_integer \
+					else 'Float'
+				for label, att in [
+					('Parameter:           ', 'name'),
+					('Symbol:              ', 'symbol'),
+					('Comment:             ', 'comment'),
+					('Group Name:          ', 'groupName'),
+					('Unit:                ', 'unit'),
+					('Enabled:             ', 'is_enabled'),
+					('Type:                ', 'type_name'),
+					('Min:                 ', 'min'),
+					('Max:                 ', 'max'),
+					('Step:                ', 'step'),
+					('Automatable:         ', 'is_automatable'),
+					('Read only:           ', 'is_read_only'),
+					('Uses samplerate:     ', 'uses_samplerate'),
+					('Uses scalepoints:    ', 'uses_scalepoints'),
+					('Scale point count:   ', 'scalePointCount'),
+					('Uses custom text:    ', 'uses_custom_text'),
+					('Can be CV controlled:', 'can_be_cv_controlled')
+				]:
+					try:
+						print(label, getattr(param, att));
+					except AttributeError:
+						pass
+				print()
+			self.carla.delete()
+			QApplication.instance().quit()
+
+	app = QApplication([])
+	try:
+		window = MainWindow()
+	except EngineInitFailure as e:
+		DevilBox(f'<h2>{e.args[0]}</h2><p>Possible reason:<br/>{e.args[1]}<p>' \
+			if e.args[1] else e.args[0])
+	else:
+		window.show_dialog()
+		app.exec()
 
 
 def main():
 	p = argparse.ArgumentParser()
 	p.epilog = __doc__
+	p.add_argument("--batch", type = str, metavar = "FILE",
+		help = "Probe every plugin_def in FILE (JSON list or JSON Lines, \"-\" for stdin), headless")
+	p.add_argument("--search", type = str, metavar = "TEXT",
+		help = "Probe every discovered plugin whose name, label or maker contains TEXT, headless")
+	p.add_argument("--workers", "-w", type = int,
+		help = "Number of worker processes in batch mode (default: CPU count)")
+	p.add_argument("--timeout", "-t", type = float, default = BATCH_TIMEOUT,
+		help = f"Seconds to allow each plugin to load in batch mode (default {BATCH_TIMEOUT})")
+	p.add_argument("--driver", type = str, default = "Dummy",
+		help = "Audio driver used by batch workers (default \"Dummy\")")
+	p.add_argument("--output", "-o", type = str,
+		help = "Write batch results to this file instead of stdout")
 	p.add_argument("--verbose", "-v", action = "store_true",
 		help = "Show detailed debug information")
 	options = p.parse_args()
@@ -113,15 +148,18 @@ def main():
 		level = logging.DEBUG if options.verbose else logging.ERROR,
 		format = "[%(filename)24s:%(lineno)-4d] %(levelname)-8s %(message)s"
 	)
-	app = QApplication([])
-	try:
-		window = MainWindow()
-	except EngineInitFailure as e:
-		DevilBox(f'<h2>{e.args[0]}</h2><p>Possible reason:<br/>{e.args[1]}<p>' \
-			if e.args[1] else e.args[0])
+	if options.batch is not None or options.search is not None:
+		plugin_defs = read_plugin_defs(options.batch) if options.batch is not None \
+			else search_plugin_defs(options.search)
+		output = sys.stdout if options.output is None else open(options.output, 'w')
+		try:
+			counts = run_batch(plugin_defs, output, options.workers, options.timeout, options.driver)
+		finally:
+			if output is not sys.stdout:
+				output.close()
+		logging.info('Probed %d plugins: %s', len(plugin_defs), counts)
 	else:
-		window.show_dialog()
-		app.exec()
+		run_dialog()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,561 @@
+#  simple_carla/session.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Session snapshots; every plugin (with its vars, parameters and chunk) and every
+connection, written to a compact binary file.
+
+	carla.save_session('project.scs')
+	...
+	future = carla.load_session('project.scs')
+	result = future.result(timeout = 10.0)
+
+Connections are addressed by stable names - the moniker of the client (the
+JACK client name of system clients) and the port name - so that they survive
+Carla assigning different ids when the session is loaded.
+
+Loading is a pipeline: plugins are added to Carla as soon as they are read from
+the file, without waiting for each to become ready, and each connection is made
+from the engine idle thread as soon as both of its ports have appeared. The
+returned concurrent.futures.Future resolves to a SessionResult when every plugin
+is ready and every connection has been made, or when "timeout" expires.
+
+File format
+-----------
+A header (MAGIC, uint16 version) followed by records. Each record is a one-byte
+record type, a uint32 payload length, and the payload, so that readers may skip
+record types they do not know. The stream ends with a RECORD_END record.
+
+	RECORD_HEADER		value: dict of session information
+	RECORD_CHUNK		value: digest, value: chunk data
+	RECORD_PLUGIN		value: plugin_def, value: vars, parameter table, value: chunk
+	RECORD_CONNECTION	4 x value: source client, source port, target client, target port
+	RECORD_END			(empty)
+
+Each distinct chunk is written once, in a RECORD_CHUNK preceding the first plugin
+which uses it. The plugin's chunk value is then the 16-byte digest (as bytes)
+rather than the chunk data (str). (See simple_carla.chunks)
+
+A "value" is a one-byte type tag followed by the data. A parameter table is a
+uint32 count, then the parameter ids as uint32, then the values as float64.
+All numbers are little-endian.
+"""
+import logging, struct, sys, threading
+from array import array
+from concurrent.futures import Future
+from numbers import Integral, Real
+from time import perf_counter
+from simple_carla.event_bus import EVENT_PORT_ADDED
+from simple_carla.chunks import chunk_digest
+
+MAGIC				= b'SCSESS\x00'
+VERSION				= 2
+
+RECORD_HEADER		= 0x48	# 'H'
+RECORD_PLUGIN		= 0x50	# 'P'
+RECORD_CONNECTION	= 0x43	# 'C'
+RECORD_CHUNK		= 0x4B	# 'K'
+RECORD_END			= 0x45	# 'E'
+
+_BIG_ENDIAN = sys.byteorder == 'big'
+_VERSION = struct.Struct('<H')
+_RECORD = struct.Struct('<BI')
+_U8 = struct.Struct('<B')
+_U32 = struct.Struct('<I')
+_I32 = struct.Struct('<i')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+
+
+# -------------------------------------------------------------------
+# Value encoding
+
+def encode_value(value, out):
+	"""
+	Append the encoding of "value" to the bytearray "out". Supports None, bool,
+	int (up to 64 bits), float, str, bytes, and lists, tuples and dicts of those.
+	Other numbers.Integral and numbers.Real, and NumPy scalars, are converted.
+	Raises TypeError for anything else.
+	"""
+	if value is None:
+		out += b'N'
+	elif value is True:
+		out += b'T'
+	elif value is False:
+		out += b'F'
+	else:
+		vtype = type(value)
+		if vtype is float:
+			out += b'd'
+			out += _F64.pack(value)
+		elif vtype is str:
+			data = value.encode('utf-8')
+			if len(data) < 256:
+				out += b's'
+				out += _U8.pack(len(data))
+			else:
+				out += b'S'
+				out += _U32.pack(len(data))
+			out += data
+		elif vtype is int:
+			if -0x80000000 <= value < 0x80000000:
+				out += b'i'
+				out += _I32.pack(value)
+			else:
+				out += b'q'
+				out += _I64.pack(value)
+		elif vtype is dict:
+			out += b'm'
+			out += _U32.pack(len(value))
+			for key, item in value.items():
+				encode_value(key, out)
+				encode_value(item, out)
+		elif vtype is list or vtype is tuple:
+			out += b'l'
+			out += _U32.pack(len(value))
+			for item in value:
+				encode_value(item, out)
+		elif vtype is bytes or vtype is bytearray:
+			out += b'b'
+			out += _U32.pack(len(value))
+			out += value
+		elif isinstance(value, bool):
+			encode_value(bool(value), out)
+		elif isinstance(value, Integral):
+			encode_value(int(value), out)
+		elif isinstance(value, Real):
+			encode_value(float(value), out)
+		elif isinstance(value, str):
+			encode_value(str(value), out)
+		elif 'numpy' in sys.modules and isinstance(value, sys.modules['numpy'].generic):
+			# NumPy scalars, i.e. numpy.bool_, which is not a numbers.Integral:
+			encode_value(value.item(), out)
+		else:
+			raise TypeError(f'Cannot encode {vtype.__name__} in a session')
+
+def decode_value(buf, pos):
+	"""
+	Decode one value from the bytes-like "buf", starting at "pos".
+	Returns (value, new position).
+	"""
+	tag = buf[pos]
+	pos += 1
+	if tag == 0x4E:		# N
+		return None, pos
+	if tag == 0x54:		# T
+		return True, pos
+	if tag == 0x46:		# F
+		return False, pos
+	if tag == 0x64:		# d
+		return _F64.unpack_from(buf, pos)[0], pos + 8
+	if tag == 0x73:		# s
+		length = buf[pos]
+		pos += 1
+		return str(buf[pos:pos + length], 'utf-8'), pos + length
+	if tag == 0x69:		# i
+		return _I32.unpack_from(buf, pos)[0], pos + 4
+	if tag == 0x6D:		# m
+		count = _U32.unpack_from(buf, pos)[0]
+		pos += 4
+		result = {}
+		for _ in range(count):
+			key, pos = decode_value(buf, pos)
+			result[key], pos = decode_value(buf, pos)
+		return result, pos
+	if tag == 0x6C:		# l
+		count = _U32.unpack_from(buf, pos)[0]
+		pos += 4
+		result = []
+		for _ in range(count):
+			item, pos = decode_value(buf, pos)
+			result.append(item)
+		return result, pos
+	if tag == 0x53:		# S
+		length = _U32.unpack_from(buf, pos)[0]
+		pos += 4
+		return str(buf[pos:pos + length], 'utf-8'), pos + length
+	if tag == 0x71:		# q
+		return _I64.unpack_from(buf, pos)[0], pos + 8
+	if tag == 0x62:		# b
+		length = _U32.unpack_from(buf, pos)[0]
+		pos += 4
+		return bytes(buf[pos:pos + length]), pos + length
+	raise ValueError(f'Invalid value tag 0x{tag:02x} at offset {pos - 1}')
+
+def _encode_parameters(parameters, out):
+	ids = array('I', parameters.keys())
+	values = array('d', parameters.values())
+	if _BIG_ENDIAN:
+		ids.byteswap()
+		values.byteswap()
+	out += _U32.pack(len(ids))
+	out += ids.tobytes()
+	out += values.tobytes()
+
+def _decode_parameters(buf, pos):
+	count = _U32.unpack_from(buf, pos)[0]
+	pos += 4
+	ids = array('I')
+	ids.frombytes(buf[pos:pos + count * 4])
+	pos += count * 4
+	values = array('d')
+	values.frombytes(buf[pos:pos + count * 8])
+	pos += count * 8
+	if _BIG_ENDIAN:
+		ids.byteswap()
+		values.byteswap()
+	return dict(zip(ids, values)), pos
+
+def encode_plugin_state(saved_state, out):
+	"""
+	Append the encoding of a plugin's saved state (as returned by
+	Plugin.encode_saved_state) to the bytearray "out".
+	"""
+	encode_value(saved_state['plugin_def'], out)
+	encode_value(saved_state['vars'], out)
+	_encode_parameters({ int(key): float(value) \
+		for key, value in saved_state['parameters'].items() if value is not None }, out)
+	encode_value(saved_state.get('chunk'), out)
+
+def decode_plugin_state(buf, pos):
+	"""
+	Decode a plugin's saved state from the bytes-like "buf", starting at "pos".
+	Returns (saved state dict, new position).
+	"""
+	plugin_def, pos = decode_value(buf, pos)
+	plugin_vars, pos = decode_value(buf, pos)
+	parameters, pos = _decode_parameters(buf, pos)
+	chunk, pos = decode_value(buf, pos)
+	state = {
+		'plugin_def'	: plugin_def,
+		'vars'			: plugin_vars,
+		'parameters'	: parameters
+	}
+	if chunk is not None:
+		state['chunk'] = chunk
+	return state, pos
+
+
+# -------------------------------------------------------------------
+# Streaming write / read
+
+class SessionWriter:
+	"""
+	Writes a session to a binary file object, one record at a time.
+	"""
+
+	def __init__(self, fob):
+		self.fob = fob
+		self.closed = False
+		self._chunks_written = set()
+		fob.write(MAGIC + _VERSION.pack(VERSION))
+
+	def _write_record(self, record_type, payload):
+		self.fob.write(_RECORD.pack(record_type, len(payload)))
+		self.fob.write(payload)
+
+	def write_header(self, info):
+		"""
+		info:	(dict) of session information.
+		"""
+		payload = bytearray()
+		encode_value(info, payload)
+		self._write_record(RECORD_HEADER, payload)
+
+	def write_plugin(self, saved_state):
+		"""
+		saved_state:	(dict) as returned by Plugin.encode_saved_state()
+		"""
+		chunk = saved_state.get('chunk')
+		if chunk:
+			digest = chunk_digest(chunk)
+			if digest not in self._chunks_written:
+				payload = bytearray()
+				encode_value(digest, payload)
+				encode_value(chunk, payload)
+				self._write_record(RECORD_CHUNK, payload)
+				self._chunks_written.add(digest)
+			saved_state = dict(saved_state, chunk = bytes.fromhex(digest))
+		payload = bytearray()
+		encode_plugin_state(saved_state, payload)
+		self._write_record(RECORD_PLUGIN, payload)
+
+	def write_connection(self, source_client, source_port, target_client, target_port):
+		"""
+		Each argument is a (str) name; client moniker or port name.
+		"""
+		payload = bytearray()
+		for name in (source_client, source_port, target_client, target_port):
+			encode_value(name, payload)
+		self._write_record(RECORD_CONNECTION, payload)
+
+	def close(self):
+		"""
+		Write the end record. Does not close the file object.
+		"""
+		if not self.closed:
+			self._write_record(RECORD_END, b'')
+			self.closed = True
+
+
+class SessionReader:
+	"""
+	Reads a session from a binary file object. Iterating yields tuples of
+	(record type, data), where "data" is:
+
+		RECORD_HEADER		dict of session information
+		RECORD_PLUGIN		dict in the format of Plugin.encode_saved_state()
+		RECORD_CONNECTION	(source client, source port, target client, target port)
+
+	Raises ValueError if the file is not a session, or is truncated.
+	"""
+
+	def __init__(self, fob):
+		self.fob = fob
+		magic = fob.read(len(MAGIC) + _VERSION.size)
+		if magic[:len(MAGIC)] != MAGIC:
+			raise ValueError('Not a simple_carla session')
+		self.version = _VERSION.unpack(magic[len(MAGIC):])[0]
+		if self.version > VERSION:
+			raise ValueError(f'Session version {self.version} is newer than supported ({VERSION})')
+		self.chunks = {}	# (str) chunk data, indexed on digest
+
+	def _read(self, size):
+		data = self.fob.read(size)
+		if len(data) != size:
+			raise ValueError('Session file is truncated')
+		return data
+
+	def __iter__(self):
+		while True:
+			record_type, length = _RECORD.unpack(self._read(_RECORD.size))
+			if record_type == RECORD_END:
+				return
+			payload = memoryview(self._read(length))
+			if record_type == RECORD_PLUGIN:
+				state = decode_plugin_state(payload, 0)[0]
+				if type(state.get('chunk')) is bytes:
+					# Instances sharing a chunk share the same str object
+					state['chunk'] = self.chunks[state['chunk'].hex()]
+				yield RECORD_PLUGIN, state
+			elif record_type == RECORD_CHUNK:
+				digest, pos = decode_value(payload, 0)
+				self.chunks[digest] = decode_value(payload, pos)[0]
+			elif record_type == RECORD_CONNECTION:
+				names = []
+				pos = 0
+				for _ in range(4):
+					name, pos = decode_value(payload, pos)
+					names.append(name)
+				yield RECORD_CONNECTION, tuple(names)
+			elif record_type == RECORD_HEADER:
+				yield RECORD_HEADER, decode_value(payload, 0)[0]
+			else:
+				logging.debug('Skipping unknown session record type 0x%02x', record_type)
+
+
+# -------------------------------------------------------------------
+# Save / restore
+
+def save_session(carla, fob, info = None, mark_clean = True):
+	"""
+	Write every plugin and connection of "carla" to the binary file object "fob".
+	info:			(dict) Extra information to store in the header.
+	mark_clean:		If True, each plugin's "is_dirty()" returns False until it changes.
+					(Pass False when saving for some other purpose than the user's save.)
+	Returns (plugin count, connection count)
+	"""
+	plugins = sorted(carla.plugins(), key = lambda plugin: plugin.plugin_id)
+	connections = list(carla._connections.values())
+	header = { 'client_name': carla.client_name, 'plugins': len(plugins),
+		'connections': len(connections) }
+	if info:
+		header.update(info)
+	writer = SessionWriter(fob)
+	writer.write_header(header)
+	for plugin in plugins:
+		writer.write_plugin(plugin.encode_saved_state(mark_clean = mark_clean))
+	for connection in connections:
+		state = connection.encode_saved_state()
+		writer.write_connection(state['source']['client'], state['source']['port'],
+			state['target']['client'], state['target']['port'])
+	writer.close()
+	return len(plugins), len(connections)
+
+
+class SessionResult:
+	"""
+	The outcome of Carla.load_session()
+
+	Members of interest
+	-------------------
+	info:        (dict)   Session information from the file header
+	plugins:     (list)   Plugin objects created
+	connected:   (list)   (out_port, in_port) tuples connected
+	failed:      (list)   (out_port, in_port, reason) tuples which Carla refused
+	unresolved:  (list)   (source client, source port, target client, target port)
+	                      names of connections whose ports never appeared
+	elapsed:     (float)  Seconds from the start of loading until done
+	-------------------
+	"""
+
+	def __init__(self):
+		self.info = {}
+		self.plugins = []
+		self.connected = []
+		self.failed = []
+		self.unresolved = []
+		self.elapsed = 0.0
+
+	@property
+	def ok(self):
+		return not self.failed and not self.unresolved \
+			and all(plugin.is_ready for plugin in self.plugins)
+
+	def __str__(self):
+		return f'<SessionResult {len(self.plugins)} plugins, {len(self.connected)} connections, ' + \
+			f'failed: {len(self.failed)}, unresolved: {len(self.unresolved)} in {self.elapsed:.3f}s>'
+
+
+class SessionLoader:
+	"""
+	Recreates a session, connecting ports as they appear.
+	Usually created by Carla.load_session()
+	"""
+
+	def __init__(self, carla, plugin_factory, timeout = 30.0):
+		"""
+		plugin_factory:	Callable which takes a saved state dict and returns a Plugin.
+		timeout:		Seconds to wait for plugins and ports before giving up.
+		"""
+		self.carla = carla
+		self.plugin_factory = plugin_factory
+		self.timeout = timeout
+		self.future = Future()
+		self.result = SessionResult()
+		self._lock = threading.Lock()
+		self._ports = {}		# PatchbayPort, indexed on (client moniker, port name)
+		self._plugins = set()	# Plugins created by this loader, whose ports may be connected
+		self._waiting = {}		# { (client moniker, port name): [ connection names ] }
+		self._ready = []		# (connection names, out_port, in_port) waiting to be connected
+		self._pending = set()	# connection names not yet connected
+		self._loading = True
+		self._subscriptions = []
+		self._start = perf_counter()
+		self._deadline = None
+
+	def load(self, fob):
+		"""
+		Read the session from the binary file object "fob", adding plugins as they are
+		read. Returns the Future.
+		"""
+		events = self.carla.events
+		self._subscriptions = [
+			events.subscribe(EVENT_PORT_ADDED, self._port_added, synchronous = True, weak = False)
+		]
+		with self._lock:
+			# Plugins already loaded are not connected to, even if a plugin in the
+			# session has the same moniker; only system clients are:
+			for client in list(self.carla._sys_clients.values()):
+				for port in list(client.ports.values()):
+					self._ports[(client.moniker, port.port_name)] = port
+		self.carla.add_idle_hook(self.idle)
+		try:
+			for record_type, data in SessionReader(fob):
+				if record_type == RECORD_PLUGIN:
+					plugin = self.plugin_factory(data)
+					self.result.plugins.append(plugin)
+					with self._lock:
+						self._plugins.add(plugin)
+					plugin.add_to_carla()
+				elif record_type == RECORD_CONNECTION:
+					self._add_connection(data)
+				elif record_type == RECORD_HEADER:
+					self.result.info = data
+		except Exception as e:
+			self._finish(e)
+			raise
+		finally:
+			self._deadline = perf_counter() + self.timeout
+			self._loading = False
+		return self.future
+
+	def _add_connection(self, names):
+		with self._lock:
+			self._pending.add(names)
+			source, target = names[:2], names[2:]
+			missing = [ endpoint for endpoint in (source, target) if endpoint not in self._ports ]
+			if missing:
+				for endpoint in missing:
+					self._waiting.setdefault(endpoint, []).append(names)
+			else:
+				self._ready.append((names, self._ports[source], self._ports[target]))
+
+	def _port_added(self, port):
+		client = self.carla._clients.get(port.client_id)
+		if client is None or (client not in self._plugins \
+			and self.carla._sys_clients.get(client.client_name) is not client):
+			return
+		endpoint = (client.moniker, port.port_name)
+		with self._lock:
+			self._ports[endpoint] = port
+			for names in self._waiting.pop(endpoint, ()):
+				source, target = names[:2], names[2:]
+				if source in self._ports and target in self._ports:
+					self._ready.append((names, self._ports[source], self._ports[target]))
+
+	def idle(self):
+		"""
+		Called from the engine idle thread. Makes the connections whose ports have
+		appeared, and resolves the Future when done.
+		"""
+		with self._lock:
+			ready, self._ready = self._ready, []
+		if ready:
+			failed = self.carla.connect_many((out_port, in_port) for _, out_port, in_port in ready)
+			self.result.failed.extend(failed)
+			failed = { (out_port, in_port) for out_port, in_port, _ in failed }
+			self.result.connected.extend((out_port, in_port) for _, out_port, in_port in ready \
+				if (out_port, in_port) not in failed)
+			with self._lock:
+				self._pending.difference_update(names for names, _, _ in ready)
+		if self._loading:
+			return
+		if not self._pending and all(plugin.is_ready for plugin in self.result.plugins):
+			self._finish()
+		elif perf_counter() > self._deadline:
+			logging.warning('Session load timed out')
+			self._finish()
+
+	def _finish(self, exception = None):
+		self.carla.remove_idle_hook(self.idle)
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+		self._subscriptions = []
+		if self.future.done():
+			return
+		self.result.unresolved = sorted(self._pending)
+		self.result.elapsed = perf_counter() - self._start
+		if exception is None:
+			self.future.set_result(self.result)
+		else:
+			self.future.set_exception(exception)
+
+
+#  end simple_carla/session.py
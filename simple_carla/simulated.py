@@ -0,0 +1,1204 @@
+#  simple_carla/simulated.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+An in-process, pure-Python simulation of the Carla host library.
+
+This module provides the subset of "carla_backend", "carla_shared" and
+"carla_utils" which simple_carla uses, and a SimulatedCarlaLib class which
+implements the "lib.carla_*" functions called by _SimpleCarla.
+
+It is used when the environment variable SIMPLE_CARLA_BACKEND is set to
+"simulated". This allows simple_carla to be tested, benchmarked and load-tested
+on machines without Carla or JACK.
+
+Simulated plugins are looked up by label (or filename) in a registry. Plugins
+which are not registered get a default stereo effect definition:
+
+	from simple_carla.simulated import register_plugin
+	register_plugin('http://example.org/sampler',
+		audio_ins = 0, audio_outs = 2, midi_ins = 1,
+		parameters = [ { 'name': 'Gain', 'min': 0.0, 'max': 2.0, 'def': 1.0 } ],
+		load_time = 0.25)
+
+Every engine callback except ENGINE_STARTED / ENGINE_STOPPED is queued, and
+delivered from carla_engine_idle(), as happens with the real engine. Latency may
+be injected using the "call_latency" and "callback_latency" attributes of the
+SimulatedCarlaLib, (accessible as "carla.lib").
+"""
+import logging, os, threading, time
+from collections import deque
+from ctypes import c_uint64
+from functools import wraps
+
+# -------------------------------------------------------------------
+# Constants, mirroring CarlaBackend.h
+
+# Callback action codes:
+ENGINE_CALLBACK_DEBUG								= 0
+ENGINE_CALLBACK_PLUGIN_ADDED						= 1
+ENGINE_CALLBACK_PLUGIN_REMOVED						= 2
+ENGINE_CALLBACK_PLUGIN_RENAMED						= 3
+ENGINE_CALLBACK_PLUGIN_UNAVAILABLE					= 4
+ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED				= 5
+ENGINE_CALLBACK_PARAMETER_DEFAULT_CHANGED			= 6
+ENGINE_CALLBACK_PARAMETER_MAPPED_CONTROL_INDEX_CHANGED	= 7
+ENGINE_CALLBACK_PARAMETER_MIDI_CHANNEL_CHANGED		= 8
+ENGINE_CALLBACK_OPTION_CHANGED						= 9
+ENGINE_CALLBACK_PROGRAM_CHANGED						= 10
+ENGINE_CALLBACK_MIDI_PROGRAM_CHANGED				= 11
+ENGINE_CALLBACK_UI_STATE_CHANGED					= 12
+ENGINE_CALLBACK_NOTE_ON								= 13
+ENGINE_CALLBACK_NOTE_OFF							= 14
+ENGINE_CALLBACK_UPDATE								= 15
+ENGINE_CALLBACK_RELOAD_INFO							= 16
+ENGINE_CALLBACK_RELOAD_PARAMETERS					= 17
+ENGINE_CALLBACK_RELOAD_PROGRAMS						= 18
+ENGINE_CALLBACK_RELOAD_ALL							= 19
+ENGINE_CALLBACK_PATCHBAY_CLIENT_ADDED				= 20
+ENGINE_CALLBACK_PATCHBAY_CLIENT_REMOVED				= 21
+ENGINE_CALLBACK_PATCHBAY_CLIENT_RENAMED				= 22
+ENGINE_CALLBACK_PATCHBAY_CLIENT_DATA_CHANGED		= 23
+ENGINE_CALLBACK_PATCHBAY_PORT_ADDED					= 24
+ENGINE_CALLBACK_PATCHBAY_PORT_REMOVED				= 25
+ENGINE_CALLBACK_PATCHBAY_PORT_CHANGED				= 26
+ENGINE_CALLBACK_PATCHBAY_CONNECTION_ADDED			= 27
+ENGINE_CALLBACK_PATCHBAY_CONNECTION_REMOVED			= 28
+ENGINE_CALLBACK_ENGINE_STARTED						= 29
+ENGINE_CALLBACK_ENGINE_STOPPED						= 30
+ENGINE_CALLBACK_PROCESS_MODE_CHANGED				= 31
+ENGINE_CALLBACK_TRANSPORT_MODE_CHANGED				= 32
+ENGINE_CALLBACK_BUFFER_SIZE_CHANGED					= 33
+ENGINE_CALLBACK_SAMPLE_RATE_CHANGED					= 34
+ENGINE_CALLBACK_CANCELABLE_ACTION					= 35
+ENGINE_CALLBACK_PROJECT_LOAD_FINISHED				= 36
+ENGINE_CALLBACK_NSM									= 37
+ENGINE_CALLBACK_IDLE								= 38
+ENGINE_CALLBACK_INFO								= 39
+ENGINE_CALLBACK_ERROR								= 40
+ENGINE_CALLBACK_QUIT								= 41
+ENGINE_CALLBACK_INLINE_DISPLAY_REDRAW				= 42
+ENGINE_CALLBACK_PATCHBAY_PORT_GROUP_ADDED			= 43
+ENGINE_CALLBACK_PATCHBAY_PORT_GROUP_REMOVED			= 44
+ENGINE_CALLBACK_PATCHBAY_PORT_GROUP_CHANGED			= 45
+ENGINE_CALLBACK_PARAMETER_MAPPED_RANGE_CHANGED		= 46
+ENGINE_CALLBACK_PATCHBAY_CLIENT_POSITION_CHANGED	= 47
+
+# Engine options
+ENGINE_OPTION_DEBUG						= 0
+ENGINE_OPTION_PROCESS_MODE				= 1
+ENGINE_OPTION_TRANSPORT_MODE			= 2
+ENGINE_OPTION_FORCE_STEREO				= 3
+ENGINE_OPTION_PREFER_PLUGIN_BRIDGES		= 4
+ENGINE_OPTION_PREFER_UI_BRIDGES			= 5
+ENGINE_OPTION_UIS_ALWAYS_ON_TOP			= 6
+ENGINE_OPTION_MAX_PARAMETERS			= 7
+ENGINE_OPTION_RESET_XRUNS				= 8
+ENGINE_OPTION_UI_BRIDGES_TIMEOUT		= 9
+ENGINE_OPTION_AUDIO_BUFFER_SIZE			= 10
+ENGINE_OPTION_AUDIO_SAMPLE_RATE			= 11
+ENGINE_OPTION_AUDIO_TRIPLE_BUFFER		= 12
+ENGINE_OPTION_AUDIO_DRIVER				= 13
+ENGINE_OPTION_AUDIO_DEVICE				= 14
+ENGINE_OPTION_OSC_ENABLED				= 15
+ENGINE_OPTION_OSC_PORT_UDP				= 16
+ENGINE_OPTION_OSC_PORT_TCP				= 17
+ENGINE_OPTION_FILE_PATH					= 18
+ENGINE_OPTION_PLUGIN_PATH				= 19
+ENGINE_OPTION_PATH_BINARIES				= 20
+ENGINE_OPTION_PATH_RESOURCES			= 21
+ENGINE_OPTION_PREVENT_BAD_BEHAVIOUR		= 22
+ENGINE_OPTION_FRONTEND_BACKGROUND_COLOR	= 23
+ENGINE_OPTION_FRONTEND_FOREGROUND_COLOR	= 24
+ENGINE_OPTION_FRONTEND_UI_SCALE			= 25
+ENGINE_OPTION_FRONTEND_WIN_ID			= 26
+ENGINE_OPTION_WINE_EXECUTABLE			= 27
+ENGINE_OPTION_WINE_AUTO_PREFIX			= 28
+ENGINE_OPTION_WINE_FALLBACK_PREFIX		= 29
+ENGINE_OPTION_WINE_RT_PRIO_ENABLED		= 30
+ENGINE_OPTION_WINE_BASE_RT_PRIO			= 31
+ENGINE_OPTION_WINE_SERVER_RT_PRIO		= 32
+ENGINE_OPTION_DEBUG_CONSOLE_OUTPUT		= 33
+ENGINE_OPTION_CLIENT_NAME_PREFIX		= 34
+ENGINE_OPTION_PLUGINS_ARE_STANDALONE	= 35
+
+# Transport modes
+ENGINE_TRANSPORT_MODE_DISABLED			= 0
+ENGINE_TRANSPORT_MODE_INTERNAL			= 1
+ENGINE_TRANSPORT_MODE_JACK				= 2
+ENGINE_TRANSPORT_MODE_PLUGIN			= 3
+ENGINE_TRANSPORT_MODE_BRIDGE			= 4
+
+# Process modes
+ENGINE_PROCESS_MODE_SINGLE_CLIENT		= 0
+ENGINE_PROCESS_MODE_MULTIPLE_CLIENTS	= 1
+ENGINE_PROCESS_MODE_CONTINUOUS_RACK		= 2
+ENGINE_PROCESS_MODE_PATCHBAY			= 3
+ENGINE_PROCESS_MODE_BRIDGE				= 4
+
+# Binary types
+BINARY_NONE								= 0
+BINARY_POSIX32							= 1
+BINARY_POSIX64							= 2
+BINARY_WIN32							= 3
+BINARY_WIN64							= 4
+BINARY_OTHER							= 5
+BINARY_NATIVE							= BINARY_POSIX64
+
+# Plugin types:
+PLUGIN_NONE								= 0
+PLUGIN_INTERNAL							= 1
+PLUGIN_LADSPA							= 2
+PLUGIN_DSSI								= 3
+PLUGIN_LV2								= 4
+PLUGIN_VST2								= 5
+PLUGIN_VST3								= 6
+PLUGIN_AU								= 7
+PLUGIN_DLS								= 8
+PLUGIN_GIG								= 9
+PLUGIN_SF2								= 10
+PLUGIN_SFZ								= 11
+PLUGIN_JACK								= 12
+PLUGIN_JSFX								= 13
+PLUGIN_CLAP								= 14
+
+# Plugin options:
+PLUGIN_OPTION_FIXED_BUFFERS				= 0x001
+PLUGIN_OPTION_FORCE_STEREO				= 0x002
+PLUGIN_OPTION_MAP_PROGRAM_CHANGES		= 0x004
+PLUGIN_OPTION_USE_CHUNKS				= 0x008
+PLUGIN_OPTION_SEND_CONTROL_CHANGES		= 0x010
+PLUGIN_OPTION_SEND_CHANNEL_PRESSURE		= 0x020
+PLUGIN_OPTION_SEND_NOTE_AFTERTOUCH		= 0x040
+PLUGIN_OPTION_SEND_PITCHBEND			= 0x080
+PLUGIN_OPTION_SEND_ALL_SOUND_OFF		= 0x100
+PLUGIN_OPTION_SEND_PROGRAM_CHANGES		= 0x200
+PLUGIN_OPTION_SKIP_SENDING_NOTES		= 0x400
+PLUGIN_OPTIONS_NULL						= 0x10000
+
+# Plugin hints:
+PLUGIN_IS_BRIDGE						= 0x001
+PLUGIN_IS_RTSAFE						= 0x002
+PLUGIN_IS_SYNTH							= 0x004
+PLUGIN_HAS_CUSTOM_UI					= 0x008
+PLUGIN_CAN_DRYWET						= 0x010
+PLUGIN_CAN_VOLUME						= 0x020
+PLUGIN_CAN_BALANCE						= 0x040
+PLUGIN_CAN_PANNING						= 0x080
+PLUGIN_NEEDS_FIXED_BUFFERS				= 0x100
+PLUGIN_NEEDS_UI_MAIN_THREAD				= 0x200
+PLUGIN_USES_MULTI_PROGS					= 0x400
+PLUGIN_HAS_INLINE_DISPLAY				= 0x800
+
+# Parameter types
+PARAMETER_UNKNOWN						= 0
+PARAMETER_INPUT							= 1
+PARAMETER_OUTPUT						= 2
+
+# Parameter hints
+PARAMETER_IS_BOOLEAN					= 0x001
+PARAMETER_IS_INTEGER					= 0x002
+PARAMETER_IS_LOGARITHMIC				= 0x004
+PARAMETER_IS_ENABLED					= 0x010
+PARAMETER_IS_AUTOMATABLE				= 0x020
+PARAMETER_IS_READ_ONLY					= 0x040
+PARAMETER_USES_SAMPLERATE				= 0x100
+PARAMETER_USES_SCALEPOINTS				= 0x200
+PARAMETER_USES_CUSTOM_TEXT				= 0x400
+PARAMETER_CAN_BE_CV_CONTROLLED			= 0x800
+PARAMETER_IS_NOT_SAVED					= 0x1000
+
+# Carla -specific parameter indexes:
+PARAMETER_NULL							= -1
+PARAMETER_ACTIVE						= -2
+PARAMETER_DRYWET						= -3
+PARAMETER_VOLUME						= -4
+PARAMETER_BALANCE_LEFT					= -5
+PARAMETER_BALANCE_RIGHT					= -6
+PARAMETER_PANNING						= -7
+PARAMETER_CTRL_CHANNEL					= -8
+PARAMETER_MAX							= -9
+
+# Port identity
+PATCHBAY_PORT_IS_INPUT					= 0x01
+PATCHBAY_PORT_TYPE_AUDIO				= 0x02
+PATCHBAY_PORT_TYPE_CV					= 0x04
+PATCHBAY_PORT_TYPE_MIDI					= 0x08
+PATCHBAY_PORT_TYPE_OSC					= 0x10
+
+# File open dialog flags
+FILE_CALLBACK_DEBUG						= 0
+FILE_CALLBACK_OPEN						= 1
+FILE_CALLBACK_SAVE						= 2
+
+# -------------------------------------------------------------------
+# carla_shared equivalents
+
+splitter = ':'
+
+CARLA_KEY_PATHS_LADSPA	= 'Paths/LADSPA'
+CARLA_KEY_PATHS_DSSI	= 'Paths/DSSI'
+CARLA_KEY_PATHS_LV2		= 'Paths/LV2'
+CARLA_KEY_PATHS_VST2	= 'Paths/VST2'
+CARLA_KEY_PATHS_VST3	= 'Paths/VST3'
+CARLA_KEY_PATHS_SF2		= 'Paths/SF2'
+CARLA_KEY_PATHS_SFZ		= 'Paths/SFZ'
+
+def _default_path(env_var, *dirs):
+	if os.environ.get(env_var):
+		return os.environ[env_var].split(splitter)
+	return [ os.path.expanduser(path) for path in dirs ]
+
+CARLA_DEFAULT_LADSPA_PATH	= _default_path('LADSPA_PATH', '~/.ladspa', '/usr/lib/ladspa', '/usr/local/lib/ladspa')
+CARLA_DEFAULT_DSSI_PATH		= _default_path('DSSI_PATH', '~/.dssi', '/usr/lib/dssi', '/usr/local/lib/dssi')
+CARLA_DEFAULT_LV2_PATH		= _default_path('LV2_PATH', '~/.lv2', '/usr/lib/lv2', '/usr/local/lib/lv2')
+CARLA_DEFAULT_VST2_PATH		= _default_path('VST_PATH', '~/.vst', '~/.lxvst', '/usr/lib/vst', '/usr/lib/lxvst',
+								'/usr/local/lib/vst', '/usr/local/lib/lxvst')
+CARLA_DEFAULT_VST3_PATH		= _default_path('VST3_PATH', '~/.vst3', '/usr/lib/vst3', '/usr/local/lib/vst3')
+CARLA_DEFAULT_SF2_PATH		= _default_path('SF2_PATH', '~/.sounds/sf2', '~/.sounds/sf3',
+								'/usr/share/sounds/sf2', '/usr/share/sounds/sf3', '/usr/share/soundfonts')
+CARLA_DEFAULT_SFZ_PATH		= _default_path('SFZ_PATH', '~/.sounds/sfz', '/usr/share/sounds/sfz')
+
+DLL_EXTENSION = 'so'
+
+# -------------------------------------------------------------------
+# carla_utils equivalents
+
+_PLUGIN_TYPE_NAMES = {
+	PLUGIN_NONE			: 'Unknown',
+	PLUGIN_INTERNAL		: 'Internal',
+	PLUGIN_LADSPA		: 'LADSPA',
+	PLUGIN_DSSI			: 'DSSI',
+	PLUGIN_LV2			: 'LV2',
+	PLUGIN_VST2			: 'VST2',
+	PLUGIN_VST3			: 'VST3',
+	PLUGIN_AU			: 'AU',
+	PLUGIN_DLS			: 'DLS',
+	PLUGIN_GIG			: 'GIG',
+	PLUGIN_SF2			: 'SF2',
+	PLUGIN_SFZ			: 'SFZ',
+	PLUGIN_JACK			: 'JACK',
+	PLUGIN_JSFX			: 'JSFX',
+	PLUGIN_CLAP			: 'CLAP'
+}
+
+def getPluginTypeAsString(ptype):
+	return _PLUGIN_TYPE_NAMES.get(ptype, 'Unknown')
+
+# -------------------------------------------------------------------
+# carla_backend helper equivalents
+
+c_uintptr = c_uint64
+
+def charPtrToString(char_ptr):
+	if not char_ptr:
+		return ''
+	if isinstance(char_ptr, str):
+		return char_ptr
+	return char_ptr.decode('utf-8', errors = 'ignore')
+
+def charPtrPtrToStringList(char_ptr_ptr):
+	return [ charPtrToString(item) for item in char_ptr_ptr or [] ]
+
+def structToDict(struct):
+	return dict(struct)
+
+def EngineCallbackFunc(func):
+	return func
+
+def FileCallbackFunc(func):
+	return func
+
+
+class _Pointer:
+	"""
+	Mimics a ctypes pointer to a struct, as returned by the Carla library.
+	"""
+
+	__slots__ = ('contents',)
+
+	def __init__(self, contents):
+		self.contents = contents
+
+
+# -------------------------------------------------------------------
+# Simulated plugin registry
+
+_DEFAULT_HINTS = PLUGIN_IS_RTSAFE | PLUGIN_CAN_DRYWET | PLUGIN_CAN_VOLUME | PLUGIN_CAN_BALANCE
+_DEFAULT_OPTIONS_AVAILABLE = PLUGIN_OPTION_FIXED_BUFFERS | PLUGIN_OPTION_FORCE_STEREO
+
+SIMULATED_PLUGINS = {}
+
+def register_plugin(label, *, audio_ins = 2, audio_outs = 2, midi_ins = 0, midi_outs = 0,
+	cv_ins = 0, cv_outs = 0, parameters = None, hints = _DEFAULT_HINTS,
+	options_available = _DEFAULT_OPTIONS_AVAILABLE, options_enabled = 0, maker = 'simple_carla',
+	category = 0, load_time = 0.0, chunk = None, programs = None, fail = None):
+	"""
+	Register a simulated plugin definition, found by "label" when the plugin is added.
+
+	parameters:		A list of dicts, each with any of the keys:
+					'name', 'symbol', 'unit', 'min', 'max', 'def', 'hints', 'output',
+					'scale_points' (list of (label, value) tuples)
+					An (int) may be given instead, to generate that many parameters.
+	load_time:		Seconds between the call to carla_add_plugin and
+					ENGINE_CALLBACK_PLUGIN_ADDED being available to the idle loop.
+	chunk:			(str) chunk data returned by carla_get_chunk_data.
+	programs:		A list of program names.
+	fail:			If a (str) is given, adding the plugin fails with this error.
+	"""
+	if parameters is None:
+		parameters = 4
+	if isinstance(parameters, int):
+		parameters = [ { 'name': f'Parameter {idx + 1}' } for idx in range(parameters) ]
+	SIMULATED_PLUGINS[label] = {
+		'audio_ins'			: audio_ins,
+		'audio_outs'		: audio_outs,
+		'midi_ins'			: midi_ins,
+		'midi_outs'			: midi_outs,
+		'cv_ins'			: cv_ins,
+		'cv_outs'			: cv_outs,
+		'parameters'		: parameters,
+		'hints'				: hints,
+		'options_available'	: options_available,
+		'options_enabled'	: options_enabled,
+		'maker'				: maker,
+		'category'			: category,
+		'load_time'			: load_time,
+		'chunk'				: chunk,
+		'programs'			: programs or [],
+		'fail'				: fail
+	}
+	return SIMULATED_PLUGINS[label]
+
+_DEFAULT_SPEC = register_plugin('')
+
+
+class _SimPort:
+
+	__slots__ = ('port_id', 'flags', 'group_id', 'name')
+
+	def __init__(self, port_id, flags, group_id, name):
+		self.port_id = port_id
+		self.flags = flags
+		self.group_id = group_id
+		self.name = name
+
+
+class _SimClient:
+
+	def __init__(self, client_id, name, plugin = None):
+		self.client_id = client_id
+		self.name = name
+		self.plugin = plugin
+		self.ports = {}
+
+	def add_port(self, flags, name):
+		port = _SimPort(len(self.ports) + 1, flags, 0, name)
+		self.ports[port.port_id] = port
+		return port
+
+
+class _SimPlugin:
+
+	def __init__(self, spec, ptype, btype, filename, name, label, unique_id, options):
+		self.spec = spec
+		self.ptype = ptype
+		self.btype = btype
+		self.filename = filename
+		self.name = name
+		self.label = label
+		self.unique_id = unique_id
+		self.client = None
+		self.active = False
+		self.internal = {
+			PARAMETER_ACTIVE		: 0.0,
+			PARAMETER_DRYWET		: 1.0,
+			PARAMETER_VOLUME		: 1.0,
+			PARAMETER_BALANCE_LEFT	: -1.0,
+			PARAMETER_BALANCE_RIGHT	: 1.0,
+			PARAMETER_PANNING		: 0.0,
+			PARAMETER_CTRL_CHANNEL	: 0.0
+		}
+		self.options_enabled = spec['options_enabled'] \
+			if options == PLUGIN_OPTIONS_NULL else options
+		self.parameters = []
+		for idx, pdef in enumerate(spec['parameters']):
+			minimum = float(pdef.get('min', 0.0))
+			maximum = float(pdef.get('max', 1.0))
+			default = float(pdef.get('def', minimum))
+			hints = pdef.get('hints', PARAMETER_IS_ENABLED | PARAMETER_IS_AUTOMATABLE)
+			scale_points = pdef.get('scale_points', [])
+			if scale_points:
+				hints |= PARAMETER_USES_SCALEPOINTS
+			self.parameters.append({
+				'data'	: {
+					'type'					: PARAMETER_OUTPUT if pdef.get('output') else PARAMETER_INPUT,
+					'hints'					: hints,
+					'index'					: idx,
+					'rindex'				: idx,
+					'midiChannel'			: 0,
+					'mappedControlIndex'	: -1,
+					'mappedMinimum'			: minimum,
+					'mappedMaximum'			: maximum,
+					'mappedFlags'			: 0
+				},
+				'info'	: {
+					'name'					: pdef.get('name', f'Parameter {idx + 1}'),
+					'symbol'				: pdef.get('symbol', f'param_{idx + 1}'),
+					'unit'					: pdef.get('unit', ''),
+					'comment'				: pdef.get('comment', ''),
+					'groupName'				: pdef.get('groupName', ''),
+					'scalePointCount'		: len(scale_points)
+				},
+				'ranges'	: {
+					'def'					: default,
+					'min'					: minimum,
+					'max'					: maximum,
+					'step'					: (maximum - minimum) / 100,
+					'stepSmall'				: (maximum - minimum) / 1000,
+					'stepLarge'				: (maximum - minimum) / 10
+				},
+				'scale_points'	: [ { 'label': label, 'value': value } for label, value in scale_points ],
+				'value'			: default
+			})
+		self.chunk = spec['chunk']
+		self.custom_data = []
+		self.program = 0 if spec['programs'] else -1
+		self.midi_program = -1
+		self.input_peaks = [0.0, 0.0]
+		self.output_peaks = [0.0, 0.0]
+
+
+# -------------------------------------------------------------------
+# Simulated library
+
+class SimulatedCarlaLib:
+	"""
+	Implements the "carla_*" functions of libcarla_standalone2 which are used by
+	_SimpleCarla, maintaining a simulated engine and JACK patchbay.
+
+	Attributes which may be changed to inject latency or load:
+
+	call_latency:		Seconds added to every library call.
+	callback_latency:	Seconds between an event happening and its callback becoming
+						available to carla_engine_idle().
+	base_load:			Simulated DSP load (percent) with no plugins.
+	load_per_plugin:	Simulated DSP load (percent) added by each plugin.
+	system_audio_ins:	Number of system capture ports.
+	system_audio_outs:	Number of system playback ports.
+	system_midi_ins:	Number of system MIDI capture ports.
+	system_midi_outs:	Number of system MIDI playback ports.
+	"""
+
+	call_latency		= 0.0
+	callback_latency	= 0.0
+	base_load			= 1.0
+	load_per_plugin		= 0.5
+	buffer_size			= 512
+	sample_rate			= 48000.0
+	system_audio_ins	= 2
+	system_audio_outs	= 2
+	system_midi_ins		= 1
+	system_midi_outs	= 1
+
+	def __init__(self):
+		self._lock = threading.RLock()
+		self._engine_callback = None
+		self._engine_callback_ptr = None
+		self._file_callback = None
+		self._file_callback_ptr = None
+		self._options = {}
+		self._pending = deque()
+		self._last_error = ''
+		self._reset()
+		if self.call_latency:
+			self._install_call_latency()
+
+	def _reset(self):
+		self._running = False
+		self._driver_name = None
+		self._client_name = None
+		self._plugins = []
+		self._clients = {}
+		self._connections = {}
+		self._next_client_id = 1
+		self._next_connection_id = 1
+		self._xruns = 0
+		self._extra_load = 0.0
+		self._transport = { 'playing': False, 'frame': 0, 'bar': 1, 'beat': 1, 'tick': 0, 'bpm': 120.0 }
+
+	def _install_call_latency(self):
+		"""
+		Wrap every carla_* function so that it sleeps for "call_latency" seconds.
+		"""
+		for name in dir(self):
+			if name.startswith('carla_') and name not in ('carla_engine_idle',):
+				func = getattr(self, name)
+				@wraps(func)
+				def delayed(*args, __func = func, **kwargs):
+					time.sleep(self.call_latency)
+					return __func(*args, **kwargs)
+				setattr(self, name, delayed)
+
+	def set_call_latency(self, seconds):
+		"""
+		Inject latency into every library call.
+		"""
+		self.call_latency = seconds
+		if seconds and 'carla_add_plugin' not in self.__dict__:
+			self._install_call_latency()
+
+	# -------------------------------------------------------------------
+	# Callback queue
+
+	def _queue(self, action, plugin_id = 0, value_1 = 0, value_2 = 0, value_3 = 0,
+		float_val = 0.0, string_val = '', delay = 0.0):
+		due = time.monotonic() + self.callback_latency + delay
+		self._pending.append((due, (action, plugin_id, value_1, value_2, value_3,
+			float_val, string_val.encode('utf-8'))))
+
+	def _emit(self, args):
+		if self._engine_callback is not None:
+			self._engine_callback(self._engine_callback_ptr, *args)
+
+	def _deliver(self, everything = False):
+		"""
+		Deliver all due callbacks, in order. A callback which is not yet due holds
+		back every callback queued after it.
+		"""
+		now = time.monotonic()
+		while True:
+			with self._lock:
+				if not self._pending or (not everything and self._pending[0][0] > now):
+					return
+				_, args = self._pending.popleft()
+			self._emit(args)
+
+	@property
+	def pending_callbacks(self):
+		"""
+		Returns (int) the number of callbacks waiting to be delivered.
+		"""
+		return len(self._pending)
+
+	# -------------------------------------------------------------------
+	# Host / engine
+
+	def carla_standalone_host_init(self):
+		return self
+
+	def carla_set_engine_callback(self, handle, func, ptr):
+		self._engine_callback = func
+		self._engine_callback_ptr = ptr
+
+	def carla_set_file_callback(self, handle, func, ptr):
+		self._file_callback = func
+		self._file_callback_ptr = ptr
+
+	def carla_set_engine_option(self, handle, option, value, value_str):
+		self._options[option] = (value, charPtrToString(value_str))
+
+	def carla_get_engine_driver_count(self):
+		return 2
+
+	def carla_get_engine_driver_name(self, index):
+		return ('JACK', 'Dummy')[index].encode('utf-8')
+
+	def carla_get_engine_driver_device_names(self, index):
+		return [ b'Simulated' ]
+
+	def carla_get_engine_driver_device_info(self, index, name):
+		return _Pointer({ 'hints': 0, 'bufferSizes': [self.buffer_size],
+			'sampleRates': [self.sample_rate] })
+
+	def carla_engine_init(self, handle, driver_name, client_name):
+		with self._lock:
+			if self._running:
+				self._last_error = 'Engine already running'
+				return False
+			self._running = True
+			self._driver_name = charPtrToString(driver_name)
+			self._client_name = charPtrToString(client_name)
+			process_mode = self._options.get(ENGINE_OPTION_PROCESS_MODE, (ENGINE_PROCESS_MODE_MULTIPLE_CLIENTS, ''))[0]
+			transport_mode = self._options.get(ENGINE_OPTION_TRANSPORT_MODE, (ENGINE_TRANSPORT_MODE_JACK, ''))[0]
+		self._emit((ENGINE_CALLBACK_ENGINE_STARTED, 0, process_mode, transport_mode,
+			self.buffer_size, self.sample_rate, self._driver_name.encode('utf-8')))
+		with self._lock:
+			capture = self._new_client('system')
+			for idx in range(self.system_audio_ins):
+				self._new_port(capture, PATCHBAY_PORT_TYPE_AUDIO, f'capture_{idx + 1}')
+			for idx in range(self.system_audio_outs):
+				self._new_port(capture, PATCHBAY_PORT_TYPE_AUDIO | PATCHBAY_PORT_IS_INPUT, f'playback_{idx + 1}')
+			for idx in range(self.system_midi_ins):
+				self._new_port(capture, PATCHBAY_PORT_TYPE_MIDI, f'midi_capture_{idx + 1}')
+			for idx in range(self.system_midi_outs):
+				self._new_port(capture, PATCHBAY_PORT_TYPE_MIDI | PATCHBAY_PORT_IS_INPUT, f'midi_playback_{idx + 1}')
+		return True
+
+	def carla_engine_idle(self, handle):
+		self._deliver()
+
+	def carla_is_engine_running(self, handle):
+		return self._running
+
+	def carla_set_engine_about_to_close(self, handle):
+		return True
+
+	def carla_engine_close(self, handle):
+		if not self._running:
+			self._last_error = 'Engine is not running'
+			return False
+		self.carla_remove_all_plugins(handle)
+		with self._lock:
+			for client in list(self._clients.values()):
+				self._remove_client(client)
+		self._deliver(everything = True)
+		self._emit((ENGINE_CALLBACK_ENGINE_STOPPED, 0, 0, 0, 0, 0.0, b''))
+		with self._lock:
+			self._pending.clear()
+			self._reset()
+		return True
+
+	def carla_get_last_error(self, handle):
+		return self._last_error.encode('utf-8')
+
+	def carla_clear_engine_xruns(self, handle):
+		self._xruns = 0
+
+	def carla_cancel_engine_action(self, handle):
+		pass
+
+	def carla_get_runtime_engine_info(self, handle):
+		return _Pointer({
+			'load'	: min(100.0, self.base_load + self.load_per_plugin * len(self._plugins) + self._extra_load),
+			'xruns'	: self._xruns
+		})
+
+	def carla_get_runtime_engine_driver_device_info(self, handle):
+		return _Pointer({
+			'name'			: 'Simulated',
+			'hints'			: 0,
+			'bufferSize'	: self.buffer_size,
+			'bufferSizes'	: [self.buffer_size],
+			'sampleRate'	: self.sample_rate,
+			'sampleRates'	: [self.sample_rate]
+		})
+
+	def carla_show_engine_device_control_panel(self, handle):
+		return False
+
+	def carla_show_engine_driver_device_control_panel(self, index, name):
+		return False
+
+	def carla_set_engine_buffer_size_and_sample_rate(self, handle, buffer_size, sample_rate):
+		if buffer_size != self.buffer_size:
+			self.buffer_size = buffer_size
+			self._queue(ENGINE_CALLBACK_BUFFER_SIZE_CHANGED, 0, buffer_size)
+		if sample_rate != self.sample_rate:
+			self.sample_rate = sample_rate
+			self._queue(ENGINE_CALLBACK_SAMPLE_RATE_CHANGED, 0, 0, 0, 0, float(sample_rate))
+		return True
+
+	def carla_get_buffer_size(self, handle):
+		return self.buffer_size
+
+	def carla_get_sample_rate(self, handle):
+		return self.sample_rate
+
+	# -------------------------------------------------------------------
+	# Load simulation
+
+	def inject_xruns(self, count = 1):
+		"""
+		Add to the engine's xrun count.
+		"""
+		self._xruns += count
+
+	def inject_load(self, load):
+		"""
+		Add (float) percent to the simulated DSP load.
+		"""
+		self._extra_load = load
+
+	def simulate_parameter_change(self, plugin_id, parameter_id, value):
+		"""
+		Simulate a parameter value changed from within the plugin, (i.e. by its UI).
+		"""
+		with self._lock:
+			plugin = self._plugins[plugin_id]
+			if parameter_id < 0:
+				plugin.internal[parameter_id] = value
+			else:
+				plugin.parameters[parameter_id]['value'] = value
+			self._queue(ENGINE_CALLBACK_PARAMETER_VALUE_CHANGED, plugin_id, parameter_id, 0, 0, float(value))
+
+	def set_peaks(self, plugin_id, input_peaks, output_peaks = None):
+		"""
+		Set the (left, right) peak values reported for a plugin.
+		"""
+		plugin = self._plugins[plugin_id]
+		plugin.input_peaks = list(input_peaks)
+		plugin.output_peaks = list(output_peaks or input_peaks)
+
+	# -------------------------------------------------------------------
+	# Patchbay
+
+	def _new_client(self, name, plugin = None, plugin_id = 0, delay = 0.0):
+		client = _SimClient(self._next_client_id, name, plugin)
+		self._next_client_id += 1
+		self._clients[client.client_id] = client
+		self._queue(ENGINE_CALLBACK_PATCHBAY_CLIENT_ADDED, client.client_id, 0, plugin_id,
+			0, 0.0, name, delay)
+		return client
+
+	def _new_port(self, client, flags, name, delay = 0.0):
+		port = client.add_port(flags, name)
+		self._queue(ENGINE_CALLBACK_PATCHBAY_PORT_ADDED, client.client_id, port.port_id, flags,
+			port.group_id, 0.0, name, delay)
+		return port
+
+	def _remove_client(self, client):
+		for connection_id, conn in list(self._connections.items()):
+			if client.client_id in (conn[0], conn[2]):
+				del self._connections[connection_id]
+				self._queue(ENGINE_CALLBACK_PATCHBAY_CONNECTION_REMOVED, connection_id)
+		for port_id in list(client.ports):
+			self._queue(ENGINE_CALLBACK_PATCHBAY_PORT_REMOVED, client.client_id, port_id)
+		client.ports.clear()
+		del self._clients[client.client_id]
+		self._queue(ENGINE_CALLBACK_PATCHBAY_CLIENT_REMOVED, client.client_id)
+
+	def carla_patchbay_connect(self, handle, external, group_id_a, port_id_a, group_id_b, port_id_b):
+		with self._lock:
+			try:
+				port_a = self._clients[group_id_a].ports[port_id_a]
+				port_b = self._clients[group_id_b].ports[port_id_b]
+			except KeyError:
+				self._last_error = 'Invalid port'
+				return False
+			if port_a.flags & PATCHBAY_PORT_IS_INPUT or not port_b.flags & PATCHBAY_PORT_IS_INPUT:
+				self._last_error = 'Invalid connection direction'
+				return False
+			edge = (group_id_a, port_id_a, group_id_b, port_id_b)
+			if edge in self._connections.values():
+				self._last_error = 'Already connected'
+				return False
+			connection_id = self._next_connection_id
+			self._next_connection_id += 1
+			self._connections[connection_id] = edge
+			self._queue(ENGINE_CALLBACK_PATCHBAY_CONNECTION_ADDED, connection_id,
+				string_val = '{0}:{1}:{2}:{3}'.format(*edge))
+		return True
+
+	def carla_patchbay_disconnect(self, handle, external, connection_id):
+		with self._lock:
+			if connection_id not in self._connections:
+				self._last_error = 'Invalid connection'
+				return False
+			del self._connections[connection_id]
+			self._queue(ENGINE_CALLBACK_PATCHBAY_CONNECTION_REMOVED, connection_id)
+		return True
+
+	def carla_patchbay_set_group_pos(self, handle, external, group_id, x1, y1, x2, y2):
+		return group_id in self._clients
+
+	def carla_patchbay_refresh(self, handle, external):
+		with self._lock:
+			for client in self._clients.values():
+				plugin_id = self._plugins.index(client.plugin) if client.plugin else 0
+				self._queue(ENGINE_CALLBACK_PATCHBAY_CLIENT_ADDED, client.client_id, 0,
+					plugin_id, 0, 0.0, client.name)
+				for port in client.ports.values():
+					self._queue(ENGINE_CALLBACK_PATCHBAY_PORT_ADDED, client.client_id,
+						port.port_id, port.flags, port.group_id, 0.0, port.name)
+			for connection_id, edge in self._connections.items():
+				self._queue(ENGINE_CALLBACK_PATCHBAY_CONNECTION_ADDED, connection_id,
+					string_val = '{0}:{1}:{2}:{3}'.format(*edge))
+		return True
+
+	# -------------------------------------------------------------------
+	# Project / file functions
+
+	def carla_load_file(self, handle, filename):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_load_project(self, handle, filename):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_save_project(self, handle, filename):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_clear_project_filename(self, handle):
+		pass
+
+	# -------------------------------------------------------------------
+	# Transport
+
+	def carla_transport_play(self, handle):
+		self._transport['playing'] = True
+
+	def carla_transport_pause(self, handle):
+		self._transport['playing'] = False
+
+	def carla_transport_bpm(self, handle, bpm):
+		self._transport['bpm'] = bpm
+
+	def carla_transport_relocate(self, handle, frame):
+		self._transport['frame'] = frame
+
+	def carla_get_current_transport_frame(self, handle):
+		return self._transport['frame']
+
+	def carla_get_transport_info(self, handle):
+		return _Pointer(dict(self._transport))
+
+	# -------------------------------------------------------------------
+	# Plugin add / remove
+
+	def carla_get_max_plugin_number(self, handle):
+		return 512 if self._running else 0
+
+	def carla_get_current_plugin_count(self, handle):
+		return len(self._plugins)
+
+	def carla_add_plugin(self, handle, btype, ptype, filename, name, label, unique_id, extra_pointer, options):
+		filename = charPtrToString(filename)
+		name = charPtrToString(name)
+		label = charPtrToString(label)
+		spec = SIMULATED_PLUGINS.get(label) or SIMULATED_PLUGINS.get(filename) or _DEFAULT_SPEC
+		with self._lock:
+			if not self._running:
+				self._last_error = 'Engine is not running'
+				return False
+			if spec['fail']:
+				self._last_error = spec['fail']
+				return False
+			plugin = _SimPlugin(spec, ptype, btype, filename, name or label, label, unique_id, options)
+			plugin_id = len(self._plugins)
+			self._plugins.append(plugin)
+			delay = spec['load_time']
+			self._queue(ENGINE_CALLBACK_PLUGIN_ADDED, plugin_id, ptype, 0, 0, 0.0, plugin.name, delay)
+			plugin.client = client = self._new_client(f'{self._client_name}/{plugin.name}',
+				plugin, plugin_id, delay)
+			for flags, prefix, count in [
+				(PATCHBAY_PORT_TYPE_AUDIO | PATCHBAY_PORT_IS_INPUT, 'audio-in', spec['audio_ins']),
+				(PATCHBAY_PORT_TYPE_AUDIO, 'audio-out', spec['audio_outs']),
+				(PATCHBAY_PORT_TYPE_CV | PATCHBAY_PORT_IS_INPUT, 'cv-in', spec['cv_ins']),
+				(PATCHBAY_PORT_TYPE_CV, 'cv-out', spec['cv_outs']),
+				(PATCHBAY_PORT_TYPE_MIDI | PATCHBAY_PORT_IS_INPUT, 'events-in', spec['midi_ins']),
+				(PATCHBAY_PORT_TYPE_MIDI, 'events-out', spec['midi_outs'])
+			]:
+				for idx in range(count):
+					self._new_port(client, flags, f'{prefix}_{idx + 1}' if count > 1 else prefix, delay)
+		return True
+
+	def carla_remove_plugin(self, handle, plugin_id):
+		with self._lock:
+			if plugin_id >= len(self._plugins):
+				self._last_error = 'Invalid plugin'
+				return False
+			plugin = self._plugins.pop(plugin_id)
+			if plugin.client is not None:
+				self._remove_client(plugin.client)
+			self._queue(ENGINE_CALLBACK_PLUGIN_REMOVED, plugin_id)
+		return True
+
+	def carla_remove_all_plugins(self, handle):
+		with self._lock:
+			for plugin_id in reversed(range(len(self._plugins))):
+				self.carla_remove_plugin(handle, plugin_id)
+		return True
+
+	def carla_rename_plugin(self, handle, plugin_id, new_name):
+		with self._lock:
+			self._plugins[plugin_id].name = charPtrToString(new_name)
+			self._queue(ENGINE_CALLBACK_PLUGIN_RENAMED, plugin_id, string_val = charPtrToString(new_name))
+		return True
+
+	def carla_clone_plugin(self, handle, plugin_id):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_replace_plugin(self, handle, plugin_id):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_switch_plugins(self, handle, plugin_id_a, plugin_id_b):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_load_plugin_state(self, handle, plugin_id, filename):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_save_plugin_state(self, handle, plugin_id, filename):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	def carla_export_plugin_lv2(self, handle, plugin_id, lv2_path):
+		self._last_error = 'Not supported by simulated backend'
+		return False
+
+	# -------------------------------------------------------------------
+	# Plugin information
+
+	def carla_get_plugin_info(self, handle, plugin_id):
+		plugin = self._plugins[plugin_id]
+		return _Pointer({
+			'type'				: plugin.ptype,
+			'category'			: plugin.spec['category'],
+			'hints'				: plugin.spec['hints'],
+			'optionsAvailable'	: plugin.spec['options_available'],
+			'optionsEnabled'	: plugin.options_enabled,
+			'filename'			: plugin.filename,
+			'name'				: plugin.name,
+			'label'				: plugin.label,
+			'maker'				: plugin.spec['maker'],
+			'copyright'			: '',
+			'iconName'			: '',
+			'uniqueId'			: plugin.unique_id
+		})
+
+	def carla_get_real_plugin_name(self, handle, plugin_id):
+		return self._plugins[plugin_id].label.encode('utf-8')
+
+	def carla_get_audio_port_count_info(self, handle, plugin_id):
+		spec = self._plugins[plugin_id].spec
+		return _Pointer({ 'ins': spec['audio_ins'], 'outs': spec['audio_outs'] })
+
+	def carla_get_midi_port_count_info(self, handle, plugin_id):
+		spec = self._plugins[plugin_id].spec
+		return _Pointer({ 'ins': spec['midi_ins'], 'outs': spec['midi_outs'] })
+
+	def carla_get_parameter_count(self, handle, plugin_id):
+		return len(self._plugins[plugin_id].parameters)
+
+	def carla_get_parameter_count_info(self, handle, plugin_id):
+		params = self._plugins[plugin_id].parameters
+		outs = sum(1 for param in params if param['data']['type'] == PARAMETER_OUTPUT)
+		return _Pointer({ 'ins': len(params) - outs, 'outs': outs })
+
+	# -------------------------------------------------------------------
+	# Plugin options / values
+
+	def carla_set_ctrl_channel(self, handle, plugin_id, channel):
+		self._plugins[plugin_id].internal[PARAMETER_CTRL_CHANNEL] = float(channel)
+
+	def carla_set_program(self, handle, plugin_id, program_id):
+		self._plugins[plugin_id].program = program_id
+
+	def carla_set_option(self, handle, plugin_id, option, state):
+		plugin = self._plugins[plugin_id]
+		if state:
+			plugin.options_enabled |= option
+		else:
+			plugin.options_enabled &= ~option
+
+	def carla_set_active(self, handle, plugin_id, state):
+		self._plugins[plugin_id].internal[PARAMETER_ACTIVE] = 1.0 if state else 0.0
+
+	def carla_set_drywet(self, handle, plugin_id, value):
+		self._plugins[plugin_id].internal[PARAMETER_DRYWET] = value
+
+	def carla_set_volume(self, handle, plugin_id, value):
+		self._plugins[plugin_id].internal[PARAMETER_VOLUME] = value
+
+	def carla_set_balance_left(self, handle, plugin_id, value):
+		self._plugins[plugin_id].internal[PARAMETER_BALANCE_LEFT] = value
+
+	def carla_set_balance_right(self, handle, plugin_id, value):
+		self._plugins[plugin_id].internal[PARAMETER_BALANCE_RIGHT] = value
+
+	def carla_set_panning(self, handle, plugin_id, value):
+		self._plugins[plugin_id].internal[PARAMETER_PANNING] = value
+
+	def carla_get_input_peak_value(self, handle, plugin_id, is_left):
+		return self._plugins[plugin_id].input_peaks[0 if is_left else 1]
+
+	def carla_get_output_peak_value(self, handle, plugin_id, is_left):
+		return self._plugins[plugin_id].output_peaks[0 if is_left else 1]
+
+	# -------------------------------------------------------------------
+	# Parameters
+
+	def carla_get_parameter_info(self, handle, plugin_id, parameter_id):
+		return _Pointer(self._plugins[plugin_id].parameters[parameter_id]['info'])
+
+	def carla_get_parameter_ranges(self, handle, plugin_id, parameter_id):
+		return _Pointer(self._plugins[plugin_id].parameters[parameter_id]['ranges'])
+
+	def carla_get_parameter_scalepoint_info(self, handle, plugin_id, parameter_id, scale_point_id):
+		return _Pointer(self._plugins[plugin_id].parameters[parameter_id]['scale_points'][scale_point_id])
+
+	def carla_get_parameter_data(self, handle, plugin_id, parameter_id):
+		return _Pointer(self._plugins[plugin_id].parameters[parameter_id]['data'])
+
+	def carla_get_parameter_text(self, handle, plugin_id, parameter_id):
+		return str(self._plugins[plugin_id].parameters[parameter_id]['value']).encode('utf-8')
+
+	def carla_get_default_parameter_value(self, handle, plugin_id, parameter_id):
+		return self._plugins[plugin_id].parameters[parameter_id]['ranges']['def']
+
+	def carla_get_current_parameter_value(self, handle, plugin_id, parameter_id):
+		return self._plugins[plugin_id].parameters[parameter_id]['value']
+
+	def carla_get_internal_parameter_value(self, handle, plugin_id, parameter_id):
+		plugin = self._plugins[plugin_id]
+		if parameter_id < 0:
+			return plugin.internal.get(parameter_id, 0.0)
+		return plugin.parameters[parameter_id]['value']
+
+	def carla_set_parameter_value(self, handle, plugin_id, parameter_id, value):
+		self._plugins[plugin_id].parameters[parameter_id]['value'] = value
+
+	def carla_reset_parameters(self, handle, plugin_id):
+		for param in self._plugins[plugin_id].parameters:
+			param['value'] = param['ranges']['def']
+
+	def carla_randomize_parameters(self, handle, plugin_id):
+		import random
+		for param in self._plugins[plugin_id].parameters:
+			ranges = param['ranges']
+			param['value'] = random.uniform(ranges['min'], ranges['max'])
+
+	def carla_set_parameter_midi_channel(self, handle, plugin_id, parameter_id, channel):
+		self._plugins[plugin_id].parameters[parameter_id]['data']['midiChannel'] = channel
+
+	def carla_set_parameter_mapped_control_index(self, handle, plugin_id, parameter_id, index):
+		self._plugins[plugin_id].parameters[parameter_id]['data']['mappedControlIndex'] = index
+
+	def carla_set_parameter_mapped_range(self, handle, plugin_id, parameter_id, minimum, maximum):
+		data = self._plugins[plugin_id].parameters[parameter_id]['data']
+		data['mappedMinimum'] = minimum
+		data['mappedMaximum'] = maximum
+
+	def carla_set_parameter_touch(self, handle, plugin_id, parameter_id, touch):
+		pass
+
+	# -------------------------------------------------------------------
+	# Custom / chunk data
+
+	def carla_get_custom_data_count(self, handle, plugin_id):
+		return len(self._plugins[plugin_id].custom_data)
+
+	def carla_get_custom_data(self, handle, plugin_id, custom_data_id):
+		return _Pointer(self._plugins[plugin_id].custom_data[custom_data_id])
+
+	def carla_get_custom_data_value(self, handle, plugin_id, type_, key):
+		for data in self._plugins[plugin_id].custom_data:
+			if data['type'] == charPtrToString(type_) and data['key'] == charPtrToString(key):
+				return data['value'].encode('utf-8')
+		return b''
+
+	def carla_set_custom_data(self, handle, plugin_id, type_, key, value):
+		custom_data = self._plugins[plugin_id].custom_data
+		type_, key, value = charPtrToString(type_), charPtrToString(key), charPtrToString(value)
+		for data in custom_data:
+			if data['type'] == type_ and data['key'] == key:
+				data['value'] = value
+				return
+		custom_data.append({ 'type': type_, 'key': key, 'value': value })
+
+	def carla_get_chunk_data(self, handle, plugin_id):
+		chunk = self._plugins[plugin_id].chunk
+		return chunk.encode('utf-8') if chunk else b''
+
+	def carla_set_chunk_data(self, handle, plugin_id, chunk_data):
+		self._plugins[plugin_id].chunk = charPtrToString(chunk_data)
+
+	def carla_prepare_for_save(self, handle, plugin_id):
+		pass
+
+	# -------------------------------------------------------------------
+	# Programs
+
+	def carla_get_program_count(self, handle, plugin_id):
+		return len(self._plugins[plugin_id].spec['programs'])
+
+	def carla_get_current_program_index(self, handle, plugin_id):
+		return self._plugins[plugin_id].program
+
+	def carla_get_program_name(self, handle, plugin_id, program_id):
+		return self._plugins[plugin_id].spec['programs'][program_id].encode('utf-8')
+
+	def carla_get_midi_program_count(self, handle, plugin_id):
+		return 0
+
+	def carla_get_midi_program_name(self, handle, plugin_id, midi_program_id):
+		return b''
+
+	def carla_get_midi_program_data(self, handle, plugin_id, midi_program_id):
+		return _Pointer({ 'bank': 0, 'program': 0, 'name': '' })
+
+	def carla_get_current_midi_program_index(self, handle, plugin_id):
+		return self._plugins[plugin_id].midi_program
+
+	def carla_set_midi_program(self, handle, plugin_id, midi_program_id):
+		self._plugins[plugin_id].midi_program = midi_program_id
+
+	# -------------------------------------------------------------------
+	# MIDI / UI / OSC / NSM
+
+	def carla_send_midi_note(self, handle, plugin_id, channel, note, velocity):
+		self._queue(ENGINE_CALLBACK_NOTE_ON if velocity else ENGINE_CALLBACK_NOTE_OFF,
+			plugin_id, channel, note, velocity)
+
+	def carla_show_custom_ui(self, handle, plugin_id, state):
+		pass
+
+	def carla_render_inline_display(self, handle, plugin_id, width, height):
+		return None
+
+	def carla_get_host_osc_url_tcp(self, handle):
+		return b''
+
+	def carla_get_host_osc_url_udp(self, handle):
+		return b''
+
+	def carla_nsm_init(self, handle, pid, executable_name):
+		return False
+
+	def carla_nsm_ready(self, handle, opcode):
+		pass
+
+
+class CarlaHostDLL:
+	"""
+	Replacement for carla_backend.CarlaHostDLL which uses SimulatedCarlaLib.
+	"""
+
+	def __init__(self, lib_name, load_global):
+		self.lib = SimulatedCarlaLib()
+		self.handle = self.lib.carla_standalone_host_init()
+
+	def engine_init(self, driver_name, client_name):
+		return bool(self.lib.carla_engine_init(self.handle,
+			driver_name.encode('utf-8'), client_name.encode('utf-8')))
+
+	def engine_close(self):
+		return bool(self.lib.carla_engine_close(self.handle))
+
+	def engine_idle(self):
+		self.lib.carla_engine_idle(self.handle)
+
+
+#  end simple_carla/simulated.py
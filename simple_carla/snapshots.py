@@ -0,0 +1,169 @@
+#  simple_carla/snapshots.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+In-memory snapshots of a plugin's state, kept in named slots, for comparing
+settings:
+
+	slots = SnapshotSlots(plugin)
+	slots.capture('A')
+	...	# tweak
+	slots.capture('B')
+	slots.toggle()		# Back to 'A'
+	slots.toggle()		# 'B' again
+
+A snapshot holds the values of the plugin's input parameters in a float32
+array (Carla's own precision), the plugin's vars (active, dry/wet, volume,
+balance and panning), and for plugins which use chunks, the digest of its chunk
+in a ChunkStore shared by all slots, so identical chunks are kept once. A
+chunk is released from the store when no slot holds it any longer. A snapshot of
+a plugin with 100 parameters takes well under 1 KB.
+
+Recalling a snapshot compares it with the plugin's cached values and sends only
+those which differ to Carla, in one batch. (See Carla.apply_plugin_states)
+
+NumPy and the host are imported on first use, so that importing this module does
+not require Carla.
+"""
+from simple_carla.chunks import ChunkStore, chunk_digest
+
+SNAPSHOT_VARS = ('active', 'dry_wet', 'volume', 'balance_left', 'balance_right', 'panning')
+
+
+class PluginSnapshot:
+	"""
+	The state of a plugin at one moment.
+	"""
+
+	__slots__ = ('values', 'vars', 'chunk')
+
+	def __init__(self, values, vars, chunk):
+		self.values = values	# float32 array, one value per SnapshotSlots.parameter_ids
+		self.vars = vars		# tuple of SNAPSHOT_VARS values
+		self.chunk = chunk		# (str) chunk digest, or None
+
+	@property
+	def nbytes(self):
+		"""
+		Returns (int) the approximate memory used by this snapshot, not including a
+		chunk, which is shared.
+		"""
+		return self.values.nbytes + 8 * len(self.vars) + (32 if self.chunk else 0)
+
+
+class SnapshotSlots:
+	"""
+	Named snapshots of one plugin.
+	"""
+
+	def __init__(self, plugin, store = None):
+		"""
+		plugin:		A Plugin which is ready.
+		store:		ChunkStore to keep chunks in. Defaults to a new in-memory store.
+		"""
+		from numpy import array, int32
+		self.plugin = plugin
+		self.store = ChunkStore() if store is None else store
+		self.parameter_ids = array([ param.parameter_id for param in plugin.parameters.values()
+			if param.is_used and param.is_input and not param.is_read_only ], dtype = int32)
+		self.slots = {}			# PluginSnapshot, indexed on slot name
+		self.current = None		# Name of the slot last captured or recalled
+
+	def _values(self):
+		from numpy import array, float32, nan
+		parameters = self.plugin.parameters
+		return array([ nan if parameters[parameter_id].value is None else parameters[parameter_id].value
+			for parameter_id in self.parameter_ids ], dtype = float32)
+
+	def capture(self, slot = 'A', include_chunk = True):
+		"""
+		Capture the plugin's current state in the named slot, replacing any snapshot
+		already there. Returns the PluginSnapshot.
+		include_chunk:	Include chunk data, if the plugin uses chunks.
+		"""
+		digest = self.plugin.save_chunk(self.store) if include_chunk else None
+		snapshot = PluginSnapshot(self._values(),
+			tuple(getattr(self.plugin, key) for key in SNAPSHOT_VARS), digest)
+		self._release(self.slots.get(slot))
+		self.slots[slot] = snapshot
+		self.current = slot
+		return snapshot
+
+	def _release(self, snapshot):
+		if snapshot is not None and snapshot.chunk is not None:
+			self.store.release(snapshot.chunk)
+
+	def recall(self, slot):
+		"""
+		Restore the plugin to the state in the named slot. Returns (int) the number of
+		vars and parameters changed.
+		Raises KeyError if there is no such slot.
+		"""
+		from numpy import flatnonzero, isnan
+		from simple_carla.host import Carla
+		snapshot = self.slots[slot]
+		plugin = self.plugin
+		if snapshot.chunk is not None:
+			chunk = plugin.chunk_data
+			if chunk is not None and chunk_digest(chunk) != snapshot.chunk:
+				plugin.load_chunk(self.store, snapshot.chunk)
+				for parameter_id in self.parameter_ids:
+					plugin.parameters[int(parameter_id)].get_internal_value()
+		changes = [ (plugin, key, value) for key, value in zip(SNAPSHOT_VARS, snapshot.vars)
+			if value is not None and getattr(plugin, key) != value ]
+		differ = flatnonzero((self._values() != snapshot.values) & ~isnan(snapshot.values))
+		changes.extend((plugin, int(self.parameter_ids[index]), float(snapshot.values[index]))
+			for index in differ)
+		if changes:
+			Carla.instance.apply_plugin_states(changes)
+		self.current = slot
+		return len(changes)
+
+	def toggle(self, a = 'A', b = 'B'):
+		"""
+		Recall slot "b" if "a" was the last captured or recalled, otherwise "a".
+		Returns the name of the slot recalled.
+		"""
+		slot = b if self.current == a else a
+		self.recall(slot)
+		return slot
+
+	def remove(self, slot):
+		"""
+		Forget the named slot. Does nothing if there is none.
+		"""
+		self._release(self.slots.pop(slot, None))
+		if self.current == slot:
+			self.current = None
+
+	def __contains__(self, slot):
+		return slot in self.slots
+
+	def __len__(self):
+		return len(self.slots)
+
+	@property
+	def nbytes(self):
+		"""
+		Returns (int) the approximate memory used by all snapshots, not including chunks.
+		"""
+		return sum(snapshot.nbytes for snapshot in self.slots.values())
+
+
+#  end simple_carla/snapshots.py
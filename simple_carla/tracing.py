@@ -0,0 +1,279 @@
+#  simple_carla/tracing.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Opt-in tracing and profiling of every call made to the Carla host library.
+
+	tracer = carla.start_tracing()
+	...
+	carla.stop_tracing()
+	print(tracer.format_summary())
+	tracer.write_trace('carla-trace.json')
+
+While tracing, every _SimpleCarla method which calls into the library is
+wrapped, recording the number of calls, cumulative and percentile latencies,
+the time spent waiting for the engine lock (for methods decorated with
+@polite_function), and which threads made the calls.
+
+The trace file uses the Chrome "Trace Event" JSON format, which may be opened
+with chrome://tracing, Perfetto (https://ui.perfetto.dev), or speedscope.
+
+The wrappers are installed on the Carla instance only while tracing is enabled.
+When disabled, the original methods are called directly, without any overhead.
+"""
+import json, os, threading
+from collections import deque
+from functools import wraps
+from time import perf_counter
+
+
+def traceable_methods(cls):
+	"""
+	Returns a dict of { name: (function, is_polite) } for every method of the given
+	class which calls into the Carla host library (i.e. refers to "self.lib").
+	"""
+	methods = {}
+	for name in dir(cls):
+		if name.startswith('__'):
+			continue
+		func = getattr(cls, name)
+		if not callable(func) or isinstance(func, type):
+			continue
+		raw = getattr(func, '__wrapped__', func)
+		code = getattr(raw, '__code__', None)
+		if code is not None and 'lib' in code.co_names:
+			methods[name] = (raw, raw is not func)
+	return methods
+
+
+class CallStats:
+	"""
+	Statistics for a single traced method.
+
+	Members of interest
+	-------------------
+	name:          (str)    Method name
+	calls:         (int)    Number of calls
+	total_time:    (float)  Cumulative time, in seconds, including lock wait
+	max_time:      (float)  Longest call, in seconds
+	lock_wait:     (float)  Cumulative time spent waiting for the engine lock
+	max_lock_wait: (float)  Longest wait for the engine lock
+	threads:       (dict)   Number of calls made from each thread, keyed on thread name
+	-------------------
+	"""
+
+	def __init__(self, name, max_samples):
+		self.name = name
+		self.calls = 0
+		self.total_time = 0.0
+		self.max_time = 0.0
+		self.lock_wait = 0.0
+		self.max_lock_wait = 0.0
+		self.threads = {}
+		self.samples = deque(maxlen = max_samples)
+
+	def add(self, elapsed, lock_wait, thread_name):
+		self.calls += 1
+		self.total_time += elapsed
+		if elapsed > self.max_time:
+			self.max_time = elapsed
+		self.lock_wait += lock_wait
+		if lock_wait > self.max_lock_wait:
+			self.max_lock_wait = lock_wait
+		self.threads[thread_name] = self.threads.get(thread_name, 0) + 1
+		self.samples.append(elapsed)
+
+	def percentile(self, pct):
+		"""
+		Returns the given percentile (0 - 100) of the most recent call times.
+		"""
+		if not self.samples:
+			return 0.0
+		ordered = sorted(self.samples)
+		return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+	def as_dict(self):
+		return {
+			'name'			: self.name,
+			'calls'			: self.calls,
+			'total_time'	: self.total_time,
+			'mean_time'		: self.total_time / self.calls if self.calls else 0.0,
+			'p50'			: self.percentile(50),
+			'p95'			: self.percentile(95),
+			'p99'			: self.percentile(99),
+			'max_time'		: self.max_time,
+			'lock_wait'		: self.lock_wait,
+			'max_lock_wait'	: self.max_lock_wait,
+			'threads'		: dict(self.threads)
+		}
+
+
+class CallTracer:
+	"""
+	Wraps the library-calling methods of a Carla instance and records statistics.
+	Usually created by Carla.start_tracing()
+	"""
+
+	def __init__(self, carla, engine_lock, max_samples = 10000, max_events = 200000):
+		"""
+		carla:			The Carla / CarlaQt instance to trace.
+		engine_lock:	The lock which "@polite_function" methods acquire.
+		max_samples:	Number of recent call times kept per method, for percentiles.
+		max_events:		Number of recent calls kept for the trace file. 0 disables.
+		"""
+		self.carla = carla
+		self.engine_lock = engine_lock
+		self.max_samples = max_samples
+		self.stats = {}
+		self.events = deque(maxlen = max_events) if max_events else None
+		self.enabled = False
+		self._lock = threading.Lock()
+		self._start = perf_counter()
+		self._thread_names = {}
+
+	def enable(self):
+		"""
+		Install the tracing wrappers.
+		"""
+		if self.enabled:
+			return
+		for name, (raw, is_polite) in traceable_methods(type(self.carla)).items():
+			setattr(self.carla, name, self._wrap(name, raw, is_polite))
+		self.enabled = True
+
+	def disable(self):
+		"""
+		Remove the tracing wrappers. Statistics collected so far are retained.
+		"""
+		if not self.enabled:
+			return
+		for name in traceable_methods(type(self.carla)):
+			self.carla.__dict__.pop(name, None)
+		self.enabled = False
+
+	def reset(self):
+		"""
+		Discard all statistics and trace events.
+		"""
+		with self._lock:
+			self.stats.clear()
+			if self.events is not None:
+				self.events.clear()
+			self._start = perf_counter()
+
+	def _wrap(self, name, raw, is_polite):
+		carla = self.carla
+		engine_lock = self.engine_lock
+		record = self._record
+
+		if is_polite:
+			@wraps(raw)
+			def traced(*args, **kwargs):
+				start = perf_counter()
+				with engine_lock:
+					acquired = perf_counter()
+					try:
+						return raw(carla, *args, **kwargs)
+					finally:
+						record(name, start, perf_counter(), acquired - start)
+		else:
+			@wraps(raw)
+			def traced(*args, **kwargs):
+				start = perf_counter()
+				try:
+					return raw(carla, *args, **kwargs)
+				finally:
+					record(name, start, perf_counter(), 0.0)
+		return traced
+
+	def _record(self, name, start, finish, lock_wait):
+		thread = threading.current_thread()
+		with self._lock:
+			stats = self.stats.get(name)
+			if stats is None:
+				stats = self.stats[name] = CallStats(name, self.max_samples)
+			stats.add(finish - start, lock_wait, thread.name)
+			if self.events is not None:
+				self._thread_names[thread.ident] = thread.name
+				self.events.append((name, start, finish, lock_wait, thread.ident))
+
+	# -------------------------------------------------------------------
+	# Export
+
+	def summary(self, sort_key = 'total_time'):
+		"""
+		Returns a list of dicts, one per traced method, sorted by "sort_key" descending.
+		"""
+		with self._lock:
+			rows = [ stats.as_dict() for stats in self.stats.values() ]
+		return sorted(rows, key = lambda row: row[sort_key], reverse = True)
+
+	def format_summary(self, sort_key = 'total_time', limit = None):
+		"""
+		Returns a human-readable table of the summary. Times are in milliseconds.
+		"""
+		rows = self.summary(sort_key)[:limit]
+		lines = [ '{:<44} {:>8} {:>10} {:>9} {:>9} {:>9} {:>9} {:>10}  {}'.format(
+			'Method', 'Calls', 'Total', 'Mean', 'p95', 'p99', 'Max', 'Lock wait', 'Threads') ]
+		for row in rows:
+			lines.append('{:<44} {:>8} {:>10.3f} {:>9.4f} {:>9.4f} {:>9.4f} {:>9.4f} {:>10.3f}  {}'.format(
+				row['name'], row['calls'],
+				row['total_time'] * 1000, row['mean_time'] * 1000, row['p95'] * 1000,
+				row['p99'] * 1000, row['max_time'] * 1000, row['lock_wait'] * 1000,
+				', '.join(f'{name}: {count}' for name, count in row['threads'].items())))
+		return '\n'.join(lines)
+
+	def trace_events(self):
+		"""
+		Returns a list of dicts in the Chrome "Trace Event" format.
+		"""
+		pid = os.getpid()
+		with self._lock:
+			events = list(self.events or ())
+			thread_names = dict(self._thread_names)
+			origin = self._start
+		trace = [ {
+			'name'	: 'thread_name',
+			'ph'	: 'M',
+			'pid'	: pid,
+			'tid'	: tid,
+			'args'	: { 'name': name }
+		} for tid, name in thread_names.items() ]
+		for name, start, finish, lock_wait, tid in events:
+			trace.append({
+				'name'	: name,
+				'cat'	: 'carla',
+				'ph'	: 'X',
+				'ts'	: (start - origin) * 1e6,
+				'dur'	: (finish - start) * 1e6,
+				'pid'	: pid,
+				'tid'	: tid,
+				'args'	: { 'lock_wait_us': lock_wait * 1e6 }
+			})
+		return trace
+
+	def write_trace(self, filename):
+		"""
+		Write the recorded calls to a JSON file in the Chrome "Trace Event" format.
+		"""
+		with open(filename, 'w') as fob:
+			json.dump({ 'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms' }, fob)
+
+
+#  end simple_carla/tracing.py
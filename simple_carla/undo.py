@@ -0,0 +1,472 @@
+#  simple_carla/undo.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software
+#  Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston,
+#  MA 02110-1301, USA.
+#
+"""
+Undo / redo history of parameter and var changes, connections, and plugins
+added and removed.
+
+	history = carla.start_undo()
+	...
+	with history.gesture('Brighter'):
+		for param in eq.parameters.values():
+			param.value = ...
+	history.undo()
+	history.redo()
+
+Changes are recorded as they happen, however they are made, as compact entries
+naming plugins and ports by moniker, so that steps still apply after a plugin has
+been removed and added again:
+
+	[ 'v', moniker, key, old value, new value ]			var or parameter change
+	[ 'c', (source client, source port, target client, target port), connected ]
+	[ 'p', moniker, saved state, added ]
+
+Changes made within "coalesce_interval" seconds of each other, or inside a
+"gesture" block, form one step, and repeated changes to the same value within a
+step are merged, so turning a knob is undone in one go. The history is capped at
+"max_entries" entries; the oldest steps are dropped first.
+
+Undoing a step applies all of its var and parameter changes in one batch (see
+Carla.apply_plugin_states) and all of its connections in another. Plugins which
+were removed are added again from their saved state (without chunk data, which
+cannot be fetched once the engine lock is held), and their connections are made
+as their ports appear.
+"""
+import logging, threading
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from simple_carla.event_bus import (
+	EVENT_CONNECTION_ADDED, EVENT_CONNECTION_REMOVED, EVENT_PLUGIN_READY,
+	EVENT_PLUGIN_REMOVED, EVENT_PORT_ADDED
+)
+
+ENTRY_VALUE			= 'v'
+ENTRY_CONNECTION	= 'c'
+ENTRY_PLUGIN		= 'p'
+
+STATE_VARS = ('active', 'dry_wet', 'volume', 'balance_left', 'balance_right', 'panning')
+
+# Seconds to wait for Carla to report a change made when undoing or redoing. A
+# change reported later (or never, i.e. if it failed) is no longer taken to be ours:
+EXPECT_TIMEOUT			= 2.0
+EXPECT_PLUGIN_TIMEOUT	= 60.0	# Plugins may take a long time to load
+
+
+class UndoStep:
+	"""
+	A list of entries undone and redone together.
+	"""
+
+	def __init__(self, name = None):
+		self.name = name
+		self.entries = []
+		self._index = {}	# Entry, indexed on what it changes
+
+	def record(self, key, entry):
+		"""
+		Add an entry, merging it with an earlier entry which changes the same thing.
+		"""
+		previous = self._index.get(key)
+		if previous is None:
+			self._index[key] = entry
+			self.entries.append(entry)
+		elif entry[0] == ENTRY_VALUE:
+			previous[4] = entry[4]		# Keep the original "old" value
+		else:
+			# Connect then disconnect (or add then remove) cancels out:
+			self.entries.remove(previous)
+			del self._index[key]
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __str__(self):
+		return f'<UndoStep "{self.name}" ({len(self.entries)} entries)>'
+
+
+class UndoHistory:
+	"""
+	Records changes and undoes them. Usually created by Carla.start_undo()
+	"""
+
+	def __init__(self, carla, plugin_factory, coalesce_interval = 0.5, max_entries = 100000):
+		"""
+		plugin_factory:		Function which takes a saved state and returns a Plugin,
+							used when adding removed plugins again.
+		coalesce_interval:	Changes made within this many seconds of the previous
+							change (outside of a gesture) join the same step.
+		max_entries:		Total entries kept, in undo and redo steps.
+		"""
+		self.carla = carla
+		self.plugin_factory = plugin_factory
+		self.coalesce_interval = coalesce_interval
+		self.max_entries = max_entries
+		self._lock = threading.RLock()
+		self._undo = deque()		# UndoStep, oldest first
+		self._redo = []				# UndoStep, most recently undone last
+		self._open = None			# Step receiving changes
+		self._gesture_depth = 0
+		self._last_change = 0.0
+		self._entry_count = 0
+		self._values = {}			# { moniker: { key: value } } last known values
+		self._expected = {}			# { change: deadline } made by us, not to be recorded
+		self._removing = set()		# Monikers of plugins we are removing
+		self._pending = []			# Connection names waiting for ports
+		self._port_appeared = False
+		self._subscriptions = ()
+
+	def start(self):
+		"""
+		Begin recording.
+		"""
+		for plugin in self.carla.plugins():
+			if plugin.is_ready:
+				self._remember(plugin)
+		events = self.carla.events
+		self._subscriptions = (
+			events.subscribe(EVENT_CONNECTION_ADDED, self._connection_added, synchronous = True, weak = False),
+			events.subscribe(EVENT_CONNECTION_REMOVED, self._connection_removed, synchronous = True, weak = False),
+			events.subscribe(EVENT_PLUGIN_READY, self._plugin_ready, synchronous = True, weak = False),
+			events.subscribe(EVENT_PLUGIN_REMOVED, self._plugin_removed, synchronous = True, weak = False),
+			events.subscribe(EVENT_PORT_ADDED, self._port_added, synchronous = True, weak = False)
+		)
+		self.carla.add_state_listener(self._state_changed)
+
+	def stop(self):
+		"""
+		Stop recording. The history is kept.
+		"""
+		self.carla.remove_state_listener(self._state_changed)
+		self.carla.remove_idle_hook(self.idle)
+		for subscription in self._subscriptions:
+			subscription.unsubscribe()
+		self._subscriptions = ()
+
+	# -------------------------------------------------------------------
+	# Recording
+
+	@contextmanager
+	def gesture(self, name = None):
+		"""
+		Context manager; all changes made inside the block form one step.
+		"""
+		with self._lock:
+			if self._gesture_depth == 0:
+				self._close()
+				self._open = UndoStep(name)
+			self._gesture_depth += 1
+			step = self._open
+		try:
+			yield step
+		finally:
+			with self._lock:
+				self._gesture_depth -= 1
+				if self._gesture_depth == 0:
+					self._close()
+
+	def _remember(self, plugin):
+		values = { key: getattr(plugin, key) for key in STATE_VARS }
+		values.update((parameter_id, param.value) for parameter_id, param in plugin.parameters.items()
+			if param.is_used)
+		self._values[plugin.moniker] = values
+
+	def _record(self, key, entry):
+		# Called with self._lock held
+		now = perf_counter()
+		if self._open is None or (self._gesture_depth == 0 and now - self._last_change > self.coalesce_interval):
+			self._close()
+			self._open = UndoStep()
+		self._last_change = now
+		before = len(self._open)
+		self._open.record(key, entry)
+		self._entry_count += len(self._open) - before
+		if self._redo:
+			self._entry_count -= sum(len(step) for step in self._redo)
+			self._redo = []
+		self._trim()
+
+	def _close(self):
+		# Called with self._lock held
+		if self._open is not None:
+			if len(self._open):
+				self._undo.append(self._open)
+			self._open = None
+
+	def _trim(self):
+		while self._entry_count > self.max_entries and self._undo:
+			self._entry_count -= len(self._undo.popleft())
+
+	def _state_changed(self, plugin, key, value):
+		with self._lock:
+			values = self._values.setdefault(plugin.moniker, {})
+			old = values.get(key)
+			values[key] = value
+			if self._was_expected(('v', plugin.moniker, key, value)):
+				pass
+			elif old != value and plugin.is_ready:	# Not while restoring saved state
+				self._record(('v', plugin.moniker, key), [ ENTRY_VALUE, plugin.moniker, key, old, value ])
+
+	def _connection_names(self, connection):
+		out_client = self.carla._clients.get(connection.out_port.client_id)
+		in_client = self.carla._clients.get(connection.in_port.client_id)
+		if out_client is None or in_client is None:
+			return None
+		return (out_client.moniker, connection.out_port.port_name,
+			in_client.moniker, connection.in_port.port_name)
+
+	def _connection_changed(self, connection, connected):
+		names = self._connection_names(connection)
+		if names is None:
+			return
+		with self._lock:
+			if self._was_expected(('c', names, connected)):
+				pass
+			elif not connected and (names[0] in self._removing or names[2] in self._removing):
+				pass
+			else:
+				self._record(('c', names), [ ENTRY_CONNECTION, names, connected ])
+
+	def _connection_added(self, connection):
+		self._connection_changed(connection, True)
+
+	def _connection_removed(self, connection):
+		self._connection_changed(connection, False)
+
+	def _plugin_ready(self, plugin):
+		with self._lock:
+			self._remember(plugin)
+			self._removing.discard(plugin.moniker)
+			if not self._was_expected(('p', plugin.moniker, True)):
+				self._record(('p', plugin.moniker), [ ENTRY_PLUGIN, plugin.moniker, None, True ])
+
+	def _plugin_removed(self, plugin):
+		with self._lock:
+			self._values.pop(plugin.moniker, None)
+			if plugin.moniker not in self._removing and plugin.is_ready:
+				self._record(('p', plugin.moniker), [ ENTRY_PLUGIN, plugin.moniker,
+					plugin.encode_saved_state(include_chunk = False), False ])
+
+	# -------------------------------------------------------------------
+	# Undo / redo
+
+	@property
+	def can_undo(self):
+		return bool(self._undo) or (self._open is not None and len(self._open) > 0)
+
+	@property
+	def can_redo(self):
+		return bool(self._redo)
+
+	def undo(self):
+		"""
+		Undo the most recent step. Returns the UndoStep, or None if there was nothing to undo.
+		"""
+		with self._lock:
+			if self._gesture_depth:
+				raise RuntimeError('Cannot undo during a gesture')
+			self._close()
+			if not self._undo:
+				return None
+			step = self._undo.pop()
+			self._redo.append(step)
+		self._perform([ self._inverse(entry) for entry in reversed(step.entries) ], step)
+		return step
+
+	def redo(self):
+		"""
+		Redo the most recently undone step. Returns the UndoStep, or None if there was
+		nothing to redo.
+		"""
+		with self._lock:
+			if not self._redo:
+				return None
+			step = self._redo.pop()
+			self._undo.append(step)
+		self._perform(step.entries, step)
+		return step
+
+	def clear(self):
+		"""
+		Forget all steps.
+		"""
+		with self._lock:
+			self._undo.clear()
+			self._redo = []
+			self._open = None
+			self._entry_count = 0
+			self._expected.clear()
+
+	def stats(self):
+		"""
+		Returns a dict of history statistics.
+		"""
+		return {
+			'undo_steps'	: len(self._undo),
+			'redo_steps'	: len(self._redo),
+			'entries'		: self._entry_count,
+			'max_entries'	: self.max_entries
+		}
+
+	@staticmethod
+	def _inverse(entry):
+		if entry[0] == ENTRY_VALUE:
+			return [ ENTRY_VALUE, entry[1], entry[2], entry[4], entry[3] ]
+		if entry[0] == ENTRY_CONNECTION:
+			return [ ENTRY_CONNECTION, entry[1], not entry[2] ]
+		# The original entry is appended, so that the state of a plugin removed when
+		# undoing its addition can be kept for redoing it.
+		return [ ENTRY_PLUGIN, entry[1], entry[2], not entry[3], entry ]
+
+	def _perform(self, entries, step):
+		"""
+		Make the changes described by "entries" ("new" values; connect / add if true).
+		"""
+		carla = self.carla
+		plugins = { plugin.moniker: plugin for plugin in carla.plugins() if not plugin.removing_from_carla }
+		removals, additions, values, connects, disconnects = [], [], [], [], []
+		for entry in entries:
+			kind = entry[0]
+			if kind == ENTRY_VALUE:
+				plugin = plugins.get(entry[1])
+				if plugin is not None and entry[4] is not None \
+					and (isinstance(entry[2], str) or entry[2] in plugin.parameters):
+					values.append((plugin, entry[2], entry[4]))
+			elif kind == ENTRY_CONNECTION:
+				(connects if entry[2] else disconnects).append(entry[1])
+			elif entry[3]:
+				if entry[2] is None:
+					logging.warning('No saved state to restore plugin "%s"', entry[1])
+				else:
+					additions.append(entry[2])
+			elif entry[1] in plugins:
+				removals.append((plugins[entry[1]], entry))
+		for plugin, entry in removals:
+			# Keep the state, so that the plugin can be added again on redo / undo:
+			original = entry[4] if len(entry) > 4 else entry
+			original[2] = plugin.encode_saved_state()
+		with self._lock:
+			now = perf_counter()
+			self._expected = { change: deadline for change, deadline in self._expected.items() \
+				if deadline >= now }
+			for plugin, _ in removals:
+				self._removing.add(plugin.moniker)
+			for saved_state in additions:
+				self._expected[('p', saved_state['vars']['moniker'], True)] = now + EXPECT_PLUGIN_TIMEOUT
+			for plugin, key, value in values:
+				# Carla reports nothing for a value which does not change:
+				if self._values.get(plugin.moniker, {}).get(key) != value:
+					self._expected[('v', plugin.moniker, key, value)] = now + EXPECT_TIMEOUT
+		for plugin, _ in sorted(removals, key = lambda removal: removal[0].plugin_id, reverse = True):
+			plugin.remove_from_carla()
+		for saved_state in additions:
+			try:
+				self.plugin_factory(saved_state).add_to_carla()
+			except Exception:
+				with self._lock:
+					self._expected.pop(('p', saved_state['vars']['moniker'], True), None)
+				raise
+		if values:
+			carla.apply_plugin_states(values)
+		self._connect(connects, disconnects)
+		logging.debug('Performed %s', step)
+
+	def _expect(self, changes):
+		deadline = perf_counter() + EXPECT_TIMEOUT
+		with self._lock:
+			for change in changes:
+				self._expected[change] = deadline
+
+	def _forget(self, changes):
+		with self._lock:
+			for change in changes:
+				self._expected.pop(change, None)
+
+	def _was_expected(self, change):
+		# Called with self._lock held
+		deadline = self._expected.pop(change, None)
+		return deadline is not None and deadline >= perf_counter()
+
+	def _ports(self):
+		return { (client.moniker, port.port_name): port
+			for client in self.carla.clients() for port in list(client.ports.values()) }
+
+	def _connect(self, connects, disconnects):
+		ports = self._ports()
+		index = self.carla._connection_index
+		connections = {}	# { PatchbayConnection: names }
+		for names in disconnects:
+			out_port, in_port = ports.get(names[:2]), ports.get(names[2:])
+			if out_port is not None and in_port is not None:
+				connection = index.get((out_port.client_id, out_port.port_id, in_port.client_id, in_port.port_id))
+				if connection is not None:
+					connections[connection] = names
+		if connections:
+			self._expect(('c', names, False) for names in connections.values())
+			failed = self.carla.disconnect_many(list(connections))
+			self._forget(('c', connections[connection], False) for connection, _ in failed)
+		pairs, waiting = {}, []		# { (out_port, in_port): names }
+		for names in connects:
+			out_port, in_port = ports.get(names[:2]), ports.get(names[2:])
+			if out_port is None or in_port is None:
+				waiting.append(names)
+			else:
+				pairs[(out_port, in_port)] = names
+		if pairs:
+			self._connect_pairs(pairs)
+		if waiting:
+			with self._lock:
+				self._pending.extend(waiting)
+			self.carla.add_idle_hook(self.idle)
+
+	def _port_added(self, port):
+		self._port_appeared = True
+
+	def idle(self):
+		"""
+		Called from the engine idle thread while connections are waiting for the ports
+		of plugins being added again.
+		"""
+		if not self._port_appeared:
+			return
+		self._port_appeared = False
+		ports = self._ports()
+		with self._lock:
+			ready = [ names for names in self._pending if names[:2] in ports and names[2:] in ports ]
+			self._pending = [ names for names in self._pending if names not in ready ]
+			if not self._pending:
+				self.carla.remove_idle_hook(self.idle)
+		if ready:
+			self._connect_pairs({ (ports[names[:2]], ports[names[2:]]): names for names in ready })
+
+	def _connect_pairs(self, pairs):
+		"""
+		pairs:	{ (out_port, in_port): connection names }
+		"""
+		index = self.carla._connection_index
+		pairs = { (out_port, in_port): names for (out_port, in_port), names in pairs.items() \
+			if (out_port.client_id, out_port.port_id, in_port.client_id, in_port.port_id) not in index }
+		self._expect(('c', names, True) for names in pairs.values())
+		failed = self.carla.connect_many(pairs)
+		for out_port, in_port, reason in failed:
+			logging.warning('Undo could not connect %s to %s: %s', out_port, in_port, reason)
+		self._forget(('c', pairs[(out_port, in_port)], True) for out_port, in_port, _ in failed)
+
+
+#  end simple_carla/undo.py
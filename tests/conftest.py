@@ -0,0 +1,61 @@
+#  simple_carla/tests/conftest.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+"""
+Fixtures for running the tests against the simulated backend. (See simple_carla.simulated)
+"""
+import os
+os.environ['SIMPLE_CARLA_BACKEND'] = 'simulated'
+
+from time import perf_counter, sleep
+import pytest
+from simple_carla import Carla, Plugin
+
+PLUGIN_DEF = {
+	'name'		: 'G',
+	'build'		: 2,
+	'type'		: 1,
+	'filename'	: '',
+	'label'		: 'g',
+	'uniqueId'	: 0
+}
+
+
+def wait_for(condition, timeout = 5.0):
+	"""
+	Wait until condition() returns True. Fails the test after "timeout" seconds.
+	"""
+	deadline = perf_counter() + timeout
+	while not condition():
+		if perf_counter() > deadline:
+			pytest.fail('Timed out waiting for condition')
+		sleep(0.003)
+
+
+@pytest.fixture
+def carla():
+	instance = Carla('simple_carla_test')
+	instance.idle_interval = 0.002
+	try:
+		instance.engine_init('Dummy')
+		yield instance
+	finally:
+		if Carla.instance is instance:		# Not already deleted by the test
+			Carla.delete()
+
+
+@pytest.fixture
+def add_plugin(carla):
+	"""
+	Returns a function which adds a plugin and waits for it to be ready.
+	"""
+	def add_plugin(plugin_def = PLUGIN_DEF):
+		plugin = Plugin(plugin_def)
+		plugin.add_to_carla()
+		wait_for(lambda: plugin.is_ready)
+		return plugin
+	return add_plugin
+
+
+#  end simple_carla/tests/conftest.py
@@ -0,0 +1,24 @@
+#  simple_carla/tests/test_benchmark.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import json
+from argparse import Namespace
+from simple_carla.scripts import sc_benchmark
+
+
+def test_every_benchmark_runs(tmp_path):
+	options = Namespace(benchmarks = sc_benchmark.BENCHMARKS, driver = 'Dummy', plugins = 2,
+		rack_sizes = [1, 2], callbacks = 200, repeat = 1, idle_interval = 0.001,
+		trace = str(tmp_path / 'trace.json'))
+	report = sc_benchmark.run(options)
+	json.dumps(report)
+	assert report['meta']['backend'] == 'simulated'
+	assert set(report['results']) == set(sc_benchmark.BENCHMARKS)
+	assert report['results']['dispatch']
+	assert all(result['count'] == 1 for result in report['results']['import'].values())
+	assert report['library_calls']
+	assert (tmp_path / 'trace.json').exists()
+
+
+#  end simple_carla/tests/test_benchmark.py
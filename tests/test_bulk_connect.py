@@ -0,0 +1,59 @@
+#  simple_carla/tests/test_bulk_connect.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import logging
+import pytest
+from conftest import wait_for
+
+
+@pytest.fixture
+def plugins(add_plugin):
+	return add_plugin(), add_plugin()
+
+
+def test_connect_many(carla, plugins):
+	a, b = plugins
+	pairs = list(zip(a.audio_outs(), b.audio_ins()))
+	assert carla.connect_many(pairs + pairs) == []		# Repeats skipped
+	wait_for(lambda: len(carla._connections) == 2)
+	calls = []
+	carla.patchbay_batch = lambda connects, disconnects: calls.append(connects)
+	assert carla.connect_many(pairs) == []				# Already connected
+	assert calls == []
+
+
+def test_disconnect_many(carla, plugins):
+	a, b = plugins
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: len(carla._connections) == 2)
+	connections = list(carla._connections.values())
+	assert carla.disconnect_many(connections + connections) == []
+	wait_for(lambda: len(carla._connections) == 0)
+	assert carla.disconnect_many(connections) == []		# Already removed
+
+
+def test_connect_failures_raise(carla, plugins):
+	a, b = plugins
+	out_port, in_port = b.audio_ins()[0], a.audio_outs()[0]	# Wrong direction
+	assert carla.connect_many([ (out_port, in_port) ]) == \
+		[ (out_port, in_port, 'Invalid connection direction') ]
+	carla.lib.carla_patchbay_connect = lambda *args: False
+	carla.lib._last_error = 'Refused'
+	with pytest.raises(RuntimeError, match = 'Refused'):
+		a.connect_audio_outputs_to(b)
+
+
+def test_disconnect_failures_logged(carla, plugins, caplog):
+	a, b = plugins
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: len(carla._connections) == 2)
+	carla.lib.carla_patchbay_disconnect = lambda *args: False
+	with caplog.at_level(logging.ERROR):
+		a.disconnect_all()
+	assert len([ record for record in caplog.records \
+		if record.getMessage().startswith('Patchbay disconnect failed') ]) == 2
+	assert len(carla._connections) == 2
+
+
+#  end simple_carla/tests/test_bulk_connect.py
@@ -0,0 +1,73 @@
+#  simple_carla/tests/test_chunks.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import io
+import pytest
+from simple_carla.chunks import ChunkStore, chunk_digest
+from simple_carla.session import SessionReader, RECORD_PLUGIN
+from simple_carla.simulated import register_plugin, SIMULATED_PLUGINS, PLUGIN_OPTION_USE_CHUNKS
+from conftest import PLUGIN_DEF
+
+
+@pytest.fixture
+def chunky_def():
+	register_plugin('test-chunky', chunk = 'preset ' * 100,
+		options_available = PLUGIN_OPTION_USE_CHUNKS, options_enabled = PLUGIN_OPTION_USE_CHUNKS)
+	yield dict(PLUGIN_DEF, name = 'Chunky', label = 'test-chunky')
+	del SIMULATED_PLUGINS['test-chunky']
+
+
+def test_references():
+	store = ChunkStore()
+	digest = store.put('state')
+	assert digest == chunk_digest('state')
+	assert store.put('state') == digest
+	assert len(store) == 1
+	store.release(digest)
+	assert store.get(digest) == 'state'
+	store.release(digest)
+	assert digest not in store
+	with pytest.raises(KeyError):
+		store.get(digest)
+
+
+def test_directory(tmp_path):
+	store = ChunkStore(tmp_path)
+	digest = store.put('state')
+	store.release(digest)
+	assert len(store) == 0
+	# Kept on disk, for other sessions:
+	other = ChunkStore(tmp_path)
+	assert digest in other
+	assert other.get(digest) == 'state'
+	other.discard(digest)
+	assert digest not in ChunkStore(tmp_path)
+
+
+def test_plugin_chunks(carla, add_plugin, chunky_def):
+	a, b = add_plugin(chunky_def), add_plugin(chunky_def)
+	assert a.chunk_data == 'preset ' * 100
+	store = ChunkStore()
+	digest = a.save_chunk(store)
+	assert b.save_chunk(store) == digest
+	assert len(store) == 1
+	b.chunk_data = 'other'
+	assert b.is_dirty()
+	b.load_chunk(store, digest)
+	assert b.chunk_data == a.chunk_data
+	assert add_plugin().save_chunk(store) is None
+
+
+def test_session_writes_chunk_once(carla, add_plugin, chunky_def):
+	a, b = add_plugin(chunky_def), add_plugin(chunky_def)
+	fob = io.BytesIO()
+	carla.save_session(fob)
+	assert fob.getvalue().count(a.chunk_data.encode()) == 1
+	fob.seek(0)
+	states = [ state for record_type, state in SessionReader(fob) if record_type == RECORD_PLUGIN ]
+	assert [ state['chunk'] for state in states ] == [ a.chunk_data ] * 2
+	assert states[0]['chunk'] is states[1]['chunk']
+
+
+#  end simple_carla/tests/test_chunks.py
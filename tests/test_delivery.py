@@ -0,0 +1,108 @@
+#  simple_carla/tests/test_delivery.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import asyncio, threading
+import pytest
+from time import sleep
+from simple_carla.delivery import AsyncioDelivery, ThreadPoolDelivery
+from conftest import wait_for
+
+
+@pytest.mark.parametrize('mode', ['sync', 'thread'])
+def test_removal_order(carla, add_plugin, mode):
+	carla.set_delivery_mode(mode)
+	log = []
+	def plugin_removed(plugin):
+		sleep(0.02)
+		log.append(('removed', plugin.moniker))
+	carla.on_plugin_removed(plugin_removed)
+	carla.on_last_plugin_removed(lambda: log.append(('last',)))
+	plugin = add_plugin()
+	plugin.remove_from_carla()
+	wait_for(lambda: len(log) == 2)
+	assert log == [('removed', plugin.moniker), ('last',)]
+
+
+def test_connection_follows_ports(carla, add_plugin):
+	carla.set_delivery_mode('thread', max_workers = 8)
+	log = []
+	carla.on_port_added(lambda port: log.append(('port', port)))
+	carla.on_connection_added(lambda connection: log.append(('connection', connection)))
+	a = add_plugin()
+	b = add_plugin()
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: sum(entry[0] == 'connection' for entry in log) == 2)
+	carla.delivery.flush(2)
+	for index, (kind, connection) in enumerate(log):
+		if kind == 'connection':
+			ports = [ entry[1] for entry in log[:index] if entry[0] == 'port' ]
+			assert connection.out_port in ports
+
+
+@pytest.fixture
+def loop():
+	loop = asyncio.new_event_loop()
+	thread = threading.Thread(target = loop.run_forever, daemon = True)
+	thread.start()
+	yield loop
+	loop.call_soon_threadsafe(loop.stop)
+	thread.join()
+	loop.close()
+
+
+def test_thread_pool_orders_by_key():
+	delivery = ThreadPoolDelivery(max_workers = 4)
+	got = { key: [] for key in range(4) }
+	for index in range(100):
+		key = index % 4
+		delivery.submit(key, got[key].append, index)
+	assert delivery.flush(5)
+	delivery.shutdown()
+	for key, indexes in got.items():
+		assert indexes == list(range(key, 100, 4))
+	assert delivery.stats()['delivered'] == 100
+
+
+def test_asyncio_flush(loop):
+	delivery = AsyncioDelivery(loop)
+	done = []
+	for index in range(1000):
+		delivery.submit(None, done.append, index)
+		assert delivery.flush(2)
+		assert len(done) == index + 1
+
+
+def test_asyncio_flush_from_loop_thread(loop):
+	"""
+	flush() called on the loop's own thread delivers what is queued, rather than
+	waiting for the loop it blocks.
+	"""
+	delivery = AsyncioDelivery(loop)
+	done = []
+	async def submit_and_flush():
+		for index in range(10):
+			delivery.submit(None, done.append, index)
+		return delivery.flush()
+	assert asyncio.run_coroutine_threadsafe(submit_and_flush(), loop).result(2)
+	assert done == list(range(10))
+	# The calls scheduled for items already delivered do nothing:
+	asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), loop).result(2)
+	assert done == list(range(10))
+	assert delivery.queue_depth == 0
+
+
+def test_set_delivery_mode_from_loop_thread(carla, add_plugin, loop):
+	carla.set_delivery_mode('asyncio', loop = loop)
+	removed = []
+	carla.on_plugin_removed(removed.append)
+	plugin = add_plugin()
+	async def remove_and_switch():
+		plugin.remove_from_carla()
+		sleep(0.1)		# Blocks the loop while the notification is queued
+		carla.set_delivery_mode('sync')
+		return list(removed)
+	assert asyncio.run_coroutine_threadsafe(remove_and_switch(), loop).result(5) == [plugin]
+
+
+#  end simple_carla/tests/test_delivery.py
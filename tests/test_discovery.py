@@ -0,0 +1,113 @@
+#  simple_carla/tests/test_discovery.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import os, subprocess, sys
+import pytest
+from simple_carla.discovery import PluginIndex, parse_discovery_output
+from carla_backend import PLUGIN_LADSPA
+
+TOOL = f"""#!{sys.executable}
+import os, sys
+name = os.path.splitext(os.path.basename(sys.argv[2]))[0]
+for line in ('init::-', 'name::' + name.title(), 'label::' + name, 'maker::Tester',
+	'audio.ins::2', 'audio.outs::2', 'end::-'):
+	print('carla-discovery::' + line)
+"""
+
+
+@pytest.fixture
+def plugin_dir(tmp_path, monkeypatch):
+	directory = tmp_path / 'ladspa'
+	(directory / 'sub').mkdir(parents = True)
+	(directory / 'amp.so').write_bytes(b'')
+	(directory / 'sub' / 'delay.so').write_bytes(b'')
+	(directory / 'readme.txt').write_text('')
+	monkeypatch.setenv('LADSPA_PATH', str(directory))
+	return directory
+
+
+@pytest.fixture
+def tool(tmp_path):
+	path = tmp_path / 'carla-discovery-native'
+	path.write_text(TOOL)
+	path.chmod(0o755)
+	return str(path)
+
+
+def refresh(index):
+	return index.refresh([ PLUGIN_LADSPA ])
+
+
+def test_import_without_carla(tmp_path):
+	"""
+	Reading an existing index, sessions and journals does not require Carla.
+	"""
+	env = { key: value for key, value in os.environ.items() if key != 'SIMPLE_CARLA_BACKEND' }
+	env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	process = subprocess.run([ sys.executable, '-c',
+		'import sys, simple_carla.discovery, simple_carla.session, simple_carla.journal; '
+		f'simple_carla.discovery.PluginIndex({str(tmp_path / "index.json")!r}, tool = "none"); '
+		'print("carla_backend" in sys.modules)' ],
+		env = env, capture_output = True, text = True)
+	assert process.returncode == 0, process.stderr
+	assert process.stdout.split() == [ 'False' ]
+
+
+def test_parse_discovery_output():
+	output = '\n'.join([ 'noise', 'carla-discovery::init::-', 'carla-discovery::name::Amp',
+		'carla-discovery::hints::bad', 'carla-discovery::midi.ins::1', 'carla-discovery::end::-',
+		'carla-discovery::name::Orphan' ])
+	plugins = parse_discovery_output(PLUGIN_LADSPA, 'amp.so', output)
+	assert len(plugins) == 1
+	assert (plugins[0]['name'], plugins[0]['hints'], plugins[0]['midi.ins']) == ('Amp', 0, 1)
+	assert plugins[0]['filename'] == 'amp.so'
+
+
+def test_refresh_and_cache(tmp_path, plugin_dir, tool):
+	filename = str(tmp_path / 'index.json')
+	index = PluginIndex(filename, tool = tool, workers = 2)
+	stats = refresh(index)
+	assert (stats['discovered'], stats['failed'], stats['plugins']) == (2, 0, 2)
+	assert index.find(label = 'AMP')[0]['name'] == 'Amp'
+	assert [ plugin['label'] for plugin in index.search('del') ] == [ 'delay' ]
+	assert len(index.find(maker = 'tester', audio_ins = 2)) == 2
+	# Nothing changed; nothing is discovered again, even by a new index:
+	index = PluginIndex(filename, tool = tool)
+	assert len(index) == 2
+	assert refresh(index)['discovered'] == 0
+	# Only the changed file is:
+	os.utime(plugin_dir / 'amp.so', (0, 0))
+	os.utime(plugin_dir, (0, 0))
+	assert refresh(index)['discovered'] == 1
+	assert index.refresh([ PLUGIN_LADSPA ], force = True)['discovered'] == 2
+
+
+def test_failures_are_retried(tmp_path, plugin_dir, tool):
+	filename = str(tmp_path / 'index.json')
+	os.chmod(tool, 0o644)		# Cannot be run
+	index = PluginIndex(filename, tool = tool)
+	stats = refresh(index)
+	assert (stats['discovered'], stats['failed'], stats['plugins']) == (2, 2, 0)
+	os.chmod(tool, 0o755)
+	stats = refresh(index)
+	assert (stats['discovered'], stats['failed'], stats['plugins']) == (2, 0, 2)
+	# A missing tool is not cached either:
+	os.utime(plugin_dir / 'amp.so', (0, 0))
+	os.utime(plugin_dir, (0, 0))
+	index.tool = str(tmp_path / 'missing')
+	assert refresh(index)['discovered'] == 0
+	index.tool = tool
+	assert refresh(index)['discovered'] == 1
+
+
+def test_symlink_loop(tmp_path, plugin_dir, tool):
+	(plugin_dir / 'sub' / 'loop').symlink_to(plugin_dir)
+	(plugin_dir / 'again').symlink_to(plugin_dir / 'sub')
+	index = PluginIndex(str(tmp_path / 'index.json'), tool = tool)
+	stats = refresh(index)
+	assert (stats['discovered'], stats['plugins']) == (2, 2)
+	assert refresh(index)['discovered'] == 0
+
+
+#  end simple_carla/tests/test_discovery.py
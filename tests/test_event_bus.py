@@ -0,0 +1,90 @@
+#  simple_carla/tests/test_event_bus.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import pytest
+from simple_carla.event_bus import EventBus, EVENT_CONNECTION_ADDED, EVENT_INFO
+from simple_carla.delivery import SyncDelivery
+
+
+@pytest.fixture
+def bus():
+	bus = EventBus()
+	bus.delivery = SyncDelivery()
+	return bus
+
+
+class Source:
+	pass
+
+
+def test_builtins_are_held(bus, capsys):
+	got = []
+	bus.subscribe(EVENT_INFO, print)
+	bus.subscribe(EVENT_INFO, got.append)
+	bus.publish(EVENT_INFO, 'hello')
+	assert got == ['hello']
+	assert capsys.readouterr().out == 'hello\n'
+
+
+def test_lambda_is_held_weakly(bus):
+	got = []
+	bus.subscribe(EVENT_INFO, lambda message: got.append(message))
+	bus.publish(EVENT_INFO, 'hello')
+	assert got == []
+	assert len(bus.subscriptions(EVENT_INFO)) == 0
+
+
+def test_method_is_held_weakly(bus):
+	class Listener:
+		def __init__(self):
+			self.got = []
+		def info(self, message):
+			self.got.append(message)
+	listener = Listener()
+	bus.subscribe(EVENT_INFO, listener.info)
+	bus.publish(EVENT_INFO, 'hello')
+	assert listener.got == ['hello']
+	del listener
+	assert len(bus.subscriptions(EVENT_INFO)) == 0
+
+
+def test_source_filtering(bus):
+	a, b = Source(), Source()
+	got = []
+	bus.subscribe(EVENT_CONNECTION_ADDED, got.append, source = a)
+	bus.publish(EVENT_CONNECTION_ADDED, 'b to b', sources = (b, b))
+	bus.publish(EVENT_CONNECTION_ADDED, 'a to b', sources = (a, b))
+	bus.publish(EVENT_CONNECTION_ADDED, 'a to a', sources = (a, a))
+	assert got == ['a to b', 'a to a']
+
+
+def test_unsubscribe(bus):
+	got = []
+	subscription = bus.subscribe(EVENT_INFO, got.append)
+	subscription.unsubscribe()
+	bus.publish(EVENT_INFO, 'hello')
+	assert got == []
+	assert not bus.has_subscribers(EVENT_INFO)
+
+
+def test_forget_source(bus):
+	source = Source()
+	got = []
+	bus.subscribe(EVENT_INFO, got.append, source = source)
+	bus.forget_source(source)
+	bus.publish(EVENT_INFO, 'hello', sources = (source,))
+	assert got == []
+
+
+def test_handler_exception_does_not_stop_delivery(bus):
+	got = []
+	def broken(message):
+		raise ValueError(message)
+	bus.subscribe(EVENT_INFO, broken, weak = False)
+	bus.subscribe(EVENT_INFO, got.append)
+	bus.publish(EVENT_INFO, 'hello')
+	assert got == ['hello']
+
+
+#  end simple_carla/tests/test_event_bus.py
@@ -0,0 +1,69 @@
+#  simple_carla/tests/test_graph.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import pytest
+from conftest import wait_for
+
+
+@pytest.fixture
+def chain(carla, add_plugin):
+	"""
+	system:capture -> a -> b -> c -> system:playback, and d on its own.
+	"""
+	a, b, c, d = (add_plugin() for _ in range(4))
+	result = carla.apply_routing([
+		('system:capture_1', a.audio_ins()[0]),
+		(a.audio_outs()[0], b.audio_ins()[0]),
+		(b.audio_outs()[0], c.audio_ins()[0]),
+		(c.audio_outs()[0], 'system:playback_1')
+	]).result(5)
+	assert result.ok
+	graph = carla.start_graph_analysis()
+	return graph, a, b, c, d
+
+
+def test_topological_order(chain):
+	graph, a, b, c, d = chain
+	order = graph.topological_order()
+	assert len(order) == 4
+	assert order.index(a) < order.index(b) < order.index(c)
+	assert not graph.has_cycles()
+
+
+def test_levels_and_chain(chain):
+	graph, a, b, c, d = chain
+	levels = graph.levels()
+	assert len(levels) == 3
+	assert set(levels[0]) == { a, d }
+	assert levels[1:] == [ [ b ], [ c ] ]
+	assert graph.parallelism() == 2
+	assert graph.longest_chain() == [ a, b, c ]
+	assert graph.chain_depth() == 3
+	assert [ len(component) for component in graph.components() ] == [ 3, 1 ]
+
+
+def test_cycles(carla, chain):
+	graph, a, b, c, d = chain
+	c.audio_outs()[1].connect_to(a.audio_ins()[1])
+	wait_for(graph.has_cycles)
+	assert [ set(cycle) for cycle in graph.cycles() ] == [ { a, b, c } ]
+	order = graph.topological_order()
+	assert { order.index(client) for client in (a, b, c) } in ({ 0, 1, 2 }, { 1, 2, 3 })
+	assert [ set(level) for level in graph.levels() ] == [ { a, b, c, d } ]
+	assert graph.summary()['cycles'] == 1
+	# Breaking the cycle:
+	c.audio_outs()[1].disconnect_from(a.audio_ins()[1])
+	wait_for(lambda: not graph.has_cycles())
+	assert graph.longest_chain() == [ a, b, c ]
+
+
+def test_plugin_removed(carla, chain):
+	graph, a, b, c, d = chain
+	b.remove_from_carla()
+	wait_for(lambda: len(graph.topological_order()) == 3)
+	assert graph.longest_chain() == []
+	assert len(graph.components()) == 3
+
+
+#  end simple_carla/tests/test_graph.py
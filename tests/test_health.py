@@ -0,0 +1,60 @@
+#  simple_carla/tests/test_health.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import pytest
+from simple_carla.event_bus import EVENT_XRUN, EVENT_XRUN_BURST, EVENT_LOAD_HIGH, EVENT_LOAD_NORMAL
+from simple_carla.health import OPERATION_PARAMETER
+
+
+@pytest.fixture
+def monitor(carla):
+	monitor = carla.start_health_monitor(interval = 3600, load_threshold = 50.0, burst_count = 3)
+	yield monitor
+	carla.stop_health_monitor()
+
+
+@pytest.fixture
+def events(carla):
+	events = []
+	for event in (EVENT_XRUN, EVENT_XRUN_BURST, EVENT_LOAD_HIGH, EVENT_LOAD_NORMAL):
+		carla.events.subscribe(event, lambda *args, event = event: events.append((event, args)),
+			synchronous = True, weak = False)
+	return events
+
+
+def test_xrun_incident(carla, add_plugin, monitor, events):
+	plugin = add_plugin()
+	monitor.sample()
+	plugin.parameters[0].value = 0.5
+	carla.lib.inject_xruns(2)
+	monitor.sample()
+	incident = monitor.incidents[-1]
+	assert incident.count == 2
+	assert incident.operation_counts()[OPERATION_PARAMETER] == 1
+	assert [ event for event, _ in events ] == [ EVENT_XRUN ]
+	carla.lib.inject_xruns(1)
+	monitor.sample()
+	assert [ event for event, _ in events ] == [ EVENT_XRUN, EVENT_XRUN, EVENT_XRUN_BURST ]
+	assert (OPERATION_PARAMETER, 2, 2) in monitor.culprits()
+	assert monitor.summary()['xruns'] == 3
+
+
+def test_cleared_xruns_are_not_counted(carla, monitor):
+	carla.lib.inject_xruns(5)
+	monitor.sample()
+	carla.clear_engine_xruns()
+	monitor.sample()
+	assert monitor.summary()['xruns'] == 0
+
+
+def test_load_threshold(carla, monitor, events):
+	carla.lib.inject_load(60.0)
+	monitor.sample()
+	monitor.sample()
+	carla.lib.inject_load(0.0)
+	monitor.sample()
+	assert [ event for event, _ in events ] == [ EVENT_LOAD_HIGH, EVENT_LOAD_NORMAL ]
+
+
+#  end simple_carla/tests/test_health.py
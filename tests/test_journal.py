@@ -0,0 +1,116 @@
+#  simple_carla/tests/test_journal.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import logging, os
+from time import sleep
+import pytest
+from simple_carla.journal import (
+	recover, read_journal, JOURNAL_FILENAME, OLD_JOURNAL_FILENAME, RECORD_PARAMETER
+)
+from conftest import wait_for
+
+
+def test_journal_recovery(carla, add_plugin, tmp_path):
+	a = add_plugin()
+	b = add_plugin()
+	journal = carla.start_journal(tmp_path, sync_interval = 0.01)
+	a.connect_audio_outputs_to(b)
+	a.parameters[0].value = 0.42
+	b.volume = 0.25
+	wait_for(lambda: journal.records >= 4)
+	carla.stop_journal()
+
+	model = recover(tmp_path)
+	assert model.plugins[a.moniker]['parameters'][0] == pytest.approx(0.42)
+	assert len(model.connections) == 2
+
+	for plugin in (b, a):
+		plugin.remove_from_carla()
+	wait_for(lambda: not carla.plugins())
+	result = carla.recover_session(tmp_path).result(5)
+	plugins = { plugin.moniker: plugin for plugin in result.plugins }
+	assert plugins[a.moniker].parameters[0].value == pytest.approx(0.42)
+	assert plugins[b.moniker].volume == pytest.approx(0.25)
+	wait_for(lambda: len(carla._connections) == 2)
+
+
+def test_incomplete_record(carla, add_plugin, tmp_path, caplog):
+	a = add_plugin()
+	journal = carla.start_journal(tmp_path)
+	a.parameters[0].value = 0.1
+	a.parameters[0].value = 0.2
+	carla.stop_journal()
+	path = tmp_path / JOURNAL_FILENAME
+	data = path.read_bytes()
+	with open(path, 'rb') as fob:
+		assert [ record_type for record_type, _ in read_journal(fob) ] == [ RECORD_PARAMETER ] * 2
+	# A crash while writing the last record:
+	path.write_bytes(data[:-1])
+	with caplog.at_level(logging.WARNING):
+		assert recover(tmp_path).plugins[a.moniker]['parameters'][0] == pytest.approx(0.1)
+	assert 'incomplete record' in caplog.text
+	# A corrupted record:
+	path.write_bytes(data[:-1] + bytes([ data[-1] ^ 0xFF ]))
+	assert recover(tmp_path).plugins[a.moniker]['parameters'][0] == pytest.approx(0.1)
+	path.write_bytes(b'garbage')
+	with pytest.raises(ValueError):
+		recover(tmp_path)
+
+
+def test_compaction_failure(carla, add_plugin, tmp_path):
+	a = add_plugin()
+	journal = carla.start_journal(tmp_path)
+	assert journal.compactions == 1
+	attempts = []
+	def fail(snapshot):
+		attempts.append(snapshot)
+		raise OSError('Disk full')
+	journal._write_snapshot = fail
+	a.parameters[0].value = 0.1
+	journal.compact_bytes = 0
+	wait_for(lambda: attempts and journal._compactor is None)
+	assert os.path.exists(tmp_path / OLD_JOURNAL_FILENAME)
+	# Not retried on every idle tick:
+	sleep(0.05)
+	assert len(attempts) == 1
+	a.parameters[0].value = 0.2
+	assert recover(tmp_path).plugins[a.moniker]['parameters'][0] == pytest.approx(0.2)
+	# The retry folds both journals into the snapshot:
+	del journal._write_snapshot
+	journal.compact_bytes = 1 << 20
+	journal._next_compaction = journal._retry_compaction = 0.0
+	wait_for(lambda: journal.compactions == 2)
+	assert not os.path.exists(tmp_path / OLD_JOURNAL_FILENAME)
+	carla.stop_journal()
+	model = recover(tmp_path)
+	assert model.records == 0
+	assert model.plugins[a.moniker]['parameters'][0] == pytest.approx(0.2)
+
+
+def test_stop_waits_for_compaction(carla, add_plugin, tmp_path):
+	add_plugin()
+	journal = carla.start_journal(tmp_path)
+	write_snapshot = journal._write_snapshot
+	def slow(snapshot):
+		sleep(0.1)
+		write_snapshot(snapshot)
+	journal._write_snapshot = slow
+	journal.compact_bytes = 0
+	wait_for(lambda: journal._compactor is not None)
+	journal.compact_bytes = 1 << 20
+	carla.stop_journal()
+	assert journal.compactions == 2
+	assert journal._compactor is None
+
+
+def test_does_not_mark_clean(carla, add_plugin, tmp_path):
+	a = add_plugin()
+	a.encode_saved_state(mark_clean = True)
+	a.volume = 0.3
+	carla.start_journal(tmp_path)
+	assert a.is_dirty()
+	carla.stop_journal()
+
+
+#  end simple_carla/tests/test_journal.py
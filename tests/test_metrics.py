@@ -0,0 +1,52 @@
+#  simple_carla/tests/test_metrics.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import http.client, socket
+from urllib.request import urlopen
+import pytest
+from conftest import wait_for
+
+
+def metric_value(text, name):
+	for line in text.splitlines():
+		if line.startswith(name + ' '):
+			return float(line.split()[-1])
+	return None
+
+
+def test_http(carla, add_plugin):
+	exporter = carla.start_metrics(port = 0, interval = 0.01)
+	try:
+		add_plugin()
+		add_plugin()
+		wait_for(lambda: metric_value(exporter.text, 'simple_carla_plugins') == 2)
+		with urlopen(f'http://127.0.0.1:{exporter.port}/metrics', timeout = 5) as response:
+			text = response.read().decode('utf-8')
+		assert metric_value(text, 'simple_carla_plugins') == 2
+		assert '# TYPE simple_carla_callbacks_total counter' in text
+		with pytest.raises(Exception):
+			urlopen(f'http://127.0.0.1:{exporter.port}/elsewhere', timeout = 5)
+	finally:
+		carla.stop_metrics()
+
+
+def test_unix_socket(carla, tmp_path):
+	path = str(tmp_path / 'metrics.sock')
+	exporter = carla.start_metrics(unix_socket = path, interval = 0.01)
+	try:
+		wait_for(lambda: exporter.text)
+		sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+		sock.connect(path)
+		connection = http.client.HTTPConnection('localhost')
+		connection.sock = sock
+		connection.request('GET', '/metrics')
+		response = connection.getresponse()
+		assert response.status == 200
+		assert metric_value(response.read().decode('utf-8'), 'simple_carla_plugins') == 0
+		connection.close()
+	finally:
+		carla.stop_metrics()
+
+
+#  end simple_carla/tests/test_metrics.py
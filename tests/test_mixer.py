@@ -0,0 +1,93 @@
+#  simple_carla/tests/test_mixer.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+from math import inf
+import numpy as np
+import pytest
+from simple_carla.mixer import Mixer
+from conftest import wait_for
+
+
+@pytest.fixture
+def plugins(add_plugin):
+	a, b = add_plugin(), add_plugin()
+	a.volume = b.volume = 0.5
+	a.panning = b.panning = 0.0
+	return a, b
+
+
+@pytest.fixture
+def mixer(carla):
+	return Mixer(carla)
+
+
+def test_gain_and_mute(carla, plugins, mixer):
+	a, b = plugins
+	both = mixer.add_group('both', [ a, b ])
+	just_a = mixer.add_group('a', [ a ])
+	both.gain = -6.0
+	just_a.gain = -6.0
+	assert b.volume == pytest.approx(0.5 * 10 ** (-6 / 20))
+	assert a.volume == pytest.approx(0.5 * 10 ** (-12 / 20))
+	just_a.muted = True
+	assert a.volume == 0.0
+	just_a.muted = False
+	mixer.remove_group('both')
+	assert b.volume == pytest.approx(0.5)
+	assert a.volume == pytest.approx(0.5 * 10 ** (-6 / 20))
+
+
+def test_silent_group(carla, plugins, mixer):
+	"""
+	A group at -inf dB silences its members, and no others.
+	"""
+	a, b = plugins
+	mixer.add_group('a', [ a ]).gain = -inf
+	mixer.add_group('b', [ b ])
+	values = mixer.values()
+	assert not np.isnan(values).any()
+	assert (a.volume, b.volume) == (0.0, pytest.approx(0.5))
+	pushed = []
+	carla.apply_plugin_states = pushed.append
+	mixer.set_muted('b', False)
+	assert pushed == []		# Nothing changed
+
+
+def test_pan(carla, plugins, mixer):
+	a, b = plugins
+	a.balance_left, a.balance_right = -1.0, 1.0
+	assert a.can_balance and not a.can_pan		# Stereo
+	group = mixer.add_group('pads', [ a ])
+	group.pan = 0.25
+	assert (a.balance_left, a.balance_right) == (pytest.approx(-0.75), 1.0)
+	mixer.set_base(a, balance_left = 0.9)
+	assert a.balance_left == 1.0		# Clipped
+	assert a.panning == 0.0
+
+
+def test_fade(carla, plugins, mixer):
+	a, _ = plugins
+	group = mixer.add_group('a', [ a ])
+	group.gain = -inf
+	group.fade_gain(0.0, 0.1)
+	assert mixer.fading
+	wait_for(lambda: 0.0 < a.volume < 0.5)
+	wait_for(lambda: not mixer.fading)
+	assert a.volume == pytest.approx(0.5)
+	assert group.gain == 0.0
+
+
+def test_removed_plugin(carla, plugins, mixer):
+	a, b = plugins
+	group = mixer.add_group('both', [ a, b ])
+	b.remove_from_carla()
+	wait_for(lambda: len(carla.plugins()) == 1)
+	group.gain = -6.0
+	assert mixer.plugins() == [ a ]
+	assert group.plugins == [ a ]
+	with pytest.raises(ValueError):
+		mixer.add_group('both')
+
+
+#  end simple_carla/tests/test_mixer.py
@@ -0,0 +1,112 @@
+#  simple_carla/tests/test_pool.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import threading
+import pytest
+from simple_carla import Plugin
+from simple_carla.pool import plugin_key
+from conftest import PLUGIN_DEF, wait_for
+
+
+@pytest.fixture
+def pool(carla):
+	pool = carla.start_pool(size = 2)
+	yield pool
+	carla.stop_pool()
+
+
+def test_acquire_hit(carla, pool):
+	pool.reserve(PLUGIN_DEF)
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 2)
+	assert all(not plugin.active for plugin in carla.plugins())
+	plugin = pool.acquire(PLUGIN_DEF)
+	assert plugin.is_ready
+	assert plugin.active
+	assert pool.stats()['hits'] == 1
+	# Topped up in the background:
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 2)
+	assert len(carla.plugins()) == 3
+
+
+def test_acquire_miss(carla, pool):
+	plugin = pool.acquire(PLUGIN_DEF)
+	assert pool.stats()['misses'] == 1
+	wait_for(lambda: plugin.is_ready)
+	assert pool.idle_count() == 0
+
+
+def test_saved_state(carla, pool, add_plugin):
+	source = add_plugin()
+	source.volume = 0.25
+	saved_state = source.encode_saved_state()
+	pool.reserve(PLUGIN_DEF, size = 1)
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 1)
+	plugin = pool.acquire(PLUGIN_DEF, saved_state = saved_state)
+	wait_for(lambda: plugin.volume == pytest.approx(0.25))
+
+
+def test_unreserve(carla, pool):
+	pool.reserve(PLUGIN_DEF)
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 2)
+	pool.unreserve(PLUGIN_DEF)
+	wait_for(lambda: not carla.plugins())
+	assert pool.idle_count() == 0
+
+
+def test_reset_on_acquire(carla, pool):
+	pool.reserve(PLUGIN_DEF, size = 1)
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 1)
+	idle = pool._idle[plugin_key(PLUGIN_DEF)][0]
+	idle.parameters[0].value = 0.9
+	plugin = pool.acquire(PLUGIN_DEF)
+	assert plugin is idle
+	assert plugin.parameters[0].value == pytest.approx(getattr(plugin.parameters[0], 'def'))
+	stats = pool.stats()
+	assert stats['ready_time_mean'] is not None
+	assert stats['ready_time_max'] >= stats['ready_time_mean']
+
+
+def test_idle_instance_removed(carla, pool):
+	pool.reserve(PLUGIN_DEF, size = 1)
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 1)
+	removed = pool._idle[plugin_key(PLUGIN_DEF)][0]
+	removed.remove_from_carla()
+	# Replaced:
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 1 \
+		and pool._idle[plugin_key(PLUGIN_DEF)][0] is not removed)
+	assert len(carla.plugins()) == 1
+
+
+def test_stop(carla):
+	pool = carla.start_pool(size = 2)
+	pool.reserve(PLUGIN_DEF)
+	wait_for(lambda: pool.idle_count(PLUGIN_DEF) == 2)
+	carla.stop_pool()
+	wait_for(lambda: not carla.plugins())
+	assert pool._thread is None
+	assert not pool._subscriptions
+
+
+def test_unique_names(carla, pool):
+	"""
+	Plugins created by the refill thread and user threads at once get unique names.
+	"""
+	pool.reserve(PLUGIN_DEF, size = 10)
+	names = []
+	def create():
+		for _ in range(20):
+			plugin = Plugin(PLUGIN_DEF)
+			names.append(plugin.unique_name)
+			plugin.add_to_carla()
+	threads = [ threading.Thread(target = create) for _ in range(3) ]
+	for thread in threads:
+		thread.start()
+	for thread in threads:
+		thread.join()
+	assert len(set(names)) == 60
+	wait_for(lambda: len(carla.plugins()) == 70 and all(plugin.is_ready for plugin in carla.plugins()))
+	assert len(set(plugin.unique_name for plugin in carla.plugins())) == 70
+
+
+#  end simple_carla/tests/test_pool.py
@@ -0,0 +1,48 @@
+#  simple_carla/tests/test_probe.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import io, json, sys
+import pytest
+from simple_carla.probe import run_batch, read_plugin_defs
+from simple_carla.scripts import sc_plugin_info
+from conftest import PLUGIN_DEF
+
+PLUGIN_DEFS = [ dict(PLUGIN_DEF, name = f'G{index}') for index in range(4) ]
+
+
+def test_run_batch():
+	output = io.StringIO()
+	assert run_batch(PLUGIN_DEFS, output, workers = 2, timeout = 10) == { 'ok': 4 }
+	records = [ json.loads(line) for line in output.getvalue().splitlines() ]
+	assert sorted(record['index'] for record in records) == [ 0, 1, 2, 3 ]
+	for record in records:
+		assert record['plugin_def'] == PLUGIN_DEFS[record['index']]
+		assert record['name'] == record['plugin_def']['name']
+		assert (record['audio_ins'], record['audio_outs']) == (2, 2)
+		assert record['parameters'][0]['name'] == 'Parameter 1'
+		# NumPy is loaded before the first plugin is measured:
+		assert record['memory_delta'] < 4 * 1024 * 1024
+
+
+@pytest.mark.parametrize('text', [
+	json.dumps(PLUGIN_DEFS),
+	'\n'.join(json.dumps(plugin_def) for plugin_def in PLUGIN_DEFS) + '\n\n'
+])
+def test_read_plugin_defs(tmp_path, text):
+	path = tmp_path / 'plugins.json'
+	path.write_text(text)
+	assert read_plugin_defs(str(path)) == PLUGIN_DEFS
+
+
+def test_batch_option(tmp_path, monkeypatch):
+	path, output = tmp_path / 'plugins.jsonl', tmp_path / 'results.jsonl'
+	path.write_text(json.dumps(PLUGIN_DEFS[:1]))
+	monkeypatch.setattr(sys, 'argv', [ 'sc-plugin-info', '--batch', str(path),
+		'--workers', '1', '--output', str(output) ])
+	sc_plugin_info.main()
+	record = json.loads(output.read_text())
+	assert (record['index'], record['status']) == (0, 'ok')
+
+
+#  end simple_carla/tests/test_probe.py
@@ -0,0 +1,138 @@
+#  simple_carla/tests/test_qt_models.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtCore import Qt, QCoreApplication
+from simple_carla.qt_models import PluginListModel, ParameterTableModel, PatchbayModel, ITEM_ROLE
+from conftest import wait_for
+
+
+@pytest.fixture
+def app():
+	return QCoreApplication.instance() or QCoreApplication([])
+
+
+def settle(app, condition):
+	"""
+	Wait until condition() returns True, applying queued model updates meanwhile.
+	"""
+	def check():
+		app.processEvents()
+		return condition()
+	wait_for(check)
+
+
+def record(model):
+	"""
+	Returns a list of the (signal name, first, last) structure and data changes
+	made to the given model.
+	"""
+	changes = []
+	model.rowsInserted.connect(lambda parent, first, last: changes.append(('inserted', first, last)))
+	model.rowsRemoved.connect(lambda parent, first, last: changes.append(('removed', first, last)))
+	model.dataChanged.connect(lambda first, last, roles:
+		changes.append(('changed', first.row(), last.row())))
+	model.modelReset.connect(lambda: changes.append(('reset', None, None)))
+	return changes
+
+
+def test_plugin_list(app, carla, add_plugin):
+	a = add_plugin()
+	model = PluginListModel(carla)
+	changes = record(model)
+	assert model.rowCount() == 1
+	b, c = add_plugin(), add_plugin()
+	settle(app, lambda: model.rowCount() == 3)
+	assert [ model.row_of(plugin) for plugin in (a, b, c) ] == [ 0, 1, 2 ]
+	assert model.data(model.index(1)) == b.moniker
+	assert model.data(model.index(2), ITEM_ROLE) is c
+	assert model.flags(model.index(0)) & Qt.ItemIsUserCheckable
+
+	changes.clear()
+	assert model.setData(model.index(0), Qt.Checked, Qt.CheckStateRole)
+	assert a.active
+	assert model.data(model.index(0), Qt.CheckStateRole) == Qt.Checked
+	assert not model.setData(model.index(0), 'x', Qt.DisplayRole)
+	settle(app, lambda: not model._pending)
+
+	changes.clear()
+	b.active = c.active = True
+	settle(app, lambda: ('changed', 1, 2) in changes)
+
+	changes.clear()
+	b.remove_from_carla()
+	settle(app, lambda: model.rowCount() == 2)
+	assert changes == [ ('removed', 1, 1) ]
+	assert model.row_of(c) == 1 and model.row_of(b) == -1
+
+	model.close()
+	add_plugin()
+	app.processEvents()
+	assert model.rowCount() == 2
+
+
+def test_parameter_table(app, carla, add_plugin):
+	plugin = add_plugin()
+	model = ParameterTableModel(carla, plugin)
+	changes = record(model)
+	assert (model.rowCount(), model.columnCount()) == (4, 5)
+	assert model.headerData(1, Qt.Horizontal) == 'Value'
+	value = model.index(0, ParameterTableModel.VALUE_COLUMN)
+	param = model.parameter(0)
+	assert model.data(model.index(0, 0)) == param.name
+	assert model.flags(value) & Qt.ItemIsEditable
+	assert not model.flags(model.index(0, 0)) & Qt.ItemIsEditable
+
+	assert not model.setData(value, param.max + 1.0)
+	assert not model.setData(value, 'loud')
+	assert not model.setData(model.index(0, 0), 0.5)
+	target = param.max if param.value == param.min else param.min
+	assert model.setData(value, target)
+	assert param.value == target
+	settle(app, lambda: changes)
+	assert changes == [ ('changed', 0, 0) ]
+
+	changes.clear()
+	for parameter_id, row_value in ((1, 0.25), (2, 0.5), (1, 0.75)):
+		carla.lib.simulate_parameter_change(plugin.plugin_id, parameter_id, row_value)
+	wait_for(lambda: plugin.parameters[2].value == pytest.approx(0.5))
+	settle(app, lambda: changes)
+	assert changes == [ ('changed', 1, 2) ]
+	assert model.data(model.index(1, ParameterTableModel.VALUE_COLUMN)) == pytest.approx(0.75)
+
+
+def test_patchbay(app, carla, add_plugin):
+	a = add_plugin()
+	model = PatchbayModel(carla)
+	changes = record(model)
+	client_rows = model.rowCount()
+	b = add_plugin()
+	settle(app, lambda: model.rowCount() == client_rows + 1
+		and model.rowCount(model.index(client_rows, 0)) == 4)
+	assert ('reset', None, None) not in changes
+	b_index = model.index(client_rows, 0)
+	assert model.item(b_index).client_id == b.client_id
+	for row in range(4):
+		port_index = model.index(row, 0, b_index)
+		assert model.parent(port_index) == b_index
+		assert model.item(port_index).client_id == b.client_id
+
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: len(carla._connections) == 2)
+	settle(app, lambda: sum(model.rowCount(model.index_of(port)) for port in a.audio_outs()) == 2)
+	port = a.audio_outs()[0]
+	connection_index = model.index(0, 0, model.index_of(port))
+	assert model.data(connection_index).startswith(f'{b.moniker}:')
+
+	changes.clear()
+	b.remove_from_carla()
+	settle(app, lambda: model.rowCount() == client_rows)
+	assert ('removed', client_rows, client_rows) in changes
+	assert all(model.rowCount(model.index_of(port)) == 0 for port in a.audio_outs())
+
+
+#  end simple_carla/tests/test_qt_models.py
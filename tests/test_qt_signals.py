@@ -0,0 +1,96 @@
+#  simple_carla/tests/test_qt_signals.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pytest
+from PyQt5.QtCore import Qt, QCoreApplication
+from simple_carla import Carla
+from simple_carla.qt import CarlaQt, QtPlugin
+from conftest import PLUGIN_DEF, wait_for
+
+
+@pytest.fixture
+def carla_qt():
+	app = QCoreApplication.instance() or QCoreApplication([])
+	instance = CarlaQt('simple_carla_test')
+	instance.idle_interval = 0.002
+	try:
+		instance.engine_init('Dummy')
+		yield instance
+	finally:
+		if Carla.instance is instance:
+			CarlaQt.delete()		# Clears CarlaQt.instance as well as Carla.instance
+
+
+@pytest.fixture
+def batches(carla_qt):
+	"""
+	Returns a list of (signal name, list) emitted by the batched signals.
+	"""
+	batches = []
+	for name in ('sig_patchbay_ports_added', 'sig_patchbay_ports_removed',
+		'sig_connections_added', 'sig_connections_removed', 'sig_parameters_changed'):
+		getattr(carla_qt, name).connect(lambda items, name = name: batches.append((name, items)),
+			Qt.DirectConnection)
+	carla_qt.start_signal_batching()
+	return batches
+
+
+def add_plugins(count):
+	plugins = [ QtPlugin(PLUGIN_DEF) for _ in range(count) ]
+	for plugin in plugins:
+		plugin.add_to_carla()
+	wait_for(lambda: all(plugin.is_ready for plugin in plugins))
+	return plugins
+
+
+def test_ports_batched(carla_qt, batches):
+	a, b = add_plugins(2)
+	clients = { a.client_id, b.client_id }
+	runs = [ [ port for port in items if port.client_id in clients ]
+		for name, items in batches if name == 'sig_patchbay_ports_added' ]
+	assert sum(len(ports) for ports in runs) == 8
+	# Ports which arrive in the same tick are emitted together:
+	assert len([ ports for ports in runs if ports ]) < 8
+
+
+def test_parameters_coalesced(carla_qt, batches):
+	plugin, = add_plugins(1)
+	batches.clear()
+	for value in (0.1, 0.2, 0.3):
+		carla_qt.lib.simulate_parameter_change(plugin.plugin_id, 0, value)
+	carla_qt.lib.simulate_parameter_change(plugin.plugin_id, 1, 0.5)
+	wait_for(lambda: batches)
+	(name, items), = batches
+	assert name == 'sig_parameters_changed'
+	assert sorted((param.parameter_id, value) for _, param, value in items) == \
+		[ (0, pytest.approx(0.3)), (1, pytest.approx(0.5)) ]
+
+
+def test_order_kept(carla_qt, batches):
+	a, b = add_plugins(2)
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: len(carla_qt._connections) == 2)
+	batches.clear()
+	b.remove_from_carla()
+	wait_for(lambda: any(name == 'sig_patchbay_ports_removed' for name, _ in batches))
+	names = [ name for name, _ in batches ]
+	assert names.index('sig_connections_removed') < names.index('sig_patchbay_ports_removed')
+	assert sum(len(items) for name, items in batches if name == 'sig_connections_removed') == 2
+
+
+def test_stop_flushes(carla_qt, batches):
+	carla_qt.remove_idle_hook(carla_qt.flush_signal_batches)	# Only flushed by stopping
+	plugin, = add_plugins(1)
+	assert not batches
+	carla_qt.stop_signal_batching()
+	ports = [ port for name, items in batches if name == 'sig_patchbay_ports_added'
+		for port in items if port.client_id == plugin.client_id ]
+	assert len(ports) == 4
+	assert not carla_qt.batching_signals
+
+
+#  end simple_carla/tests/test_qt_signals.py
@@ -0,0 +1,89 @@
+#  simple_carla/tests/test_recorder.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import struct
+import pytest
+from simple_carla import Carla, Plugin
+from simple_carla.host import StandInPlugin
+from simple_carla.recorder import CallbackReplayer, MAGIC
+from conftest import wait_for
+
+
+@pytest.fixture
+def recording(carla, add_plugin, tmp_path):
+	"""
+	Records three plugins being added, connected and changed, and one removed.
+	Returns the filename, and the state of the host when recording stopped.
+	"""
+	filename = tmp_path / 'session.sccb'
+	carla.start_recording(filename)
+	plugins = [ add_plugin() for _ in range(3) ]
+	plugins[1].connect_audio_outputs_to(plugins[2])
+	wait_for(lambda: len(carla._connections) == 2)
+	carla.lib.simulate_parameter_change(plugins[1].plugin_id, 1, 0.1234567891234)
+	wait_for(lambda: plugins[1].parameters[1].value == 0.1234567891234)
+	plugins[0].remove_from_carla()
+	wait_for(lambda: len(carla.plugins()) == 2)
+	carla.stop_recording()
+	state = registry(carla)
+	Carla.delete()
+	return filename, state
+
+
+def registry(carla):
+	return (
+		sorted((plugin.moniker, plugin.plugin_id, len(plugin.ports)) for plugin in carla.plugins()),
+		sorted((connection.out_port.client.moniker, connection.in_port.client.moniker)
+			for connection in carla._connections.values())
+	)
+
+
+@pytest.fixture
+def replay_host():
+	carla = Carla('simple_carla_replay')
+	yield carla
+	Carla.delete()
+
+
+def test_replay_rebuilds_registry(recording, replay_host, caplog):
+	filename, state = recording
+	stats = CallbackReplayer(filename).replay(replay_host, speed = None)
+	assert stats['count'] > 0
+	assert registry(replay_host) == state
+	plugin = replay_host.plugin_from_uuid('G 2')
+	assert isinstance(plugin, StandInPlugin)
+	assert plugin.is_ready
+	# float_val is kept at full precision:
+	assert plugin.parameters[1].value == 0.1234567891234
+	assert not [ record for record in caplog.records if record.levelname == 'ERROR' ]
+
+
+def test_replay_plugin_factory(recording, replay_host):
+	filename, state = recording
+	names = []
+	def plugin_factory(unique_name):
+		names.append(unique_name)
+		return StandInPlugin(unique_name)
+	CallbackReplayer(filename).replay(replay_host, speed = None, plugin_factory = plugin_factory)
+	assert names == [ 'G 1', 'G 2', 'G 3' ]
+	assert registry(replay_host) == state
+
+
+def test_read_version_1(tmp_path):
+	filename = tmp_path / 'old.sccb'
+	with open(filename, 'wb') as fob:
+		fob.write(struct.pack('<4sHd', MAGIC, 1, 0.0))
+		fob.write(struct.pack('<dBIiiifI', 0.5, 5, 0, 1, 0, 0, 0.25, 3))
+		fob.write(b'abc')
+	assert list(CallbackReplayer(filename).records()) == [ (0.5, 5, 0, 1, 0, 0, 0.25, b'abc') ]
+
+
+def test_not_a_recording(tmp_path):
+	filename = tmp_path / 'bad.sccb'
+	filename.write_bytes(b'\0' * 64)
+	with pytest.raises(ValueError):
+		CallbackReplayer(filename)
+
+
+#  end simple_carla/tests/test_recorder.py
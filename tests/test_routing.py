@@ -0,0 +1,94 @@
+#  simple_carla/tests/test_routing.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import pytest
+from simple_carla.event_bus import EVENT_CONNECTION_ADDED
+from conftest import wait_for
+
+
+@pytest.fixture
+def plugins(add_plugin):
+	return add_plugin(), add_plugin()
+
+
+def test_apply_routing(carla, plugins):
+	a, b = plugins
+	outs, ins = a.audio_outs(), b.audio_ins()
+	result = carla.apply_routing([ (outs[0], ins[0]), (outs[1], ins[1]) ]).result(5)
+	assert result.ok
+	assert len(result.connected) == 2
+	assert len(carla._connections) == 2
+	# Only the difference is applied:
+	result = carla.apply_routing([ (outs[0], ins[1]), (outs[1], ins[1]) ]).result(5)
+	assert result.ok
+	assert (len(result.connected), len(result.disconnected), result.unchanged) == (1, 1, 1)
+	assert len(carla._connections) == 2
+
+
+def test_port_names(carla, plugins):
+	a, b = plugins
+	result = carla.apply_routing([
+		(f'{a.moniker}:{a.audio_outs()[0].port_name}', f'{b.moniker}:{b.audio_ins()[0].port_name}')
+	]).result(5)
+	assert result.ok
+	assert len(carla._connections) == 1
+	with pytest.raises(KeyError):
+		carla.apply_routing([ ('nowhere:out', 'nowhere:in') ])
+
+
+def test_scope(carla, plugins, add_plugin):
+	a, b = plugins
+	c = add_plugin()
+	a.connect_audio_outputs_to(b)
+	b.connect_audio_outputs_to(c)
+	wait_for(lambda: len(carla._connections) == 4)
+	result = carla.apply_routing([], scope = [a]).result(5)
+	assert len(result.disconnected) == 2
+	assert all(connection.out_port.client is b for connection in carla._connections.values())
+
+
+def test_unconfirmed_changes_time_out(carla, plugins):
+	a, b = plugins
+	subscribers = len(carla.events.subscriptions(EVENT_CONNECTION_ADDED))
+	idle_hooks = len(carla._idle_hooks)
+	carla.patchbay_batch = lambda connects, disconnects: ([], [])	# Never confirmed
+	result = carla.apply_routing([ (a.audio_outs()[0], b.audio_ins()[0]) ], timeout = 0.05).result(5)
+	assert not result.ok
+	assert result.failed[0][2] == 'Not confirmed'
+	assert len(carla.events.subscriptions(EVENT_CONNECTION_ADDED)) == subscribers
+	assert len(carla._idle_hooks) == idle_hooks
+
+
+def test_cancel(carla, plugins):
+	a, b = plugins
+	subscribers = len(carla.events.subscriptions(EVENT_CONNECTION_ADDED))
+	carla.patchbay_batch = lambda connects, disconnects: ([], [])
+	future = carla.apply_routing([ (a.audio_outs()[0], b.audio_ins()[0]) ], timeout = 10)
+	assert future.cancel()
+	assert len(carla.events.subscriptions(EVENT_CONNECTION_ADDED)) == subscribers
+
+
+def test_system_ports(carla, plugins):
+	a, _ = plugins
+	edges = [ (a.audio_outs()[0], 'system:playback_1'), (a.audio_outs()[1], 'system:playback_2') ]
+	result = carla.apply_routing(edges).result(5)
+	assert result.ok
+	assert sorted(connection.in_port.port_name for connection in carla._connections.values()) \
+		== [ 'playback_1', 'playback_2' ]
+	# Nothing to change; resolved at once, without subscribing:
+	subscribers = len(carla.events.subscriptions(EVENT_CONNECTION_ADDED))
+	future = carla.apply_routing(edges)
+	assert future.done()
+	assert future.result().unchanged == 2
+	assert len(carla.events.subscriptions(EVENT_CONNECTION_ADDED)) == subscribers
+
+
+def test_failed_changes(carla, plugins):
+	a, b = plugins
+	carla.patchbay_batch = lambda connects, disconnects: ([ (key, 'nope') for key in connects ], [])
+	result = carla.apply_routing([ (a.audio_outs()[0], b.audio_ins()[0]) ]).result(5)
+	assert result.failed == [ (a.audio_outs()[0], b.audio_ins()[0], 'nope') ]
+
+
+#  end simple_carla/tests/test_routing.py
@@ -0,0 +1,110 @@
+#  simple_carla/tests/test_scenes.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import json, logging
+import pytest
+from simple_carla.scenes import Scene, SceneManager
+from conftest import wait_for
+
+
+@pytest.fixture
+def scenes(carla):
+	return SceneManager(carla)
+
+
+def test_recall(carla, add_plugin, scenes):
+	a, b = add_plugin(), add_plugin()
+	a.volume = 0.5
+	a.parameters[0].value = 0.2
+	b.dry_wet = 0.75
+	scenes.capture('one')
+	a.volume = 1.0
+	a.parameters[0].value = 0.8
+	result = scenes.recall('one')
+	assert (result.changes, result.fade_complete) == (2, True)
+	assert a.volume == pytest.approx(0.5)
+	assert a.parameters[0].value == pytest.approx(0.2)
+	assert scenes.recall('one').changes == 0
+	assert scenes.last_recall.scene == 'one'
+
+
+def test_partial_scene(carla, add_plugin, scenes):
+	a, b = add_plugin(), add_plugin()
+	a.volume = b.volume = 0.5
+	scenes.capture('volume', plugins = [ a ], keys = [ 'volume' ])
+	assert scenes.scenes['volume'].states == { a.moniker: { 'volume': 0.5 } }
+	a.volume = b.volume = 0.25
+	scenes.recall('volume')
+	assert (a.volume, b.volume) == (0.5, 0.25)
+	with pytest.raises(ValueError):
+		scenes.capture('bad', keys = [ 'moniker' ])
+
+
+def test_fade(carla, add_plugin, scenes):
+	a = add_plugin()
+	a.active = True
+	a.volume = 1.0
+	a.parameters[0].value = 1.0
+	scenes.capture('loud')
+	a.volume = 0.0
+	a.parameters[0].value = 0.0
+	a.active = False
+	result = scenes.recall('loud', fade = 0.2)
+	assert scenes.fading
+	assert not result.fade_complete
+	assert a.active
+	wait_for(lambda: 0.0 < a.volume < 1.0)
+	wait_for(lambda: result.fade_complete)
+	assert not scenes.fading
+	assert (a.volume, a.parameters[0].value) == (pytest.approx(1.0), pytest.approx(1.0))
+	assert result.elapsed >= 0.2
+
+
+def test_fade_deactivates_at_end(carla, add_plugin, scenes):
+	a = add_plugin()
+	a.active = False
+	a.volume = 0.0
+	scenes.capture('off')
+	a.active = True
+	a.volume = 1.0
+	result = scenes.recall('off', fade = 0.1)
+	assert a.active
+	wait_for(lambda: result.fade_complete)
+	assert not a.active
+
+
+def test_fade_from_unknown_value(carla, add_plugin, scenes):
+	"""
+	A value which has never been read or set cannot be faded from; it is set at once.
+	"""
+	a = add_plugin()
+	a.volume = 0.5
+	scene = Scene.capture('half', [ a ], [ 'volume' ])
+	b = add_plugin()
+	assert b.volume is None
+	scene.states = { b.moniker: scene.states[a.moniker] }
+	result = scenes.recall(scene, fade = 0.1)
+	assert b.volume == pytest.approx(0.5)
+	wait_for(lambda: result.fade_complete)
+	assert b.volume == pytest.approx(0.5)
+
+
+def test_out_of_range_and_missing(carla, add_plugin, scenes, caplog):
+	a = add_plugin()
+	scene = Scene('odd', { a.moniker: { 0: 1e6 }, 'nobody': { 'volume': 0.5 } })
+	with caplog.at_level(logging.WARNING):
+		assert scenes.recall(scene).changes == 0
+	assert 'out of range' in caplog.text
+
+
+def test_encode(carla, add_plugin):
+	a = add_plugin()
+	a.volume = 0.5
+	scene = Scene.capture('saved', [ a ])
+	decoded = Scene.decode(json.loads(json.dumps(scene.encode_saved_state())))
+	assert decoded.name == 'saved'
+	assert decoded.states == scene.states
+
+
+#  end simple_carla/tests/test_scenes.py
@@ -0,0 +1,103 @@
+#  simple_carla/tests/test_session.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import io
+import numpy as np
+import pytest
+from simple_carla.session import (
+	encode_value, decode_value, SessionReader, SessionWriter, MAGIC, VERSION,
+	RECORD_HEADER, RECORD_CONNECTION
+)
+from conftest import wait_for
+
+
+@pytest.mark.parametrize('value', [
+	None, True, 7, -2 ** 40, 0.25, 'text', b'\x00\x01', [1, 'two'], {'key': 3.5}
+])
+def test_value_round_trip(value):
+	data = bytearray()
+	encode_value(value, data)
+	assert decode_value(data, 0)[0] == value
+
+
+@pytest.mark.parametrize('value, expected', [
+	(np.float32(0.5), 0.5), (np.float64(0.25), 0.25), (np.bool_(True), True),
+	(np.int16(7), 7), (np.int64(2 ** 40), 2 ** 40)
+])
+def test_numpy_values(value, expected):
+	data = bytearray()
+	encode_value(value, data)
+	assert decode_value(data, 0)[0] == expected
+
+
+def test_session_round_trip(carla, add_plugin):
+	a = add_plugin()
+	b = add_plugin()
+	a.volume = 0.5
+	b.parameters[0].value = 0.3
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: len(carla._connections) == 2)
+	fob = io.BytesIO()
+	carla.save_session(fob)
+	fob.seek(0)
+	result = carla.load_session(fob).result(5)
+	assert len(result.plugins) == 2
+	assert not result.failed
+	new_a, new_b = sorted(result.plugins, key = lambda plugin: plugin.plugin_id)
+	wait_for(lambda: len(carla._connections) == 4)
+	assert new_a.volume == pytest.approx(0.5)
+	assert new_b.parameters[0].value == pytest.approx(0.3)
+	# Connections are made between the loaded plugins, not the plugins already there:
+	new = set(result.plugins)
+	for connection in carla._connections.values():
+		assert (connection.out_port.client in new) == (connection.in_port.client in new)
+
+
+def test_reader_errors():
+	with pytest.raises(ValueError, match = 'Not a simple_carla session'):
+		SessionReader(io.BytesIO(b'NOTASESSION'))
+	with pytest.raises(ValueError, match = 'newer'):
+		SessionReader(io.BytesIO(MAGIC + (VERSION + 1).to_bytes(2, 'little')))
+	fob = io.BytesIO()
+	writer = SessionWriter(fob)
+	writer.write_header({ 'plugins': 0 })
+	with pytest.raises(ValueError, match = 'truncated'):
+		list(SessionReader(io.BytesIO(fob.getvalue()[:-1])))
+
+
+def test_reader_skips_unknown_records():
+	fob = io.BytesIO()
+	writer = SessionWriter(fob)
+	writer.write_header({ 'plugins': 0 })
+	writer._write_record(0x7A, b'future')
+	writer.write_connection('a', 'out', 'b', 'in')
+	writer.close()
+	fob.seek(0)
+	assert list(SessionReader(fob)) == [
+		(RECORD_HEADER, { 'plugins': 0 }),
+		(RECORD_CONNECTION, ('a', 'out', 'b', 'in'))
+	]
+
+
+def test_unresolved_connections(carla, add_plugin):
+	a = add_plugin()
+	fob = io.BytesIO()
+	writer = SessionWriter(fob)
+	writer.write_header({ 'title': 'test' })
+	writer.write_connection(a.moniker, a.audio_outs()[0].port_name, 'system', 'playback_1')
+	writer.write_connection('nowhere', 'out', 'system', 'playback_1')
+	writer.close()
+	fob.seek(0)
+	result = carla.load_session(fob, timeout = 0.05).result(5)
+	assert result.info == { 'title': 'test' }
+	# Plugins already loaded are not connected to:
+	assert result.unresolved == sorted([
+		(a.moniker, a.audio_outs()[0].port_name, 'system', 'playback_1'),
+		('nowhere', 'out', 'system', 'playback_1')
+	])
+	assert not result.ok
+	assert not carla._connections
+
+
+#  end simple_carla/tests/test_session.py
@@ -0,0 +1,70 @@
+#  simple_carla/tests/test_simulated.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import os, subprocess, sys
+from time import perf_counter
+import pytest
+from simple_carla import Plugin
+from simple_carla.simulated import register_plugin, SIMULATED_PLUGINS
+from conftest import PLUGIN_DEF, wait_for
+
+
+@pytest.fixture
+def synth_def():
+	register_plugin('test-synth', audio_ins = 0, audio_outs = 2, midi_ins = 1,
+		parameters = [ { 'name': 'Gain', 'min': 0.0, 'max': 2.0, 'def': 1.0 } ])
+	yield dict(PLUGIN_DEF, name = 'Synth', label = 'test-synth')
+	del SIMULATED_PLUGINS['test-synth']
+
+
+@pytest.mark.skipif(os.path.exists('/usr/lib/carla') or os.path.exists('/usr/local/lib/carla'),
+	reason = 'Carla is installed')
+def test_no_silent_fallback():
+	"""
+	Without SIMPLE_CARLA_BACKEND=simulated, a missing Carla is an error.
+	"""
+	env = { key: value for key, value in os.environ.items() if key != 'SIMPLE_CARLA_BACKEND' }
+	env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	process = subprocess.run([ sys.executable, '-c', 'import simple_carla.host' ],
+		env = env, capture_output = True, text = True)
+	assert process.returncode != 0
+	assert 'FileNotFoundError' in process.stderr
+
+
+def test_registered_plugin(carla, add_plugin, synth_def):
+	plugin = add_plugin(synth_def)
+	assert (len(plugin.audio_ins()), len(plugin.audio_outs()), len(plugin.midi_ins())) == (0, 2, 1)
+	parameter = plugin.parameters[0]
+	assert (parameter.name, parameter.min, parameter.max) == ('Gain', 0.0, 2.0)
+	assert parameter.value == pytest.approx(1.0)
+
+
+def test_parameter_change_callback(carla, add_plugin):
+	plugin = add_plugin()
+	changes = []
+	carla.events.subscribe('parameter_changed', lambda *args: changes.append(args), weak = False)
+	carla.lib.simulate_parameter_change(plugin.plugin_id, 2, 0.75)
+	wait_for(lambda: changes)
+	assert changes == [ (plugin, plugin.parameters[2], 0.75) ]
+
+
+def test_callback_latency(carla):
+	carla.lib.callback_latency = 0.1
+	start = perf_counter()
+	plugin = Plugin(PLUGIN_DEF)
+	plugin.add_to_carla()
+	wait_for(lambda: plugin.is_ready)
+	assert perf_counter() - start >= 0.1
+
+
+def test_failing_plugin(carla):
+	register_plugin('test-broken', fail = 'Broken on purpose')
+	try:
+		with pytest.raises(Exception):
+			Plugin(dict(PLUGIN_DEF, label = 'test-broken')).add_to_carla()
+	finally:
+		del SIMULATED_PLUGINS['test-broken']
+
+
+#  end simple_carla/tests/test_simulated.py
@@ -0,0 +1,73 @@
+#  simple_carla/tests/test_snapshots.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import os, subprocess, sys
+import pytest
+from simple_carla.snapshots import SnapshotSlots
+from simple_carla.chunks import ChunkStore
+from simple_carla.simulated import register_plugin, SIMULATED_PLUGINS, PLUGIN_OPTION_USE_CHUNKS
+from conftest import PLUGIN_DEF
+
+
+@pytest.fixture
+def chunky_def():
+	register_plugin('test-chunky', chunk = 'preset A',
+		options_available = PLUGIN_OPTION_USE_CHUNKS, options_enabled = PLUGIN_OPTION_USE_CHUNKS)
+	yield dict(PLUGIN_DEF, name = 'Chunky', label = 'test-chunky')
+	del SIMULATED_PLUGINS['test-chunky']
+
+
+def test_import_without_carla():
+	env = { key: value for key, value in os.environ.items() if key != 'SIMPLE_CARLA_BACKEND' }
+	env['PYTHONPATH'] = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	process = subprocess.run([ sys.executable, '-c',
+		'import sys, simple_carla.snapshots; print("carla_backend" in sys.modules, "numpy" in sys.modules)' ],
+		env = env, capture_output = True, text = True)
+	assert process.returncode == 0, process.stderr
+	assert process.stdout.split() == [ 'False', 'False' ]
+
+
+def test_toggle(carla, add_plugin):
+	plugin = add_plugin()
+	plugin.volume = 0.5
+	plugin.parameters[0].value = 0.25
+	slots = SnapshotSlots(plugin)
+	slots.capture('A')
+	plugin.volume = 1.0
+	plugin.parameters[0].value = 0.75
+	plugin.parameters[1].value = 0.5
+	slots.capture('B')
+	assert slots.toggle() == 'A'
+	assert (plugin.volume, plugin.parameters[0].value) == (0.5, 0.25)
+	assert slots.toggle() == 'B'
+	assert plugin.parameters[1].value == pytest.approx(0.5)
+	assert slots.recall('B') == 0		# Nothing differs
+	assert len(slots) == 2 and 'A' in slots
+	assert 0 < slots.nbytes < 1024
+	slots.remove('B')
+	assert slots.current is None
+	with pytest.raises(KeyError):
+		slots.recall('B')
+
+
+def test_chunks(carla, add_plugin, chunky_def):
+	store = ChunkStore()
+	plugin = add_plugin(chunky_def)
+	slots = SnapshotSlots(plugin, store)
+	slots.capture('A')
+	slots.capture('B')
+	assert len(store) == 1
+	plugin.chunk_data = 'preset B'
+	slots.capture('B')
+	assert len(store) == 2
+	slots.recall('A')
+	assert plugin.chunk_data == 'preset A'
+	slots.remove('A')
+	assert len(store) == 1
+	slots.capture('B')		# Replaces the snapshot holding "preset B"
+	assert len(store) == 1
+	assert store.get(slots.slots['B'].chunk) == 'preset A'
+
+
+#  end simple_carla/tests/test_snapshots.py
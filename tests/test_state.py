@@ -0,0 +1,65 @@
+#  simple_carla/tests/test_state.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from simple_carla.host import StateAccessor, encode_properties, _MISSING
+
+
+class Thing:
+
+	def __init__(self, **kwargs):
+		self.a = 1
+		self.b = 2
+		self._private = 3
+		self.__dict__.update(kwargs)
+
+
+def test_missing_keys():
+	accessor = StateAccessor([ 'a', 'b', 'c', '_private' ])
+	assert accessor.keys == ('a', 'b', 'c')
+	values = accessor.values(Thing())
+	assert values == (1, 2, _MISSING)
+	assert accessor.encode(values) == { 'a': 1, 'b': 2 }
+	# The key which was missing is read once the object has it:
+	assert accessor.encode(accessor.values(Thing(c = 4))) == { 'a': 1, 'b': 2, 'c': 4 }
+	assert accessor.values(Thing()) == (1, 2, _MISSING)
+
+
+def test_encode_properties():
+	thing = Thing(c = 4)
+	assert encode_properties(thing, [ 'b', 'c' ]) == { 'b': 2, 'c': 4 }
+	assert encode_properties(thing) == { 'a': 1, 'b': 2, 'c': 4 }
+
+
+def test_concurrent_values():
+	accessor = StateAccessor([ 'a', 'b', 'c', 'd' ])
+	things = [ Thing(c = 3), Thing(d = 4), Thing(), Thing(c = 3, d = 4) ] * 500
+	expected = [ tuple(getattr(thing, key, _MISSING) for key in accessor.keys) for thing in things ]
+	with ThreadPoolExecutor(4) as executor:
+		assert list(executor.map(accessor.values, things)) == expected
+
+
+def test_plugin_state(carla, add_plugin):
+	plugin = add_plugin()
+	plugin.volume = 0.5
+	state = plugin.encode_saved_state(mark_clean = True)
+	assert state['vars']['volume'] == pytest.approx(0.5)
+	assert 'prefer_generic_dialog' not in state['vars']
+	assert not plugin.is_dirty()
+	plugin.prefer_generic_dialog = True
+	assert plugin.is_dirty()
+	state = plugin.encode_saved_state(mark_clean = True)
+	assert state['vars']['prefer_generic_dialog'] is True
+	assert not plugin.is_dirty()
+	plugin.parameters[0].value = 0.3
+	assert plugin.is_dirty()
+	other = add_plugin()
+	other.restore_saved_state(plugin.encode_saved_state())
+	assert other.volume == pytest.approx(0.5)
+	assert other.prefer_generic_dialog is True
+	assert other.parameters[0].value == pytest.approx(0.3)
+
+
+#  end simple_carla/tests/test_state.py
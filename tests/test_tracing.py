@@ -0,0 +1,36 @@
+#  simple_carla/tests/test_tracing.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import json
+
+
+def test_tracing(carla, add_plugin, tmp_path):
+	plugin = add_plugin()
+	tracer = carla.start_tracing()
+	for _ in range(10):
+		plugin.volume = 0.5
+	carla.stop_tracing()
+	plugin.volume = 0.25			# Not traced
+	stats = { row['name']: row for row in tracer.summary() }
+	assert stats['set_volume']['calls'] == 10
+	assert stats['set_volume']['p95'] <= stats['set_volume']['max_time']
+	assert 'set_volume' in tracer.format_summary()
+	filename = tmp_path / 'trace.json'
+	tracer.write_trace(filename)
+	events = json.loads(filename.read_text())['traceEvents']
+	assert sum(event['name'] == 'set_volume' for event in events) == 10
+
+
+def test_disabled_tracing_unwraps(carla):
+	original = carla.set_volume
+	tracer = carla.start_tracing()
+	assert 'set_volume' in vars(carla)
+	carla.stop_tracing()
+	assert 'set_volume' not in vars(carla)
+	assert carla.set_volume == original
+	tracer.reset()
+	assert tracer.summary() == []
+
+
+#  end simple_carla/tests/test_tracing.py
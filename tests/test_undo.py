@@ -0,0 +1,161 @@
+#  simple_carla/tests/test_undo.py
+#
+#  Copyright 2025 Leon Dionne <ldionne@dridesign.sh.cn>
+#
+import pytest
+from simple_carla import undo
+from conftest import wait_for
+
+
+@pytest.fixture
+def history(carla):
+	history = carla.start_undo(coalesce_interval = 0)
+	yield history
+	carla.stop_undo()
+
+
+@pytest.fixture
+def plugins(add_plugin, history):
+	"""
+	Two plugins, with volume set, and their addition cleared from the history.
+	"""
+	plugins = [ add_plugin(), add_plugin() ]
+	for plugin in plugins:
+		plugin.volume = 1.0
+	history.clear()
+	return plugins
+
+
+def test_value_undo_redo(history, plugins):
+	plugin = plugins[0]
+	plugin.volume = 0.5
+	wait_for(lambda: history.can_undo)
+	history.undo()
+	wait_for(lambda: plugin.volume == pytest.approx(1.0))
+	history.redo()
+	wait_for(lambda: plugin.volume == pytest.approx(0.5))
+	# Changes made by undo and redo are not recorded as new steps:
+	assert history.stats()['undo_steps'] == 1
+	assert history.stats()['redo_steps'] == 0
+
+
+def test_gesture_is_one_step(history, plugins):
+	plugin = plugins[0]
+	with history.gesture('Several'):
+		for index in range(3):
+			plugin.parameters[index].value = 0.1 * (index + 1)
+	assert history.stats()['undo_steps'] == 1
+	history.undo()
+	wait_for(lambda: all(plugin.parameters[index].value == pytest.approx(0.0) for index in range(3)))
+
+
+def test_connection_undo_redo(carla, history, plugins):
+	a, b = plugins
+	out_port, in_port = a.audio_outs()[0], b.audio_ins()[0]
+	out_port.connect_to(in_port)
+	wait_for(lambda: len(carla._connections) == 1)
+	history.undo()
+	wait_for(lambda: len(carla._connections) == 0)
+	history.redo()
+	wait_for(lambda: len(carla._connections) == 1)
+	assert history.stats()['undo_steps'] == 1
+
+
+def test_failed_change_is_not_expected(carla, history, plugins):
+	a, b = plugins
+	out_port, in_port = a.audio_outs()[0], b.audio_ins()[0]
+	out_port.connect_to(in_port)
+	wait_for(lambda: len(carla._connections) == 1)
+	out_port.disconnect_from(in_port)
+	wait_for(lambda: len(carla._connections) == 0)
+	carla.patchbay_batch = lambda connects, disconnects: ([ (key, 'nope') for key in connects ], [])
+	history.undo()		# Tries to connect again, and fails
+	del carla.patchbay_batch
+	assert not history._expected
+	history.clear()
+	out_port.connect_to(in_port)
+	wait_for(lambda: history.can_undo)
+
+
+def test_expected_values_expire(carla, history, plugins, monkeypatch):
+	monkeypatch.setattr(undo, 'EXPECT_TIMEOUT', 0.0)
+	plugin = plugins[0]
+	plugin.volume = 0.5
+	wait_for(lambda: history.can_undo)
+	monkeypatch.setattr(carla, 'apply_plugin_states', lambda values: None)
+	history.undo()		# Expects volume 1.0, which never arrives
+	monkeypatch.undo()
+	assert not history.can_undo
+	plugin.volume = 1.0
+	assert history.can_undo
+
+
+def test_step_merges_entries():
+	step = undo.UndoStep('Knob')
+	step.record(('v', 'a', 0), [ undo.ENTRY_VALUE, 'a', 0, 0.0, 0.5 ])
+	step.record(('v', 'a', 0), [ undo.ENTRY_VALUE, 'a', 0, 0.5, 0.7 ])
+	assert step.entries == [ [ undo.ENTRY_VALUE, 'a', 0, 0.0, 0.7 ] ]
+	names = ('a', 'out', 'b', 'in')
+	step.record(('c', names), [ undo.ENTRY_CONNECTION, names, True ])
+	step.record(('c', names), [ undo.ENTRY_CONNECTION, names, False ])
+	assert len(step) == 1
+
+
+def test_coalesce(carla, add_plugin):
+	history = carla.start_undo(coalesce_interval = 10.0)
+	try:
+		plugin = add_plugin()
+		plugin.volume = 1.0
+		history.clear()
+		for volume in (0.75, 0.5, 0.25):
+			plugin.volume = volume
+		history.undo()
+		assert history.stats()['undo_steps'] == 0
+		wait_for(lambda: plugin.volume == pytest.approx(1.0))
+	finally:
+		carla.stop_undo()
+
+
+def test_new_change_clears_redo(history, plugins):
+	plugin = plugins[0]
+	plugin.volume = 0.5
+	history.undo()
+	assert history.can_redo
+	wait_for(lambda: plugin.volume == pytest.approx(1.0))
+	plugin.volume = 0.25
+	assert not history.can_redo
+	assert history.redo() is None
+
+
+def test_max_entries(history, plugins):
+	history.max_entries = 3
+	plugin = plugins[0]
+	for index in range(5):
+		with history.gesture():
+			plugin.parameters[index % 4].value = 0.1 * (index + 1)
+	assert history.stats()['entries'] == 3
+	assert history.stats()['undo_steps'] == 3
+
+
+def test_removed_plugin_restored(carla, history, plugins):
+	a, b = plugins
+	a.connect_audio_outputs_to(b)
+	wait_for(lambda: len(carla._connections) == 2)
+	b.volume = 0.3
+	moniker = b.moniker
+	history.clear()
+	with history.gesture('Remove'):
+		b.remove_from_carla()
+		wait_for(lambda: len(carla.plugins()) == 1)
+	history.undo()
+	wait_for(lambda: len(carla._connections) == 2)
+	restored, = [ plugin for plugin in carla.plugins() if plugin.moniker == moniker ]
+	assert restored is not b
+	assert restored.volume == pytest.approx(0.3)
+	# Adding it again was not recorded as a new step:
+	assert history.stats()['undo_steps'] == 0
+	history.redo()
+	wait_for(lambda: len(carla.plugins()) == 1 and not carla._connections)
+
+
+#  end simple_carla/tests/test_undo.py